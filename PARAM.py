@@ -24,9 +24,84 @@ UPDATE_CHANNEL_ID_EN = 1421773639761526824  # Salon anglais
 UPDATE_CHANNEL_ID_TEST = 1350138595515568169  # Salon de test
 UPDATE_ROLE_ID = 1350428823052746752  # Rôle à mentionner pour les mises à jour
 
+# --- LANGUES DES ANNONCES ---
+# Langues dans lesquelles les annonces sont publiées, chacune associée à son salon.
+# Le français est la langue source : les autres langues sont traduites à partir de lui.
+# Pour ajouter une langue, ajoutez simplement une entrée (ex: "es": 123456789).
+UPDATE_LANGUAGES = {
+    "fr": UPDATE_CHANNEL_ID_FR,
+    "en": UPDATE_CHANNEL_ID_EN,
+}
+
 # --- MODÈLE GEMINI ---
 # Nom du modèle Gemini à utiliser pour la correction et la traduction.
 GEMINI_MODEL = "gemini-flash-lite-latest"
+# Si activé, le modèle le plus rapide mesuré par `python -m bench.bench_models`
+# (résultats dans GEMINI_BENCHMARK_FILE) remplace GEMINI_MODEL au démarrage,
+# à condition que ses réponses JSON soient valides dans GEMINI_MIN_JSON_RATE des cas.
+GEMINI_AUTO_SELECT = True
+GEMINI_BENCHMARK_FILE = "data/model_benchmark.json"
+GEMINI_MIN_JSON_RATE = 0.95
+# Catalogue des modèles Gemini (commande /models), mis en cache sur disque et
+# redemandé à l'API au plus une fois par GEMINI_CATALOG_TTL secondes.
+GEMINI_CATALOG_FILE = "data/model_catalog.json"
+GEMINI_CATALOG_TTL = 24 * 3600
+# Taille maximale (tokens) des textes envoyés dans une seule requête : au-delà,
+# ils sont découpés en requêtes parallèles. Réduite automatiquement si le
+# catalogue indique des limites plus basses pour le modèle utilisé.
+GEMINI_MAX_REQUEST_TOKENS = 8000
+
+# --- LIMITES DE L'API GEMINI ---
+# Quotas appliqués par le bot avant chaque appel (requêtes et tokens par minute).
+GEMINI_RPM = 15
+GEMINI_TPM = 250_000
+# Coupe-circuit : après GEMINI_BREAKER_THRESHOLD échecs consécutifs, les appels
+# échouent immédiatement pendant GEMINI_BREAKER_COOLDOWN secondes.
+GEMINI_BREAKER_THRESHOLD = 3
+GEMINI_BREAKER_COOLDOWN = 60
+
+# --- DÉLAI DES PRÉVISUALISATIONS ---
+# Temps maximal (secondes) entre l'envoi du formulaire /update ou /patch-note et
+# la prévisualisation. Correction, traductions et pièces jointes se partagent ce
+# budget : une étape trop lente est abandonnée (texte non corrigé, traduction
+# manquante) plutôt que de retarder la prévisualisation.
+PREVIEW_DEADLINE = 60
+
+# --- PIÈCES JOINTES DES ANNONCES ---
+# Les pièces jointes des annonces en attente sont stockées sur disque (dossier
+# temporaire). Au-delà de ce budget, les brouillons les plus anciens sont libérés.
+ATTACHMENT_STORE_MAX_BYTES = 200 * 1024 * 1024
+# Taille maximale d'une pièce jointe (limite d'upload d'un bot sans boost).
+ATTACHMENT_MAX_FILE_BYTES = 10 * 1024 * 1024
+
+# --- RECOMPRESSION DES IMAGES ---
+# Les captures (PNG, JPEG, WebP) sont converties et réduites avant l'envoi, dans
+# des processus séparés. Nécessite Pillow (`pip install pillow`), sinon ignoré.
+MEDIA_OPTIMIZE = True
+MEDIA_FORMAT = "webp"  # "webp" ou "jpeg"
+MEDIA_QUALITY = 85
+# Les images plus grandes (en pixels, côté le plus long) sont réduites.
+MEDIA_MAX_DIMENSION = 1920
+# Une image recompressible peut dépasser ATTACHMENT_MAX_FILE_BYTES à l'origine.
+MEDIA_MAX_SOURCE_BYTES = 50 * 1024 * 1024
+MEDIA_WORKERS = 2
+
+# --- BROUILLONS D'ANNONCES ---
+# Nombre maximal de prévisualisations actives (boutons utilisables) en même temps,
+# et durée d'inactivité (secondes) après laquelle leurs boutons sont désactivés.
+VIEW_REGISTRY_MAX = 20
+VIEW_IDLE_TTL = 48 * 3600
+
+# --- FILE D'ENVOI DES ANNONCES ---
+# Les annonces sont enregistrées (data/outbox.sqlite3) avant d'être envoyées.
+# Un salon en erreur temporaire est réessayé après OUTBOX_BACKOFF_BASE secondes,
+# puis un délai doublé à chaque essai (au plus OUTBOX_BACKOFF_MAX secondes).
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 2
+OUTBOX_BACKOFF_MAX = 300
+# Temps (secondes) pendant lequel le bouton "Envoyer" attend la fin de l'envoi
+# avant de répondre que l'annonce continue en arrière-plan.
+OUTBOX_CONFIRM_TIMEOUT = 60
 
 # pipreqs . --force --encoding=utf8 --ignore .venv
 # pip list --outdated | Select-String -Pattern '^\S+' | ForEach-Object { pip install --upgrade $_.Matches.Value }
@@ -0,0 +1,187 @@
+"""
+Benchmark des modèles Gemini candidats sur la charge de référence des annonces.
+
+Chaque exécution envoie une correction puis une traduction (textes d'exemple de
+`bench_update_pipeline`) à chaque modèle, et mesure la latence (p50/p95), le débit
+en tokens/s et la part de réponses JSON valides. Les mesures réelles (`--backend
+live`) sont écrites dans PARAM.GEMINI_BENCHMARK_FILE : au démarrage, le bot y
+choisit le modèle le plus rapide dont les réponses sont fiables
+(PARAM.GEMINI_AUTO_SELECT).
+
+    python -m bench.bench_models --backend live --models gemini-flash-lite-latest gemini-flash-latest
+    python -m bench.bench_models --backend fake --runs 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from google import genai
+
+from bench.bench_update_pipeline import SAMPLE_TEXTS, _percentile
+from bench.gemini_stub import start_stub
+from modules.announcements import ai
+from modules.llm import FakeBackend, GeminiBackend, LLMBackend
+from modules.model_selection import ModelResult, save_results, select_model
+from modules.rate_limit import RateLimiter, estimate_tokens
+import PARAM
+
+# Langue cible des traductions de la charge de référence
+TARGET_LANGUAGE = "en"
+
+
+def _workload(index: int) -> list[tuple[str, dict, str]]:
+    """Requêtes (texte, schéma, consignes) d'une exécution : correction puis traduction."""
+    texts = {key: value.format(index=index) for key, value in SAMPLE_TEXTS.items()}
+    requests = []
+    for batch in ai._batches(texts, ai.request_token_budget()):
+        requests.append((*ai.correction_request(batch), ai.CORRECTION_SYSTEM))
+        requests.append(
+            (
+                *ai.translation_request(batch, TARGET_LANGUAGE),
+                ai.TRANSLATION_SYSTEM,
+            )
+        )
+    return requests
+
+
+def _is_valid(text: str, schema: dict) -> bool:
+    """Réponse JSON décodable contenant tous les champs attendus, en texte."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and all(
+        isinstance(data.get(key), str) for key in schema["required"]
+    )
+
+
+async def _bench_model(
+    backend: LLMBackend, model: str, runs: int, limiter: RateLimiter | None
+) -> ModelResult:
+    durations = []
+    output_tokens = 0
+    generation_time = 0.0
+    valid = 0
+    total = 0
+    for index in range(runs):
+        for prompt, schema, system in _workload(index):
+            total += 1
+            if limiter:
+                await limiter.acquire(estimate_tokens(system + prompt))
+            started = time.perf_counter()
+            try:
+                response = await backend.generate(model, prompt, schema, system)
+            except Exception as e:
+                print(f"  {model} : erreur ({e})")
+                continue
+            elapsed = time.perf_counter() - started
+            durations.append(elapsed)
+            output_tokens += response.output_tokens
+            generation_time += elapsed
+            valid += _is_valid(response.text, schema)
+
+    if not durations:
+        return ModelResult(model, 0, 0.0, 0.0, 0.0, 0.0)
+    return ModelResult(
+        model,
+        runs=total,
+        p50=statistics.median(durations),
+        p95=_percentile(durations, 95),
+        tokens_per_second=output_tokens / generation_time if generation_time else 0.0,
+        json_valid_rate=valid / total,
+    )
+
+
+async def _bench(args: argparse.Namespace) -> None:
+    runner = None
+    limiter = None
+    if args.backend == "live":
+        load_dotenv()
+        api_key = os.getenv("GEMINI_API")
+        if not api_key:
+            raise SystemExit("GEMINI_API introuvable. Vérifiez votre fichier .env.")
+        backend = GeminiBackend(genai.Client(api_key=api_key))
+        # Le benchmark consomme le même quota que le bot
+        limiter = RateLimiter(PARAM.GEMINI_RPM, PARAM.GEMINI_TPM)
+    else:
+        fake = FakeBackend(
+            latency=args.latency,
+            jitter=args.jitter,
+            output_tokens=args.output_tokens,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+        backend = fake
+        if args.backend == "stub":
+            runner, base_url = await start_stub(fake)
+            client = genai.Client(api_key="bench", http_options={"base_url": base_url})
+            backend = GeminiBackend(client)
+
+    try:
+        results = [
+            await _bench_model(backend, model, args.runs, limiter)
+            for model in args.models
+        ]
+    finally:
+        if runner:
+            await runner.cleanup()
+
+    print(f"Backend: {args.backend} | exécutions par modèle: {args.runs}")
+    print(f"{'Modèle':<36}{'p50':>10}{'p95':>10}{'tokens/s':>10}{'JSON ok':>10}")
+    for result in results:
+        print(
+            f"{result.model:<36}{result.p50 * 1000:>8.0f}ms{result.p95 * 1000:>8.0f}ms"
+            f"{result.tokens_per_second:>10.1f}{result.json_valid_rate:>10.0%}"
+        )
+
+    selected = select_model(results, args.min_json_rate)
+    print(f"Modèle retenu : {selected or 'aucun (qualité insuffisante)'}")
+
+    # Les mesures d'un modèle factice ne remplacent pas celles du bot par défaut
+    output = args.output or (
+        PARAM.GEMINI_BENCHMARK_FILE if args.backend == "live" else None
+    )
+    if output and not args.no_save:
+        workload = {
+            "backend": args.backend,
+            "runs": args.runs,
+            "language": TARGET_LANGUAGE,
+        }
+        save_results(output, results, workload)
+        print(f"Résultats écrits dans {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["live", "fake", "stub"], default="fake")
+    parser.add_argument("--models", nargs="+", default=[PARAM.GEMINI_MODEL])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--min-json-rate", type=float, default=PARAM.GEMINI_MIN_JSON_RATE
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Fichier de résultats (par défaut PARAM.GEMINI_BENCHMARK_FILE avec --backend live).",
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Affiche les résultats sans modifier le choix du modèle du bot.",
+    )
+    # Modèle factice (--backend fake / stub)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(_bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark du découpage des annonces en messages de 2000 caractères.
+
+Compare `modules.splitter.split_message` à l'ancien découpage (qui redécoupait
+et `lstrip`ait le reste du texte à chaque morceau) sur des textes de 100 Ko.
+
+    python -m bench.bench_split --size 100000 --runs 20
+"""
+
+import argparse
+from collections.abc import Callable
+import statistics
+import time
+
+from modules.splitter import split_message
+
+
+def legacy_split(content: str, limit: int = 2000) -> list[str]:
+    """Ancien `_split_message` des cogs (quadratique sur les longs textes)."""
+    if len(content) <= limit:
+        return [content]
+
+    chunks = []
+    while content:
+        if len(content) <= limit:
+            chunks.append(content)
+            break
+        split_index = content.rfind("\n", 0, limit)
+        if split_index == -1:
+            split_index = content.rfind(" ", 0, limit)
+        if split_index == -1:
+            split_index = limit
+        chunks.append(content[:split_index])
+        content = content[split_index:].lstrip()
+    return chunks
+
+
+def _repeat(pattern: str, size: int) -> str:
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+def sample_inputs(size: int) -> dict[str, str]:
+    return {
+        "prose": _repeat("& Correction d'un bug dans le panneau de statut.\n", size),
+        "sans saut de ligne": _repeat("mot ", size),
+        "bloc de code": "```py\n"
+        + _repeat("    resultat = calculer(valeur, 42)\n", size)
+        + "```",
+        "emojis et mentions": _repeat(
+            "<a:verify:1350435235015426130> <@&1350399062418915418> ", size
+        ),
+        "titres": _repeat("## Nouveautés\n- ajout\n- correction\n", size),
+    }
+
+
+def _time(split: Callable[[str], list[str]], text: str, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        split(text)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'entrée':<20} {'morceaux':>8} {'ancien':>10} {'nouveau':>10}")
+    for name, text in sample_inputs(args.size).items():
+        chunks = split_message(text)
+        legacy = _time(legacy_split, text, args.runs)
+        current = _time(split_message, text, args.runs)
+        print(
+            f"{name:<20} {len(chunks):>8} {legacy * 1000:>8.2f}ms"
+            f" {current * 1000:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark hors ligne du pipeline /update (correction, traductions, rendu, découpage).
+
+Le modèle est remplacé par un FakeBackend, appelé directement (`--backend fake`)
+ou à travers le SDK google-genai et le serveur local de `bench/gemini_stub.py`
+(`--backend stub`). Aucun accès réseau n'est nécessaire.
+
+    python -m bench.bench_update_pipeline --concurrency 8 --runs 32 --languages 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from google import genai
+
+from bench.gemini_stub import start_stub
+from cog.maj import UpdateManagerView, _build_message
+from modules.announcements import ai
+from modules.announcements.render import build_preview
+from modules.llm import FakeBackend, GeminiBackend
+from modules.rate_limit import CircuitBreaker, RateLimiter
+from modules.singleflight import gemini_flight
+from modules.splitter import split_message
+import PARAM
+
+SAMPLE_TEXTS = {
+    "title": "Mise à jour {index}",
+    "intro": "Voici les nouveautés de cette version.",
+    "changes": "\n".join(
+        f"& Ajout de la fonctionnalité {i} avec une description détaillée"
+        for i in range(15)
+    ),
+    "outro": "Merci à tous pour vos retours !",
+}
+
+
+async def _run_pipeline(index: int, identical: bool) -> float:
+    """Exécute un /update complet (sans Discord) et renvoie sa durée en secondes."""
+    suffix = 0 if identical else index
+    texts = {key: value.format(index=suffix) for key, value in SAMPLE_TEXTS.items()}
+    started = time.perf_counter()
+    fields = UpdateManagerView.fields
+    corrected = await ai.correct_texts(texts, fields)
+    translations = await ai.translate_all(corrected, fields)
+    localized = ai.localized_texts(corrected, translations)
+    split_message(build_preview(localized, _build_message))
+    return time.perf_counter() - started
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def _bench(args: argparse.Namespace) -> None:
+    fake = FakeBackend(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    runner = None
+    if args.backend == "stub":
+        runner, base_url = await start_stub(fake)
+        client = genai.Client(api_key="bench", http_options={"base_url": base_url})
+        ai.backend = GeminiBackend(client)
+    else:
+        ai.backend = fake
+
+    # Les quotas réels fausseraient la mesure, sauf demande explicite
+    if not args.respect_limits:
+        ai.gemini_limiter = RateLimiter(10**6, 10**9)
+    ai.gemini_breaker = CircuitBreaker(10**6, 0)
+
+    languages = list(ai.LANGUAGE_NAMES)[: args.languages]
+    PARAM.UPDATE_LANGUAGES = {lang: 0 for lang in languages}
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(index: int) -> float:
+        async with semaphore:
+            return await _run_pipeline(index, args.identical)
+
+    try:
+        started = time.perf_counter()
+        durations = await asyncio.gather(*(bounded(i) for i in range(args.runs)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if runner:
+            await runner.cleanup()
+
+    print(
+        f"Backend: {args.backend} | langues: {len(languages)} | "
+        f"concurrence: {args.concurrency} | exécutions: {args.runs}"
+    )
+    print(
+        f"Latence /update : p50={statistics.median(durations) * 1000:.1f} ms  "
+        f"p95={_percentile(durations, 95) * 1000:.1f} ms  "
+        f"max={max(durations) * 1000:.1f} ms"
+    )
+    print(f"Débit : {args.runs / elapsed:.2f} annonces/s ({elapsed:.2f} s au total)")
+    print(f"Appels au modèle : {fake.calls} (mutualisés : {gemini_flight.coalesced})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["fake", "stub"], default="fake")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=16)
+    parser.add_argument("--languages", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--identical",
+        action="store_true",
+        help="Toutes les exécutions envoient le même texte (mesure la mutualisation).",
+    )
+    parser.add_argument(
+        "--respect-limits",
+        action="store_true",
+        help="Conserve les quotas de PARAM (GEMINI_RPM / GEMINI_TPM).",
+    )
+    asyncio.run(_bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
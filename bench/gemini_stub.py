@@ -0,0 +1,139 @@
+"""
+Serveur HTTP local imitant l'API REST Gemini (generateContent / streamGenerateContent).
+
+Les réponses sont produites par un FakeBackend : latence, erreurs et taille des
+réponses sont réglables. Pour y brancher le bot ou un benchmark :
+
+    python -m bench.gemini_stub --port 8765 --latency 0.3
+    GEMINI_API=fake GEMINI_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+
+from aiohttp import web
+
+from modules.llm import FakeBackend, FakeBackendError, LLMResponse
+
+
+def _payload(response: LLMResponse) -> dict:
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": response.text}]},
+                "finishReason": "STOP",
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": response.input_tokens,
+            "candidatesTokenCount": response.output_tokens,
+            "totalTokenCount": response.total_tokens,
+        },
+    }
+
+
+def _error(e: FakeBackendError) -> web.Response:
+    status = 429 if "429" in str(e) else 503
+    body = {"error": {"code": status, "message": str(e), "status": "UNAVAILABLE"}}
+    return web.json_response(body, status=status)
+
+
+def _parse_request(
+    request: web.Request, body: dict
+) -> tuple[str, str, dict, str | None]:
+    model = request.match_info["model"]
+    prompt = "".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    schema = body.get("generationConfig", {}).get("responseSchema", {})
+    system = "".join(
+        part.get("text", "")
+        for part in body.get("systemInstruction", {}).get("parts", [])
+    )
+    return model, prompt, schema, system or None
+
+
+def create_app(backend: FakeBackend) -> web.Application:
+    """Application aiohttp répondant comme l'API Gemini à l'aide de `backend`."""
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        model, prompt, schema, system = _parse_request(request, await request.json())
+        method = request.match_info["method"]
+
+        if method == "generateContent":
+            try:
+                response = await backend.generate(model, prompt, schema, system)
+            except FakeBackendError as e:
+                return _error(e)
+            return web.json_response(_payload(response))
+
+        if method == "streamGenerateContent":
+            stream = backend.stream(model, prompt, schema, system)
+            try:
+                first = await anext(stream)
+            except FakeBackendError as e:
+                return _error(e)
+            sse = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await sse.prepare(request)
+            await sse.write(f"data: {json.dumps(_payload(first))}\r\n\r\n".encode())
+            async for chunk in stream:
+                await sse.write(f"data: {json.dumps(_payload(chunk))}\r\n\r\n".encode())
+            await sse.write_eof()
+            return sse
+
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_post(r"/{version}/models/{model}:{method}", generate)
+    return app
+
+
+async def start_stub(
+    backend: FakeBackend, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """Démarre le serveur en tâche de fond et renvoie (runner, base_url)."""
+    runner = web.AppRunner(create_app(backend))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    backend = FakeBackend(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    runner, base_url = await start_stub(backend, args.host, args.port)
+    print(f"Serveur Gemini local à l'écoute sur {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
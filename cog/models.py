@@ -0,0 +1,94 @@
+import asyncio
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from modules.announcements import ai, is_owner
+from modules.model_catalog import GENERATE_ACTION, model_catalog
+from modules.model_selection import gemini_model
+from modules.splitter import split_message
+
+log = logging.getLogger("discord")
+
+
+def _tokens(count: int) -> str:
+    return f"{count:,}".replace(",", " ")
+
+
+class ModelsCog(commands.Cog):
+    """Catalogue des modèles Gemini, lu depuis le cache disque."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        self._task: asyncio.Task | None = None
+
+    async def cog_load(self) -> None:
+        # Le cache périmé est rafraîchi en arrière-plan, sans retarder le démarrage
+        if ai.backend and model_catalog.is_stale:
+            self._task = asyncio.create_task(self._refresh())
+
+    def cog_unload(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    async def _refresh(self) -> None:
+        if await model_catalog.refresh(ai.backend):
+            problem = model_catalog.check(gemini_model.current)
+            if problem:
+                log.warning(problem)
+
+    @app_commands.command(
+        name="models", description="Liste les modèles Gemini disponibles (en cache)."
+    )
+    @app_commands.describe(
+        action="Action que le modèle doit supporter (ex: generateContent).",
+        min_input="Limite minimale de tokens en entrée.",
+        min_output="Limite minimale de tokens en sortie.",
+        rafraichir="Redemande la liste à l'API Gemini au lieu du cache.",
+    )
+    @is_owner()
+    async def models(
+        self,
+        interaction: discord.Interaction,
+        action: str = GENERATE_ACTION,
+        min_input: int = 0,
+        min_output: int = 0,
+        rafraichir: bool = False,
+    ) -> None:
+        await interaction.response.defer(ephemeral=True)
+
+        if rafraichir or model_catalog.is_stale:
+            if not ai.backend:
+                await interaction.followup.send(
+                    "❌ Client Gemini non initialisé (Clé API manquante ?).",
+                    ephemeral=True,
+                )
+                return
+            await model_catalog.refresh(ai.backend, force=rafraichir)
+
+        matches = model_catalog.find(action or None, min_input, min_output)
+        if not matches:
+            await interaction.followup.send(
+                "Aucun modèle ne correspond à ces critères.", ephemeral=True
+            )
+            return
+
+        current = gemini_model.current
+        lines = [
+            f"**{len(matches)} modèle(s)** — catalogue mis à jour il y a {model_catalog.age / 60:.0f} min",
+            f"Modèle utilisé : `{current}`",
+            "",
+        ]
+        lines += [
+            f"{'✅' if model.name == current else '▫️'} `{model.name}` — "
+            f"{_tokens(model.input_token_limit)} / {_tokens(model.output_token_limit)} tokens"
+            for model in matches
+        ]
+        for chunk in split_message("\n".join(lines)):
+            await interaction.followup.send(chunk, ephemeral=True)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(ModelsCog(bot))
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from modules.announcements import is_owner
+from modules.announcements.publish import unschedule
+from modules.outbox import OutboxWorker, outbox
+from modules.schedule import format_paris
+
+log = logging.getLogger("discord")
+
+
+class OutboxCog(commands.Cog):
+    """Envoie en arrière-plan les annonces mises en file par /update et /patch-note."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        self.worker = OutboxWorker(outbox, bot.get_channel)
+        self._task: asyncio.Task | None = None
+
+    async def cog_load(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def cog_unload(self) -> None:
+        # Seule la boucle s'arrête : les envois en cours (outbox.in_flight) vont à
+        # leur terme et le worker suivant ne les relance pas
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        # Les salons ne sont résolus qu'une fois le cache du bot rempli ; les
+        # annonces interrompues par un redémarrage reprennent ici
+        await self.bot.wait_until_ready()
+        log.info("File d'envoi des annonces démarrée.")
+        await self.worker.run()
+
+    @app_commands.command(
+        name="programmees", description="Liste les annonces programmées."
+    )
+    @is_owner()
+    async def programmees(self, interaction: discord.Interaction) -> None:
+        scheduled = await outbox.scheduled()
+        if not scheduled:
+            await interaction.response.send_message(
+                "Aucune annonce programmée.", ephemeral=True
+            )
+            return
+
+        lines = [
+            f"• `{announcement.announcement_id}` — <t:{int(announcement.not_before)}:f>"
+            f" — {', '.join(f'<#{channel_id}>' for channel_id in announcement.channel_ids)}"
+            for announcement in scheduled
+        ]
+        lines.append("\nPour en annuler une : `/annuler-programmation`")
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(
+        name="annuler-programmation",
+        description="Annule une annonce programmée avant son envoi.",
+    )
+    @app_commands.describe(annonce="Identifiant de l'annonce (voir /programmees).")
+    @is_owner()
+    async def annuler_programmation(
+        self, interaction: discord.Interaction, annonce: str
+    ) -> None:
+        if await unschedule(annonce):
+            message = "🗑️ Annonce programmée annulée : rien ne sera envoyé."
+        else:
+            message = "❌ Annonce introuvable, ou son envoi a déjà commencé."
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @annuler_programmation.autocomplete("annonce")
+    async def _annonce_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(
+                name=f"{format_paris(announcement.not_before)} — {announcement.announcement_id}",
+                value=announcement.announcement_id,
+            )
+            for announcement in await outbox.scheduled()
+            if current in announcement.announcement_id
+        ][:25]
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(OutboxCog(bot))
@@ -12,6 +12,7 @@ from discord import app_commands
 from discord.ext import commands, tasks
 import pytz
 
+from modules.templates import templates
 import PARAM
 
 # --- Configuration du logging ---
@@ -33,6 +34,10 @@ COLOR_MAINTENANCE = 0x004AAD
 
 PARIS_TZ = pytz.timezone("Europe/Paris")
 DATA_FILE = "data/statut.json"
+# Langue des embeds de statut (formulations dans data/templates/statut.json).
+# Les titres doivent garder "en ligne" / "hors ligne" / "maintenance" :
+# _get_status_from_embed s'en sert pour relire le statut affiché.
+STATUS_LANGUAGE = "fr"
 
 # Statuts Discord considérés comme "en ligne"
 ONLINE_STATUSES = {discord.Status.online, discord.Status.idle, discord.Status.dnd}
@@ -150,12 +155,13 @@ class Statut(commands.Cog):
     ) -> discord.Message | None:
         """Crée un nouveau message de statut."""
         # On initialise avec un statut 'offline' par défaut pour commencer proprement
+        strings = templates.get("statut", STATUS_LANGUAGE)
         embed = discord.Embed(
-            title=f"{OFFLINE_EMOJI}・**Bot hors ligne**",
-            description="Le bot **Lyxios** est **hors ligne**.\n\n> Ne vous inquiétez pas, le bot reviendra en ligne !\n> Check ça pour savoir si le bot est `online` avant que je le dise ! https://status.xouxou-hosting.fr\n-# Merci de votre patience.",
+            title=strings["title_offline"](emoji=OFFLINE_EMOJI),
+            description=strings["description_offline"](),
             color=COLOR_OFFLINE,
         )
-        embed.set_footer(text="Initialisation du statut...")
+        embed.set_footer(text=strings["footer_init"]())
         try:
             message = await channel.send(embed=embed)
             self._message_id = message.id
@@ -171,37 +177,17 @@ class Statut(commands.Cog):
     ) -> discord.Embed:
         """Construit l'embed de statut correspondant."""
         now = datetime.datetime.now(PARIS_TZ).strftime("%d/%m/%Y %H:%M:%S")
-        descriptions = {
-            Status.ONLINE: (
-                "Le bot **Lyxios** est **en ligne** et toutes ses commandes et modules sont opérationnels !\n"
-                "> Check ça pour savoir si le bot est `offline` avant que je le dise ! https://status.xouxou-hosting.fr ."
-            ),
-            Status.OFFLINE: (
-                "Le bot **Lyxios** est **hors ligne**.\n\n"
-                "> Ne vous inquiétez pas, le bot reviendra en ligne !\n"
-                "> Check ça pour savoir si le bot est `online` avant que je le dise ! https://status.xouxou-hosting.fr\n"
-                "-# Merci de votre patience."
-            ),
-            Status.MAINTENANCE: (
-                "Le bot **Lyxios** est actuellement en **maintenance**.\n\n"
-                "> Il sera de retour dès que possible. Merci de votre compréhension."
-            ),
-        }
-        titles = {
-            Status.ONLINE: f"{ONLINE_EMOJI}・**Bot en ligne**",
-            Status.OFFLINE: f"{OFFLINE_EMOJI}・**Bot hors ligne**",
-            Status.MAINTENANCE: f"{MAINTENANCE_EMOJI}・**Bot en maintenance**",
-        }
-        description = descriptions[status]
+        strings = templates.get("statut", STATUS_LANGUAGE)
+        description = strings[f"description_{status.value}"]()
         if reason:
-            description += f"\n\n**Raison:** {reason}"
+            description += strings["reason"](reason=reason)
 
         embed = discord.Embed(
-            title=titles[status],
+            title=strings[f"title_{status.value}"](emoji=EMOJI_MAP[status]),
             description=description,
             color=COLOR_MAP[status],
         )
-        embed.set_footer(text=f"Mis à jour le: {now}")
+        embed.set_footer(text=strings["footer"](now=now))
         return embed
 
     async def _update_embed(
@@ -275,19 +261,22 @@ class Statut(commands.Cog):
     ) -> bool:
         """Envoie un log dans le salon dédié."""
         now = datetime.datetime.now(PARIS_TZ)
-        description = f"Le bot est maintenant **{status.value}**."
+        strings = templates.get("statut", STATUS_LANGUAGE)
+        description = strings["log_description"](status=status.value)
         if manual:
-            description += " *(défini manuellement)*"
+            description += strings["log_manual"]()
         if reason:
-            description += f"\n**Raison :** {reason}"
+            description += strings["log_reason"](reason=reason)
 
         log_embed = discord.Embed(
-            title=f"{EMOJI_MAP.get(status)}・Bot {status.value}",
+            title=strings["log_title"](
+                emoji=EMOJI_MAP.get(status), status=status.value
+            ),
             description=description,
             color=COLOR_MAP.get(status, COLOR_OFFLINE),
             timestamp=now,
         )
-        log_embed.set_footer(text="Changement de statut")
+        log_embed.set_footer(text=strings["log_footer"]())
 
         try:
             await logs_channel.send(embed=log_embed)
@@ -1,12 +1,13 @@
 from collections.abc import Callable
-import json
 import logging
 import re
+import sqlite3
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from modules.releases import release_store
 import PARAM
 
 # Configurez le logging
@@ -33,7 +34,7 @@ class Version(commands.Cog):
         self.bot = bot
 
     @app_commands.command(
-        name="version", description="Change la version du bot dans le json."
+        name="version", description="Change la version actuelle du bot."
     )
     @app_commands.describe(version="La version à définir pour le bot.")
     @is_owner()
@@ -46,18 +47,39 @@ class Version(commands.Cog):
             return
 
         try:
-            with open("data/version.json", "w") as f:
-                json.dump({"version": version}, f, indent=2)
-            logging.info(f"Version mise à jour vers : {version}")
+            await release_store.set(version)
             await interaction.response.send_message(
                 f"Version mise à jour vers : {version}", ephemeral=True
             )
-        except OSError as e:
+        except (sqlite3.Error, OSError) as e:
             logging.error(f"Impossible de sauvegarder la version : {e}")
             await interaction.response.send_message(
                 "Impossible de sauvegarder la version.", ephemeral=True
             )
 
+    @app_commands.command(
+        name="historique", description="Affiche les dernières versions publiées."
+    )
+    @app_commands.describe(nombre="Nombre de versions à afficher (10 par défaut).")
+    @is_owner()
+    async def historique(
+        self, interaction: discord.Interaction, nombre: int = 10
+    ) -> None:
+        releases = await release_store.history(max(1, min(nombre, 25)))
+        if not releases:
+            await interaction.response.send_message(
+                "Aucune version publiée pour le moment.", ephemeral=True
+            )
+            return
+
+        lines = [f"Version actuelle : **{release_store.current}**", ""]
+        lines += [
+            f"• **{release.version}** ({release.kind}) — <t:{int(release.released_at)}:f>"
+            f" — {sum(len(ids) for ids in release.message_ids.values())} message(s)"
+            for release in releases
+        ]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
 
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(Version(bot))
@@ -22,6 +22,15 @@ from flask import Flask
 import psutil
 import pytz
 
+from modules import media
+from modules.model_catalog import model_catalog
+from modules.model_selection import gemini_model
+from modules.outbox import outbox
+from modules.rate_limit import gemini_breaker, gemini_limiter
+from modules.release_queue import release_queue
+from modules.releases import release_store
+from modules.singleflight import gemini_flight
+from modules.view_registry import view_registry
 import PARAM  # Importe les variables de configuration depuis le fichier PARAM.py
 
 if False:
@@ -34,6 +43,8 @@ EXTENSIONS = [
     "cog.patch_note",
     "cog.version",
     "cog.monitoring",
+    "cog.outbox",
+    "cog.models",
 ]
 
 
@@ -115,6 +126,17 @@ async def before_change_status() -> None:
     await bot.wait_until_ready()
 
 
+@tasks.loop(count=1)
+async def restore_drafts() -> None:
+    """Inscrit les brouillons persistés : ils expirent comme ceux créés depuis."""
+    await view_registry.restore()
+
+
+@restore_drafts.before_loop
+async def before_restore_drafts() -> None:
+    await bot.wait_until_ready()
+
+
 # ---------------------------------------------------------------------------------------------------------------
 # ---------------------------------------------------------------------------------------------------------------
 # ---------------------------------------------------------------------------------------------------------------
@@ -202,6 +224,38 @@ async def ping_command(interaction: discord.Interaction) -> None:
     await interaction.edit_original_response("", embed=embed)
 
 
+def _gemini_section() -> str:
+    """Section /infos-tech : modèle, limiteur et coupe-circuit de l'API Gemini."""
+    limiter_state = gemini_limiter.snapshot()
+    breaker_state = gemini_breaker.snapshot()
+    breaker_str = f"{breaker_state['state']} ({breaker_state['failures']} échec(s))"
+    if breaker_state["retry_after"] > 0:
+        breaker_str += f", réessai dans {breaker_state['retry_after']:.0f}s"
+    return (
+        f"**API Gemini**\n"
+        f"> 🤖 Modèle: `{gemini_model.current}`\n"
+        f"> 🚦 Requêtes disponibles: `{limiter_state['requests_available']}/{limiter_state['requests_capacity']}` par minute\n"
+        f"> 🔢 Tokens disponibles: `{limiter_state['tokens_available']}/{limiter_state['tokens_capacity']}` par minute\n"
+        f"> ⏳ Appels en attente: `{limiter_state['waiting']}` (attente cumulée: `{limiter_state['total_wait']:.1f}s`)\n"
+        f"> 🔌 Coupe-circuit: `{breaker_str}`\n"
+        f"> ♻️ Requêtes mutualisées: `{gemini_flight.coalesced}` (en cours: `{len(gemini_flight)}`)\n"
+    )
+
+
+def _announcements_section() -> str:
+    """Section /infos-tech : brouillons d'annonces actifs et file de publication."""
+    drafts_state = view_registry.snapshot()
+    queue_state = release_queue.snapshot()
+    return (
+        f"**Annonces en attente**\n"
+        f"> 🗂️ Brouillons actifs: `{drafts_state['views']}/{drafts_state['max_views']}` (expirés: `{drafts_state['evicted']}`)\n"
+        f"> 📝 Textes en mémoire: `{drafts_state['memory_bytes'] / 1024:.1f} Ko`\n"
+        f"> 📎 Pièces jointes sur disque: `{drafts_state['attachment_bytes'] / (1024 * 1024):.2f} Mo`\n"
+        f"> 📤 File de publication: `{queue_state['depth']}` en attente, `{queue_state['busy_channels']}` salon(s) occupé(s)\n"
+        f"> ⏱️ Attente avant envoi (moy/p95/max): `{queue_state['avg_wait']:.1f}s / {queue_state['p95_wait']:.1f}s / {queue_state['max_wait']:.1f}s` sur `{queue_state['served']}` envoi(s)\n"
+    )
+
+
 # Nouvelle commande /infos-tech
 @bot.tree.command(
     name="infos-tech", description="Affiche les informations techniques du bot."
@@ -342,7 +396,10 @@ async def infos_tech_command(interaction: discord.Interaction) -> None:
         f"> 🌐 Hostname: `{platform.node()}`\n"
         f"> 📦 Distribution Linux: `{linux_distro_info}`\n"  # Nouvelle ligne (si Linux)
         f"> 📊 Espace Disque Système (Total/Libre): `{total_disk_system:.2f} Go / {free_disk_system:.2f} Go`\n\n"  # Nouvelle ligne
+        f"{_gemini_section()}\n"
+        f"{_announcements_section()}\n"
         f"**Versions**\n"
+        f"> 🏷️ Version du bot: `{release_store.current}`\n"
         f"> 🐍 Version de Python: `{python_version}`\n"
         f"> 📚 Version de discord.py: `{discord_py_version}`\n\n"
         f"**Statistiques du Bot**\n"
@@ -512,6 +569,19 @@ async def on_ready() -> None:
 # Cette partie est exécutée avant que bot.run() ne bloque le thread
 # et avant que l'événement on_ready ne soit déclenché par Discord.
 async def main() -> None:
+    # Choisir le modèle Gemini d'après le dernier benchmark (bench/bench_models.py)
+    if PARAM.GEMINI_AUTO_SELECT:
+        gemini_model.load(PARAM.GEMINI_BENCHMARK_FILE, PARAM.GEMINI_MIN_JSON_RATE)
+    # Vérification du modèle d'après le catalogue en cache (aucun appel réseau)
+    problem = model_catalog.check(gemini_model.current)
+    if problem:
+        print(f"⚠️ {problem} Vérifiez GEMINI_MODEL dans PARAM.py (/models).")
+
+    # Version actuelle gardée en mémoire pour les formulaires /update et /patch-note
+    await release_store.load()
+    # Les brouillons persistés sont repris une fois connecté, hors du démarrage
+    restore_drafts.start()
+
     # Charger les cogs
     for extension in EXTENSIONS:
         try:
@@ -529,9 +599,15 @@ async def main() -> None:
             traceback.print_exc()
 
     # Lancer le bot
-    await bot.start(
-        token
-    )  # Utilisation de bot.start() pour un contrôle plus fin avec asyncio
+    try:
+        await bot.start(
+            token
+        )  # Utilisation de bot.start() pour un contrôle plus fin avec asyncio
+    finally:
+        # Arrêter les processus de recompression des images
+        media.shutdown()
+        outbox.close()
+        release_store.close()
 
 
 if __name__ == "__main__":
@@ -1,32 +1,56 @@
-import os
+"""
+Écrit le catalogue des modèles Gemini dans `models/models.txt`.
+
+La liste provient du catalogue partagé avec le bot (modules/model_catalog.py) :
+elle n'est redemandée à l'API que si le cache est périmé, ou avec --refresh.
+
+    python -m models.list_models [--refresh]
+"""
+
+import argparse
+import asyncio
 from pathlib import Path
 import sys
 
 from dotenv import load_dotenv
-from google import genai
+
+from modules.llm import ModelInfo, create_backend
+from modules.model_catalog import model_catalog
 
 # Détermine le chemin absolu du dossier contenant ce script
 BASE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BASE_DIR.parent
 
-load_dotenv(dotenv_path=PROJECT_ROOT / ".env")
-api_key = os.getenv("GEMINI_API")
-if not api_key:
-    print(
-        "Erreur : GEMINI_API introuvable. Vérifiez votre fichier .env.",
-        file=sys.stderr,
-    )
-    sys.exit(1)
 
-client = genai.Client(api_key=api_key)
+async def _load_models(refresh: bool) -> list[ModelInfo] | None:
+    if refresh or model_catalog.is_stale:
+        load_dotenv(dotenv_path=PROJECT_ROOT / ".env")
+        backend = create_backend()
+        if not backend:
+            print(
+                "Erreur : GEMINI_API introuvable. Vérifiez votre fichier .env.",
+                file=sys.stderr,
+            )
+            return None
+        print("Récupération de la liste des modèles...")
+        await model_catalog.refresh(backend, force=refresh)
+    else:
+        print(
+            f"Catalogue en cache (mis à jour il y a {model_catalog.age / 60:.0f} min)."
+        )
+    return model_catalog.find(action=None)
 
 
 def main() -> None:
-    print("Récupération de la liste des modèles...")
-    try:
-        models = list(client.models.list())
-    except Exception as e:
-        print(f"Erreur lors de la connexion à l'API Gemini : {e}", file=sys.stderr)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Redemande la liste à l'API Gemini même si le cache est récent.",
+    )
+    models = asyncio.run(_load_models(parser.parse_args().refresh))
+    if not models:
+        print("Aucun modèle dans le catalogue.", file=sys.stderr)
         return
 
     def get_category(display_name: str) -> str:
@@ -57,9 +81,9 @@ def main() -> None:
 
     models.sort(
         key=lambda m: (
-            get_category(getattr(m, "display_name", "") or "N/A") == "other",
-            get_category(getattr(m, "display_name", "") or "N/A"),
-            getattr(m, "display_name", "") or "N/A",
+            get_category(m.display_name or "N/A") == "other",
+            get_category(m.display_name or "N/A"),
+            m.display_name or "N/A",
         )
     )
 
@@ -77,21 +101,18 @@ def main() -> None:
     last_category = None
 
     for m in models:
-        name = m.name.replace("models/", "")
-        display_name = getattr(m, "display_name", "") or "N/A"
+        name = m.name
+        display_name = m.display_name or "N/A"
 
         current_category = get_category(display_name)
         if last_category is not None and current_category != last_category:
             data.append([])
         last_category = current_category
 
-        input_limit = str(getattr(m, "input_token_limit", "N/A"))
-        output_limit = str(getattr(m, "output_token_limit", "N/A"))
-
-        desc = getattr(m, "description", "") or ""
-        desc = desc.replace("\n", " ").strip()
+        input_limit = str(m.input_token_limit or "N/A")
+        output_limit = str(m.output_token_limit or "N/A")
 
-        data.append([name, display_name, input_limit, output_limit, desc])
+        data.append([name, display_name, input_limit, output_limit, m.description])
 
     # Calcul des largeurs de colonnes
     col_widths = [len(h) for h in headers]
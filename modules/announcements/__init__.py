@@ -0,0 +1,49 @@
+"""
+Pipeline commun des annonces /update et /patch-note.
+
+Chaque étape a son module, partagé par les deux commandes :
+- ingest : formulaire de création et pièces jointes (`ingest.py`) ;
+- ai : correction et traductions avec un seul client Gemini (`ai.py`) ;
+- render : marqueurs et assemblage de la prévisualisation (`render.py`) ;
+- preview : message du canal test et ses boutons (`preview.py`) ;
+- publish : mise en file dans l'outbox (`publish.py`).
+
+Une commande n'est qu'une configuration : ses champs, ses messages et la mise
+en forme de ses annonces, déclarés en dérivant `AnnouncementModal` et
+`AnnouncementView`. Les étapes peuvent être redéfinies au besoin
+(`build_message`, `before_deploy`...).
+"""
+
+from collections.abc import Callable
+
+import discord
+from discord import app_commands
+
+from modules.announcements.fields import TextField
+from modules.announcements.ingest import AnnouncementModal
+from modules.announcements.preview import AnnouncementView, EditTextsModal
+import PARAM
+
+__all__ = [
+    "AnnouncementModal",
+    "AnnouncementView",
+    "EditTextsModal",
+    "TextField",
+    "is_owner",
+]
+
+
+def is_owner() -> Callable:
+    """
+    Vérifie si l'utilisateur qui exécute la commande est un propriétaire défini dans PARAM.owners.
+    """
+
+    async def predicate(interaction: discord.Interaction) -> bool:
+        if interaction.user.id not in PARAM.owners:
+            await interaction.response.send_message(
+                "Vous n'êtes pas autorisé à utiliser cette commande.", ephemeral=True
+            )
+            return False
+        return True
+
+    return app_commands.check(predicate)
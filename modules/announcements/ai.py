@@ -0,0 +1,481 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import contextlib
+import json
+import logging
+import time
+
+from modules.announcements.fields import TextField
+from modules.deadline import Deadline
+from modules.live_preview import LivePreview
+from modules.llm import LLMResponse, create_backend
+from modules.model_catalog import model_catalog
+from modules.model_selection import gemini_model
+from modules.rate_limit import estimate_tokens, gemini_breaker, gemini_limiter
+from modules.singleflight import gemini_flight, request_key
+from modules.structured_output import parse_structured
+import PARAM
+
+log = logging.getLogger("discord")
+
+# Moteur de génération (API Gemini, serveur local ou modèle factice selon
+# l'environnement). Un seul client pour /update et /patch-note : son pool de
+# connexions est partagé et survit au rechargement des cogs.
+backend = create_backend()
+
+# Langue dans laquelle les annonces sont rédigées (et corrigées)
+SOURCE_LANGUAGE = "fr"
+# Nombre maximal de traductions envoyées en parallèle à Gemini
+TRANSLATION_CONCURRENCY = 3
+
+# Noms des langues utilisés dans le prompt de traduction
+LANGUAGE_NAMES = {
+    "fr": "français",
+    "en": "anglais",
+    "es": "espagnol",
+    "de": "allemand",
+    "it": "italien",
+    "pt": "portugais",
+    "nl": "néerlandais",
+}
+
+# Consignes communes à tous les appels, envoyées en instruction système : chaque
+# requête ne contient plus que les textes à traiter, en JSON
+CORRECTION_SYSTEM = (
+    "Tu es un correcteur orthographique et grammatical expert du français. "
+    "Tu reçois un objet JSON {champ: texte}. Réponds avec un objet JSON "
+    "{corrected_<champ>: texte corrigé}.\n"
+    "Règles strictes :\n"
+    "1. Uniquement le texte corrigé, SANS titre, SANS préfixe et SANS guillemets supplémentaires.\n"
+    "2. PRÉSERVE la mise en forme, TOUS les sauts de ligne et les caractères spéciaux (&, ~, £).\n"
+    "3. NE CHANGE PAS les mots techniques, les noms propres ou les termes inconnus.\n"
+    "4. Ne change pas le sens des phrases."
+)
+TRANSLATION_SYSTEM = (
+    "Tu es un traducteur expert du français. Tu reçois un objet JSON "
+    '{"lang": langue cible, "texts": {champ: texte}}. Réponds avec un objet JSON '
+    "{champ: texte traduit}.\n"
+    "Règles strictes :\n"
+    "1. Uniquement le texte traduit, SANS titre, SANS préfixe et SANS guillemets supplémentaires.\n"
+    "2. PRÉSERVE la mise en forme et TOUS les sauts de ligne.\n"
+    "3. NE TRADUIS PAS les mots entre `code`, les variables, ni les emojis Discord (<:...:...>).\n"
+    "4. Garde les termes techniques sans traduction évidente."
+)
+
+# Callback recevant le texte partiel d'une réponse générée en streaming
+type PartialCallback = Callable[[str], Awaitable[None]]
+
+
+async def call_model(
+    prompt: str,
+    schema: dict,
+    on_partial: PartialCallback | None = None,
+    system: str | None = None,
+    deadline: Deadline | None = None,
+) -> dict | None:
+    """
+    Appelle l'API Gemini pour `prompt`, avec les consignes `system` envoyées en
+    instruction système.
+
+    Passé `deadline`, l'appel est abandonné (None) et aucune nouvelle tentative
+    n'est lancée.
+
+    Si `on_partial` est fourni, la réponse est générée en streaming et le callback
+    reçoit le texte accumulé au fur et à mesure de la génération.
+
+    Les appels identiques simultanés (double clic, deux propriétaires qui envoient
+    le même texte) sont mutualisés : un seul aller-retour vers l'API, dont le
+    résultat est partagé entre tous les appelants.
+    """
+    key = request_key(gemini_model.current, system, prompt, schema)
+    try:
+        async with deadline.timeout() if deadline else contextlib.nullcontext():
+            result = await gemini_flight.do(
+                key, lambda: _request(prompt, schema, on_partial, system, deadline)
+            )
+    except TimeoutError:
+        log.warning("Délai dépassé : réponse de l'API Gemini abandonnée.")
+        return None
+    # Copie pour que les appelants ne modifient pas le résultat partagé
+    return dict(result) if result is not None else None
+
+
+async def _stream(
+    prompt: str, schema: dict, on_partial: PartialCallback, system: str | None
+) -> LLMResponse:
+    """Génère la réponse en streaming et la transmet morceau par morceau à `on_partial`."""
+    parts = []
+    usage = LLMResponse("")
+    async for chunk in backend.stream(gemini_model.current, prompt, schema, system):
+        if chunk.total_tokens:
+            usage = chunk
+        if chunk.text:
+            parts.append(chunk.text)
+            await on_partial("".join(parts))
+    return LLMResponse("".join(parts), usage.input_tokens, usage.output_tokens)
+
+
+async def _request(
+    prompt: str,
+    schema: dict,
+    on_partial: PartialCallback | None = None,
+    system: str | None = None,
+    deadline: Deadline | None = None,
+) -> dict | None:
+    """
+    Envoie la requête à l'API Gemini avec une nouvelle tentative en cas d'échec.
+
+    Chaque appel passe par le limiteur partagé (requêtes/tokens par minute) et par
+    le coupe-circuit : tant que l'API est jugée indisponible, on abandonne
+    immédiatement au lieu d'attendre toute la série de tentatives.
+    """
+    if not backend:
+        log.error("Client Gemini non initialisé (Clé API manquante ?).")
+        return None
+
+    estimated_tokens = estimate_tokens((system or "") + prompt)
+    max_retries = 3
+    for attempt in range(max_retries):
+        if not gemini_breaker.allow():
+            log.warning(
+                f"API Gemini indisponible (coupe-circuit ouvert), nouvel essai possible dans {gemini_breaker.retry_after():.0f}s."
+            )
+            return None
+
+        await gemini_limiter.acquire(estimated_tokens)
+        started = time.monotonic()
+        try:
+            if on_partial is not None:
+                response = await _stream(prompt, schema, on_partial, system)
+            else:
+                response = await backend.generate(
+                    gemini_model.current, prompt, schema, system
+                )
+        except Exception as e:
+            gemini_breaker.record_failure()
+            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                log.warning(
+                    "Quota API Gemini atteint (429). Abandon de l'IA pour cette requête."
+                )
+                return None
+
+            log.error(f"Erreur API Gemini (tentative {attempt + 1}/{max_retries}): {e}")
+            if not await _backoff(attempt, deadline):
+                return None
+            continue
+
+        gemini_breaker.record_success()
+        log.info(
+            f"Requête Gemini ({gemini_model.current}) : {response.input_tokens} tokens en entrée "
+            f"(~{estimated_tokens} estimés), {response.output_tokens} en sortie, "
+            f"{time.monotonic() - started:.2f}s."
+        )
+        if response.total_tokens:
+            gemini_limiter.settle(estimated_tokens, response.total_tokens)
+
+        return _parse(response.text, schema)
+
+    log.error(f"Échec de l'appel à l'API Gemini après {max_retries} tentatives.")
+    return None
+
+
+async def _backoff(attempt: int, deadline: Deadline | None) -> bool:
+    """Attend avant la tentative suivante ; False si l'échéance ne le permet pas."""
+    delay = 2**attempt
+    if deadline and deadline.remaining() <= delay:
+        log.warning("Délai bientôt dépassé : pas de nouvelle tentative Gemini.")
+        return False
+    await asyncio.sleep(delay)
+    return True
+
+
+def _parse(text: str, schema: dict) -> dict | None:
+    """
+    Réponse validée d'après `schema`. Une réponse imparfaite est réparée plutôt
+    que jetée : seuls les champs manquants seront redemandés.
+    """
+    if not text:
+        log.warning("Structure de réponse de l'API Gemini inattendue.")
+        return None
+    output = parse_structured(text, schema)
+    if output.repairs:
+        log.info(f"Réponse Gemini réparée : {', '.join(output.repairs)}.")
+    if output.missing:
+        log.warning(
+            f"Champs manquants dans la réponse Gemini : {', '.join(output.missing)}"
+            f"\nRéponse reçue : {text}"
+        )
+    return output.data
+
+
+def _schema(keys: list[str]) -> dict:
+    return {
+        "type": "OBJECT",
+        "properties": {key: {"type": "STRING"} for key in keys},
+        "required": keys,
+    }
+
+
+def _split_text(text: str, limit: int) -> list[str]:
+    """
+    Découpe `text` aux sauts de ligne en morceaux d'environ `limit` caractères.
+    Recollés avec "\n", les morceaux redonnent exactement le texte d'origine.
+    """
+    pieces: list[str] = []
+    lines: list[str] = []
+    size = 0
+    for line in text.split("\n"):
+        if lines and size + len(line) > limit:
+            pieces.append("\n".join(lines))
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line) + 1
+    pieces.append("\n".join(lines))
+    return pieces
+
+
+def _batches(texts: dict[str, str], budget: int) -> list[dict[str, str]]:
+    """
+    Répartit les textes non vides en lots d'environ `budget` tokens estimés :
+    les champs courts partagent une même requête, un champ trop long est découpé
+    en plusieurs morceaux envoyés dans des requêtes séparées.
+    """
+    batches: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    used = 0
+    for name, text in texts.items():
+        if not text:
+            continue
+        for piece in _split_text(text, budget * 4):
+            tokens = estimate_tokens(piece)
+            if current and (name in current or used + tokens > budget):
+                batches.append(current)
+                current, used = {}, 0
+            current[name] = piece
+            used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def correction_request(batch: dict[str, str]) -> tuple[str, dict]:
+    """Texte et schéma d'une requête de correction (consignes : CORRECTION_SYSTEM)."""
+    keys = [f"corrected_{name}" for name in batch]
+    return json.dumps(batch, ensure_ascii=False), _schema(keys)
+
+
+def translation_request(batch: dict[str, str], language: str) -> tuple[str, dict]:
+    """Texte et schéma d'une requête de traduction (consignes : TRANSLATION_SYSTEM)."""
+    payload = {"lang": LANGUAGE_NAMES.get(language, language), "texts": batch}
+    return json.dumps(payload, ensure_ascii=False), _schema(list(batch))
+
+
+async def _call_batches(
+    batches: list[dict[str, str]],
+    request: Callable[[dict[str, str]], tuple[str, dict]],
+    system: str,
+    on_partial: PartialCallback | None,
+    deadline: Deadline | None,
+) -> list[dict | None]:
+    """
+    Envoie les lots en parallèle. En streaming, `on_partial` reçoit la
+    concaténation des réponses partielles de tous les lots.
+
+    Si une réponse est incomplète, seuls les champs manquants sont redemandés
+    (une fois), au lieu de refaire tout l'aller-retour.
+    """
+    partials = [""] * len(batches)
+
+    def callback(index: int) -> PartialCallback | None:
+        if on_partial is None:
+            return None
+
+        async def update(text: str) -> None:
+            partials[index] = text
+            await on_partial("\n".join(partial for partial in partials if partial))
+
+        return update
+
+    async def run(index: int, batch: dict[str, str]) -> dict | None:
+        prompt, schema = request(batch)
+        result = await call_model(prompt, schema, callback(index), system, deadline)
+        if result is None:
+            return None
+        missing = [
+            name
+            for name, key in zip(batch, schema["required"], strict=True)
+            if not result.get(key)
+        ]
+        if missing and not (deadline and deadline.expired):
+            log.info(
+                f"Nouvelle demande des seuls champs manquants : {', '.join(missing)}."
+            )
+            retry = await call_model(
+                *request({name: batch[name] for name in missing}),
+                system=system,
+                deadline=deadline,
+            )
+            result.update({key: value for key, value in (retry or {}).items() if value})
+        return result
+
+    if len(batches) > 1:
+        log.info(
+            f"Texte trop long pour une seule requête : découpé en {len(batches)} lots."
+        )
+    return await asyncio.gather(
+        *(run(index, batch) for index, batch in enumerate(batches))
+    )
+
+
+def _merge(
+    batches: list[dict[str, str]],
+    results: list[dict],
+    key: Callable[[str], str],
+    keep_input: bool = False,
+) -> dict[str, str]:
+    """
+    Recolle, champ par champ, les morceaux traités séparément. Un morceau resté
+    sans réponse est vide, ou repris tel quel du texte envoyé si `keep_input`.
+    """
+    merged: dict[str, list[str]] = {}
+    for batch, result in zip(batches, results, strict=True):
+        for name, piece in batch.items():
+            merged.setdefault(name, []).append(
+                result.get(key(name)) or (piece if keep_input else "")
+            )
+    return {name: "\n".join(pieces) for name, pieces in merged.items()}
+
+
+def request_token_budget() -> int:
+    """
+    Taille maximale (en tokens estimés) des textes envoyés dans une requête :
+    au-delà, ils sont découpés en plusieurs requêtes traitées en parallèle.
+
+    PARAM.GEMINI_MAX_REQUEST_TOKENS, réduit d'après les limites du modèle dans
+    le catalogue : la réponse est à peu près aussi longue que les textes, la
+    moitié de la plus petite limite laisse la place aux consignes et au JSON.
+    """
+    budget = PARAM.GEMINI_MAX_REQUEST_TOKENS
+    model = model_catalog.get(gemini_model.current)
+    if model is not None:
+        limits = [
+            limit
+            for limit in (model.input_token_limit, model.output_token_limit)
+            if limit > 0
+        ]
+        if limits:
+            budget = min(budget, min(limits) // 2)
+    return budget
+
+
+async def correct_texts(
+    texts: dict,
+    fields: tuple[TextField, ...],
+    on_partial: PartialCallback | None = None,
+    deadline: Deadline | None = None,
+) -> dict:
+    """
+    Corrige les champs `fields` du texte français en utilisant l'API Gemini.
+    Le texte original est conservé si la correction échoue ou dépasse `deadline`.
+    """
+    batches = _batches(
+        {field.name: texts.get(field.name, "") for field in fields},
+        request_token_budget(),
+    )
+    if not batches:
+        return texts
+
+    results = await _call_batches(
+        batches,
+        correction_request,
+        CORRECTION_SYSTEM,
+        on_partial,
+        deadline,
+    )
+    if all(results):
+        log.info("Correction française réussie.")
+        corrected = _merge(
+            batches, results, lambda name: f"corrected_{name}", keep_input=True
+        )
+        return {
+            field.name: corrected.get(field.name) or texts[field.name]
+            for field in fields
+        }
+    log.warning("Échec de la correction, utilisation du texte original.")
+    return texts
+
+
+async def translate_texts(
+    texts: dict,
+    fields: tuple[TextField, ...],
+    language: str,
+    on_partial: PartialCallback | None = None,
+    deadline: Deadline | None = None,
+) -> dict:
+    """Traduit les champs `fields` dans la langue `language` avec l'API Gemini."""
+    keys = [field.name for field in fields]
+    batches = _batches(
+        {key: texts.get(key, "") for key in keys}, request_token_budget()
+    )
+    if not batches:
+        return dict.fromkeys(keys, "")
+
+    results = await _call_batches(
+        batches,
+        lambda batch: translation_request(batch, language),
+        TRANSLATION_SYSTEM,
+        on_partial,
+        deadline,
+    )
+    if all(results):
+        log.info(f"Traduction ({language}) réussie.")
+        translated = _merge(batches, results, lambda name: name)
+        return {key: translated.get(key, "") for key in keys}
+    log.error(f"Échec de la traduction ({language}).")
+    return dict.fromkeys(keys, "")
+
+
+async def translate_all(
+    texts: dict,
+    fields: tuple[TextField, ...],
+    preview: LivePreview | None = None,
+    deadline: Deadline | None = None,
+) -> dict[str, dict]:
+    """
+    Traduit le texte source dans toutes les langues de PARAM.UPDATE_LANGUAGES.
+
+    Les traductions sont lancées en parallèle (bornées par un sémaphore) : ajouter
+    une langue n'ajoute pas d'aller-retour séquentiel vers le modèle.
+    """
+    languages = [lang for lang in PARAM.UPDATE_LANGUAGES if lang != SOURCE_LANGUAGE]
+    semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+
+    async def translate(language: str) -> dict:
+        on_partial = preview.callback(language.upper()) if preview else None
+        async with semaphore:
+            return await translate_texts(
+                texts, fields, language, on_partial, deadline=deadline
+            )
+
+    results = await asyncio.gather(*(translate(lang) for lang in languages))
+    return dict(zip(languages, results, strict=True))
+
+
+def localized_texts(corrected_texts: dict, translations: dict[str, dict]) -> dict:
+    """Associe à chaque langue configurée le texte à publier, dans l'ordre de PARAM."""
+    return {
+        lang: corrected_texts if lang == SOURCE_LANGUAGE else translations[lang]
+        for lang in PARAM.UPDATE_LANGUAGES
+    }
+
+
+def failed_languages(
+    translations: dict[str, dict], fields: tuple[TextField, ...]
+) -> list[str]:
+    """Langues dont la traduction n'a pas rempli tous les champs obligatoires."""
+    required = [field.name for field in fields if field.required]
+    return [
+        language.upper()
+        for language, texts in translations.items()
+        if not all(texts.get(name) for name in required)
+    ]
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TextField:
+    """
+    Champ texte d'une annonce (titre, changements...). Le libellé sert à la fois
+    au formulaire d'édition et aux prompts de correction et de traduction.
+    """
+
+    name: str
+    label: str
+    required: bool = True
+    paragraph: bool = True
+    max_length: int | None = None
@@ -0,0 +1,187 @@
+import abc
+import asyncio
+import logging
+
+import discord
+from discord import ui
+
+from modules.announcements import ai
+from modules.announcements.preview import AnnouncementView
+from modules.attachments import (
+    HostedAttachment,
+    SpoolReport,
+    attachment_store,
+    spool_attachments,
+    upload_once,
+)
+from modules.deadline import Deadline
+from modules.live_preview import LivePreview
+from modules.rate_limit import gemini_breaker
+import PARAM
+
+log = logging.getLogger("discord")
+
+# Part du temps restant accordée à la correction : étape la moins importante,
+# abandonnée la première (le texte original est alors utilisé)
+CORRECTION_SHARE = 0.4
+# Secondes toujours gardées pour l'envoi de la prévisualisation
+PREVIEW_RESERVE = 10.0
+
+
+class AnnouncementModal(ui.Modal, abc.ABC):
+    """
+    Formulaire de création d'une annonce. À la soumission, le texte passe par
+    toutes les étapes jusqu'à la prévisualisation : pièces jointes, correction et
+    traductions, rendu, envoi dans le canal test.
+
+    Chaque commande en dérive en déclarant ses champs, `view_type`,
+    `original_texts` et `create_view`.
+    """
+
+    view_type: type[AnnouncementView]
+    preparing = "🚀 Préparation de l'annonce..."
+    processing = "✨ Correction et traduction du contenu..."
+
+    def __init__(self, attachments: list[discord.Attachment]) -> None:
+        super().__init__()
+        self.attachments = attachments
+
+    @abc.abstractmethod
+    def original_texts(self) -> dict:
+        """Textes saisis dans le formulaire, dans la langue source."""
+
+    @abc.abstractmethod
+    def create_view(
+        self,
+        texts: dict[str, dict],
+        draft_id: str,
+        interaction: discord.Interaction,
+        uploaded: list[HostedAttachment],
+    ) -> AnnouncementView:
+        """Vue de prévisualisation de l'annonce préparée."""
+
+    async def _notify(
+        self, followup: discord.WebhookMessage, content: str, deadline: Deadline
+    ) -> None:
+        """Affiche un avertissement, laissé lisible 2 s si l'échéance le permet."""
+        await followup.edit(content=content)
+        await asyncio.sleep(
+            min(2.0, deadline.share(reserve=PREVIEW_RESERVE).remaining())
+        )
+
+    async def _spooled(
+        self, download: asyncio.Task, draft_id: str, deadline: Deadline
+    ) -> SpoolReport:
+        """Bilan du téléchargement des pièces jointes, abandonné à l'échéance."""
+        try:
+            async with deadline.timeout():
+                return await download
+        except TimeoutError:
+            attachment_store.release(draft_id)
+            return SpoolReport(errors=["délai dépassé, toutes les pièces jointes."])
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        """Gère la soumission du modal."""
+        # Toutes les étapes partagent une seule échéance : la prévisualisation
+        # arrive dans les PARAM.PREVIEW_DEADLINE secondes, quitte à être dégradée
+        deadline = Deadline(PARAM.PREVIEW_DEADLINE)
+        await interaction.response.send_message(self.preparing, ephemeral=True)
+        followup = await interaction.original_response()
+        await followup.edit(content=self.processing)
+
+        # Les pièces jointes sont téléchargées en parallèle (et pendant la correction),
+        # puis écrites sur disque le temps de la prévisualisation
+        draft_id = str(interaction.id)
+        download = asyncio.create_task(spool_attachments(draft_id, self.attachments))
+
+        original_texts = self.original_texts()
+        fields = self.view_type.fields
+
+        # Le texte corrigé puis traduit s'affiche au fil de la génération. La
+        # correction, moins importante, est abandonnée la première
+        preview = LivePreview(followup, header=self.processing)
+        corrected_texts = await ai.correct_texts(
+            original_texts,
+            fields,
+            on_partial=preview.callback("Correction (FR)"),
+            deadline=deadline.share(CORRECTION_SHARE, reserve=PREVIEW_RESERVE),
+        )
+        translations = await ai.translate_all(
+            corrected_texts,
+            fields,
+            preview=preview,
+            deadline=deadline.share(reserve=PREVIEW_RESERVE),
+        )
+        await preview.flush()
+        # Le message de suivi passe aux statuts suivants (envoi, prévisualisation)
+        preview.close()
+
+        # Rien à signaler pour un texte vide (patch note sans message)
+        if any(original_texts.values()):
+            failed = ai.failed_languages(translations, fields)
+            if gemini_breaker.is_open:
+                await self._notify(
+                    followup,
+                    f"⚠️ L'API Gemini est indisponible (nouvel essai possible dans {gemini_breaker.retry_after():.0f}s). Le texte original est utilisé sans correction ni traduction.",
+                    deadline,
+                )
+            elif failed:
+                await self._notify(
+                    followup,
+                    f"⚠️ La traduction a échoué ({', '.join(failed)}). Ces messages seront incomplets.",
+                    deadline,
+                )
+
+        spool_report = await self._spooled(
+            download, draft_id, deadline.share(reserve=PREVIEW_RESERVE)
+        )
+        if spool_report.errors:
+            await self._notify(
+                followup,
+                "⚠️ Pièces jointes ignorées :\n"
+                + "\n".join(f"- {error}" for error in spool_report.errors),
+                deadline,
+            )
+
+        texts = ai.localized_texts(corrected_texts, translations)
+
+        await followup.edit(
+            content="📤 Envoi de la prévisualisation sur le canal test..."
+        )
+
+        if not interaction.guild:
+            attachment_store.release(draft_id)
+            await followup.edit(content="❌ Erreur: Serveur introuvable.")
+            return
+
+        test_channel = interaction.guild.get_channel(PARAM.UPDATE_CHANNEL_ID_TEST)
+        if not test_channel:
+            attachment_store.release(draft_id)
+            await followup.edit(
+                content="❌ Erreur: Le canal de test est introuvable. Vérifiez l'ID dans PARAM.py."
+            )
+            return
+
+        # Les pièces jointes sont uploadées une seule fois : la prévisualisation et
+        # les publications réutilisent ensuite les URL du CDN Discord. Passé
+        # l'échéance, la prévisualisation part sans elles.
+        note = spool_report.saved_note()
+        try:
+            async with deadline.share(reserve=PREVIEW_RESERVE / 2).timeout():
+                uploaded = await upload_once(
+                    test_channel, attachment_store.files(draft_id)
+                )
+        except TimeoutError:
+            attachment_store.release(draft_id)
+            uploaded = []
+            note = "\n⚠️ Pièces jointes ignorées : délai d'envoi dépassé."
+        view = self.create_view(texts, draft_id, interaction, uploaded)
+        await view.send_preview(test_channel)
+        if deadline.expired:
+            log.warning(
+                f"Prévisualisation envoyée après l'échéance ({PARAM.PREVIEW_DEADLINE}s)."
+            )
+
+        await followup.edit(
+            content="🎉 Prévisualisation envoyée ! Vérifiez le canal test." + note
+        )
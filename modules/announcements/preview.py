@@ -0,0 +1,423 @@
+import abc
+from collections.abc import Callable
+import contextlib
+import logging
+import sqlite3
+import time
+from typing import Self
+
+import discord
+from discord import ui
+
+from modules.announcements.fields import TextField
+from modules.announcements.publish import confirmation, discard, publish
+from modules.announcements.render import build_preview, preview_cache
+from modules.attachments import (
+    HostedAttachment,
+    attachment_embeds,
+    attachment_store,
+    files_to_reupload,
+    refresh_hosted,
+)
+from modules.drafts import Draft, draft_store
+from modules.outbox import Delivery
+from modules.release_queue import release_queue
+from modules.releases import VersionBumpError, release_store
+from modules.schedule import ScheduleModal, format_paris
+from modules.splitter import split_message
+from modules.templates import templates
+from modules.view_registry import view_registry
+import PARAM
+
+log = logging.getLogger("discord")
+
+
+class EditTextsModal(ui.Modal):
+    """Modal pour éditer les textes d'une annonce dans une langue."""
+
+    def __init__(self, view: AnnouncementView, language: str) -> None:
+        super().__init__(title=view.edit_title.format(language=language.upper()))
+        self.language = language
+        self.view_ref = view
+
+        texts = view.texts.get(language, {})
+        self.inputs: dict[str, ui.TextInput] = {}
+        for field in view.fields:
+            text_input = ui.TextInput(
+                label=field.label,
+                default=texts.get(field.name, ""),
+                style=(
+                    discord.TextStyle.paragraph
+                    if field.paragraph
+                    else discord.TextStyle.short
+                ),
+                required=field.required,
+                max_length=field.max_length,
+            )
+            self.inputs[field.name] = text_input
+            self.add_item(text_input)
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        self.view_ref.texts[self.language] = {
+            name: text_input.value for name, text_input in self.inputs.items()
+        }
+        await self.view_ref.refresh_message(interaction)
+
+
+class AnnouncementView(ui.View, abc.ABC):
+    """
+    Prévisualisation d'une annonce dans le canal test, avec ses boutons
+    (Éditer par langue, Envoyer Production, Programmer, Annuler).
+
+    Chaque commande en dérive et ne fournit que sa configuration : `kind`,
+    `fields`, les messages affichés et `build_message`.
+    """
+
+    # Type de brouillon, préfixe des custom_id et domaine des modèles de texte
+    kind: str
+    fields: tuple[TextField, ...]
+    # Titre du formulaire d'édition ({language} : code de la langue)
+    edit_title = "Éditer texte ({language})"
+    cancelled_message = "❌ Annonce annulée."
+    # Mention du rôle supprimée juste après l'envoi (sinon placée en tête)
+    ghost_ping = False
+
+    def __init__(
+        self,
+        texts: dict[str, dict],
+        draft_id: str | None,
+        original_interaction: discord.Interaction | None = None,
+        uploaded: list[HostedAttachment] | None = None,
+        version: str | None = None,
+    ) -> None:
+        super().__init__(timeout=None)
+        self.texts = texts  # {langue: textes}
+        self.version = version
+        # Identifiant du brouillon persisté (None pour la vue enregistrée au démarrage)
+        self.draft_id = draft_id
+        # Pièces jointes déjà hébergées par Discord (uploadées une seule fois)
+        self.uploaded = uploaded or []
+        self.original_interaction = original_interaction
+        self.message_id: int | None = None
+        self.created_at = time.time()
+
+        # Les custom_id sont stables pour que les boutons survivent à un redémarrage
+        self.send_prod.custom_id = f"{self.kind}:send"
+        self.schedule.custom_id = f"{self.kind}:schedule"
+        self.cancel.custom_id = f"{self.kind}:cancel"
+
+        # Un bouton d'édition par langue, "Annuler" reste en dernier
+        self.remove_item(self.cancel)
+        for language in texts:
+            button = ui.Button(
+                label=f"Éditer {language.upper()}",
+                style=discord.ButtonStyle.blurple,
+                custom_id=f"{self.kind}:edit:{language}",
+            )
+            button.callback = self._make_edit_callback(language)
+            self.add_item(button)
+        self.add_item(self.cancel)
+
+    @classmethod
+    def persistent(cls) -> Self:
+        """Vue enregistrée au démarrage : retrouve le brouillon du message cliqué."""
+        return cls({language: {} for language in PARAM.UPDATE_LANGUAGES}, None)
+
+    @classmethod
+    def from_draft(cls, draft: Draft) -> Self:
+        view = cls(
+            draft.texts, draft.draft_id, uploaded=draft.uploaded, version=draft.version
+        )
+        view.message_id = draft.message_id
+        view.created_at = draft.created_at
+        return view
+
+    # --- Configuration propre à chaque type d'annonce ---
+
+    @abc.abstractmethod
+    def build_message(self, texts: dict, language: str) -> str:
+        """Contenu publié dans la langue `language`."""
+
+    def deployed_message(self) -> str:
+        return "✅ Annonce publiée !"
+
+    def scheduled_message(self, when: str) -> str:
+        return (
+            f"📅 Annonce programmée pour le {when} (heure de Paris).\n"
+            f"Pour l'annuler : `/annuler-programmation annonce:{self.draft_id}`"
+        )
+
+    async def before_deploy(
+        self, interaction: discord.Interaction, not_before: float | None = None
+    ) -> bool:
+        """
+        Étape exécutée avant la mise en file ; False annule l'envoi.
+        Une annonce versionnée est ajoutée à l'historique des publications.
+        """
+        if not self.version:
+            return True
+        try:
+            # Programmée : la version ne devient actuelle qu'à l'envoi
+            await release_store.record(
+                self.kind,
+                self.version,
+                self.texts,
+                self.draft_id,
+                not_before,
+                scheduled=not_before is not None,
+            )
+        except VersionBumpError as e:
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+            return False
+        except (sqlite3.Error, OSError) as e:
+            log.error(f"Erreur sauvegarde version: {e}")
+            await interaction.followup.send(
+                f"❌ Erreur lors de la sauvegarde de la version: {e}", ephemeral=True
+            )
+            return False
+        return True
+
+    # --- Brouillon ---
+
+    async def resolve(self, interaction: discord.Interaction) -> Self | None:
+        """Vue liée au brouillon du message, chargé à la demande après un redémarrage."""
+        if self.draft_id is not None:
+            view_registry.touch(self.draft_id)
+            return self
+        draft = None
+        if interaction.message:
+            draft = await draft_store.find_by_message(interaction.message.id)
+        if draft is None or draft.kind != self.kind:
+            await interaction.response.send_message(
+                "❌ Ce brouillon est introuvable (déjà publié ou annulé ?).",
+                ephemeral=True,
+            )
+            return None
+        view = type(self).from_draft(draft)
+        await view_registry.track(view.draft_id, view, interaction.message)
+        return view
+
+    async def save(self, message_id: int | None = None) -> None:
+        """Enregistre le brouillon (et le message qui porte les boutons)."""
+        if message_id is not None:
+            self.message_id = message_id
+        await draft_store.save(
+            Draft(
+                self.draft_id,
+                self.kind,
+                self.texts,
+                version=self.version,
+                uploaded=self.uploaded,
+                message_id=self.message_id,
+                created_at=self.created_at,
+            )
+        )
+
+    def _make_edit_callback(self, language: str) -> Callable:
+        async def edit(interaction: discord.Interaction) -> None:
+            view = await self.resolve(interaction)
+            if view is None:
+                return
+            await interaction.response.send_modal(EditTextsModal(view, language))
+
+        return edit
+
+    # --- Prévisualisation ---
+
+    def preview_chunks(self) -> list[str]:
+        """
+        Prévisualisation découpée, mémoïsée : inutile de tout reconstruire si les
+        textes n'ont pas changé. La révision des modèles fait partie de la clé :
+        un texte modifié dans data/templates/ invalide les rendus existants.
+        """
+        return preview_cache.get(
+            [self.kind, self.texts, self.version, templates.revision(self.kind)],
+            lambda: split_message(build_preview(self.texts, self.build_message)),
+        )
+
+    def attachment_kwargs(self) -> dict:
+        """
+        Images référencées par leur URL CDN, et seuls les fichiers non affichables
+        en embed relus depuis le disque (les objets File sont consommés à l'envoi).
+        """
+        kwargs = {}
+        embeds = attachment_embeds(self.uploaded)
+        if embeds:
+            kwargs["embeds"] = embeds
+        files = files_to_reupload(attachment_store.files(self.draft_id), self.uploaded)
+        if files:
+            kwargs["files"] = files
+        return kwargs
+
+    async def send_preview(self, channel: discord.abc.Messageable) -> None:
+        """
+        Envoie la prévisualisation ; la vue et les images vont au dernier message.
+        Une prévisualisation envoyée au même moment attend son tour : leurs
+        morceaux ne se mélangent pas dans le canal test.
+        """
+        chunks = self.preview_chunks()
+        async with release_queue.turn(channel.id):
+            for chunk in chunks[:-1]:
+                await channel.send(content=chunk)
+            message = await channel.send(
+                content=chunks[-1], view=self, **self.attachment_kwargs()
+            )
+        # Le brouillon est persisté : les boutons fonctionnent après un redémarrage
+        await self.save(message.id)
+        await view_registry.track(self.draft_id, self, message)
+
+    async def refresh_message(self, interaction: discord.Interaction) -> None:
+        """Met à jour le message de test avec les nouvelles données."""
+        chunks = self.preview_chunks()
+
+        # Si un seul morceau, on édite simplement le message existant : les images
+        # et pièces jointes déjà présentes sont conservées telles quelles
+        if len(chunks) == 1:
+            if not interaction.response.is_done():
+                await interaction.response.edit_message(content=chunks[0], view=self)
+            else:
+                await interaction.edit_original_response(content=chunks[0], view=self)
+            await self.save()
+            return
+
+        # Si plusieurs morceaux, on doit supprimer l'ancien message et en envoyer de nouveaux
+        # car on ne peut pas transformer un message en plusieurs via edit
+        if not interaction.response.is_done():
+            await interaction.response.defer()
+
+        # Supprimer l'ancien message (celui qui contient les boutons)
+        if interaction.message:
+            with contextlib.suppress(discord.HTTPException, discord.Forbidden):
+                await interaction.message.delete()
+
+        channel = interaction.channel
+        if not channel:
+            # Fallback (peu probable)
+            await interaction.followup.send(
+                "❌ Erreur: Canal introuvable pour le rafraîchissement.", ephemeral=True
+            )
+            return
+
+        await self.send_preview(channel)
+
+    def _disable_buttons(self, disabled: bool = True) -> None:
+        for child in self.children:
+            if isinstance(child, ui.Button):
+                child.disabled = disabled
+
+    # --- Publication ---
+
+    @ui.button(label="Envoyer Production", style=discord.ButtonStyle.green)
+    async def send_prod(
+        self, interaction: discord.Interaction, button: ui.Button
+    ) -> None:
+        view = await self.resolve(interaction)
+        if view is None:
+            return
+
+        await interaction.response.defer()
+        await view.deploy(interaction)
+
+    @ui.button(label="Programmer", style=discord.ButtonStyle.grey)
+    async def schedule(
+        self, interaction: discord.Interaction, button: ui.Button
+    ) -> None:
+        view = await self.resolve(interaction)
+        if view is None:
+            return
+        await interaction.response.send_modal(ScheduleModal(view.schedule_at))
+
+    async def schedule_at(
+        self, interaction: discord.Interaction, not_before: float
+    ) -> None:
+        await interaction.response.defer()
+        await self.deploy(interaction, not_before)
+
+    def delivery(self, channel: discord.TextChannel, message: str) -> Delivery:
+        """Envoi d'une langue : message découpé, publié si le salon est une annonce."""
+        mention = f"<@&{PARAM.UPDATE_ROLE_ID}>"
+        if self.ghost_ping:
+            return Delivery(
+                channel.id,
+                split_message(message),
+                channel.is_news(),
+                ghost_ping=mention,
+            )
+        return Delivery(
+            channel.id, split_message(f"{mention}\n{message}"), channel.is_news()
+        )
+
+    def _deliveries(self, guild: discord.Guild) -> list[Delivery]:
+        deliveries = []
+        for language, lang_texts in self.texts.items():
+            # Un brouillon restauré peut viser une langue retirée de PARAM depuis
+            channel_id = PARAM.UPDATE_LANGUAGES.get(language)
+            channel = channel_id and guild.get_channel(channel_id)
+            if not channel:
+                log.error(f"Salon introuvable pour la langue {language}.")
+                continue
+            message = self.build_message(lang_texts, language)
+            deliveries.append(self.delivery(channel, message))
+        return deliveries
+
+    async def _keep_draft(self, interaction: discord.Interaction) -> None:
+        """Envoi annulé : l'annonce reste en brouillon, les boutons redeviennent utilisables."""
+        self._disable_buttons(False)
+        await interaction.edit_original_response(view=self)
+
+    async def deploy(
+        self, interaction: discord.Interaction, not_before: float | None = None
+    ) -> None:
+        """Met l'annonce en file : envoi immédiat, ou à `not_before` si programmée."""
+        if not interaction.guild:
+            await interaction.followup.send(
+                "❌ Erreur: Serveur introuvable.", ephemeral=True
+            )
+            return
+
+        # Boutons désactivés pour éviter un double envoi
+        self._disable_buttons()
+        await interaction.edit_original_response(view=self)
+
+        # Les URL des images expirent : elles sont rafraîchies juste avant l'envoi
+        self.uploaded = await refresh_hosted(
+            interaction.guild, self.draft_id, self.uploaded
+        )
+
+        # Aucun salon valide : rien ne partirait, la version n'est pas enregistrée
+        deliveries = self._deliveries(interaction.guild)
+        if not deliveries:
+            await interaction.followup.send(
+                "❌ Erreur: Aucun salon d'annonce trouvé (vérifiez UPDATE_LANGUAGES dans PARAM.py).",
+                ephemeral=True,
+            )
+            await self._keep_draft(interaction)
+            return
+
+        if not await self.before_deploy(interaction, not_before):
+            await self._keep_draft(interaction)
+            return
+
+        await publish(self.draft_id, deliveries, self.uploaded, not_before)
+
+        if not_before is not None:
+            await interaction.followup.send(
+                self.scheduled_message(format_paris(not_before)), ephemeral=True
+            )
+            return
+
+        await interaction.followup.send(
+            await confirmation(self.draft_id, self.deployed_message()), ephemeral=True
+        )
+
+    @ui.button(label="Annuler", style=discord.ButtonStyle.red)
+    async def cancel(self, interaction: discord.Interaction, button: ui.Button) -> None:
+        view = await self.resolve(interaction)
+        if view is None:
+            return
+
+        await interaction.response.send_message(self.cancelled_message, ephemeral=True)
+        view._disable_buttons()
+        if interaction.message:
+            await interaction.message.edit(view=view)
+        await discard(view.draft_id)
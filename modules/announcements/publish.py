@@ -0,0 +1,57 @@
+from modules.attachments import HostedAttachment, attachment_store, spooled_to_reupload
+from modules.drafts import draft_store
+from modules.outbox import Delivery, outbox
+from modules.releases import release_store
+from modules.view_registry import view_registry
+import PARAM
+
+
+async def discard(draft_id: str) -> None:
+    """Oublie un brouillon publié ou annulé (pièces jointes, fichier, vue)."""
+    attachment_store.release(draft_id)
+    await draft_store.delete(draft_id)
+    view_registry.forget(draft_id)
+
+
+async def publish(
+    draft_id: str,
+    deliveries: list[Delivery],
+    uploaded: list[HostedAttachment],
+    not_before: float | None = None,
+) -> None:
+    """
+    Toute l'annonce est enregistrée avant le premier envoi : le worker la
+    reprend en cas d'erreur de Discord ou de redémarrage. Les images ne sont
+    pas ré-uploadées : on réutilise leur URL CDN.
+
+    Une annonce programmée fait exception : les URL CDN signées expirent après
+    ~24 h, elle emporte donc une copie de toutes ses pièces jointes, images
+    comprises, ré-uploadées à l'envoi.
+    """
+    files = attachment_store.files(draft_id)
+    if not_before is not None and files and all(file.exists() for file in files):
+        reupload, embeds = files, []
+    else:
+        reupload, embeds = spooled_to_reupload(files, uploaded), uploaded
+    await outbox.enqueue(
+        draft_id, deliveries, files=reupload, embeds=embeds, not_before=not_before
+    )
+    await discard(draft_id)
+
+
+async def unschedule(announcement_id: str) -> bool:
+    """Annule une annonce programmée pas encore partie (file d'envoi et version)."""
+    if not await outbox.cancel(announcement_id):
+        return False
+    await release_store.cancel(announcement_id)
+    return True
+
+
+async def confirmation(draft_id: str, done_message: str) -> str:
+    """Message de fin d'envoi, après avoir attendu le worker un temps limité."""
+    result = await outbox.wait(draft_id, PARAM.OUTBOX_CONFIRM_TIMEOUT)
+    if result == "done":
+        return done_message
+    if result == "failed":
+        return "❌ L'envoi a échoué dans au moins un salon (voir les logs)."
+    return "⏳ Discord est lent à répondre : l'envoi continue en arrière-plan."
@@ -0,0 +1,36 @@
+from collections.abc import Callable
+import functools
+
+from modules.render import MARKER_ICONS, LineMarkers, RenderCache
+from modules.templates import Template
+import PARAM
+
+# Construit le message d'une langue à partir de ses textes
+type MessageBuilder = Callable[[dict, str], str]
+
+# Séparateur entre les langues dans la prévisualisation du canal test
+PREVIEW_SEPARATOR = "\n\n---\n\n"
+
+# Prévisualisations déjà rendues (et découpées), par empreinte des textes
+preview_cache = RenderCache()
+
+
+@functools.lru_cache(maxsize=16)
+def line_markers(marker: Template) -> LineMarkers:
+    """
+    Marqueurs de début de ligne (&, ~, £), compilés une seule fois par modèle
+    de puce (le modèle change avec la langue ou quand le fichier est modifié).
+    """
+    return LineMarkers(
+        {
+            symbol: marker(icon=getattr(PARAM, icon))
+            for symbol, icon in MARKER_ICONS.items()
+        }
+    )
+
+
+def build_preview(texts: dict[str, dict], build_message: MessageBuilder) -> str:
+    """Concatène les messages de toutes les langues pour le canal de test."""
+    return PREVIEW_SEPARATOR.join(
+        build_message(lang_texts, language) for language, lang_texts in texts.items()
+    )
@@ -0,0 +1,357 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+
+import discord
+
+from modules import media
+import PARAM
+
+log = logging.getLogger("discord")
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# Nombre maximal de pièces jointes par annonce (limite d'un message Discord)
+MAX_ATTACHMENTS = 10
+# Nombre de téléchargements simultanés depuis le CDN Discord
+DOWNLOAD_CONCURRENCY = 4
+
+
+def is_image(filename: str) -> bool:
+    """Indique si le fichier peut être affiché dans un embed."""
+    return os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
+
+
+class AttachmentTooLargeError(Exception):
+    """La pièce jointe ne tient pas dans le budget du stockage."""
+
+
+@dataclass
+class HostedAttachment:
+    """Pièce jointe déjà hébergée par Discord (sérialisable, contrairement à discord.Attachment)."""
+
+    filename: str
+    url: str
+    # Message d'hébergement, relu pour rafraîchir l'URL (signée, valable ~24 h)
+    channel_id: int | None = None
+    message_id: int | None = None
+
+
+@dataclass
+class SpooledFile:
+    """Pièce jointe stockée sur disque en attendant la publication."""
+
+    filename: str
+    path: str
+    size: int
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def to_discord_file(self) -> discord.File:
+        # discord.py lit le fichier au moment de l'envoi : rien n'est gardé en mémoire
+        return discord.File(self.path, filename=self.filename)
+
+
+def _write(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _remove(files: list[SpooledFile]) -> None:
+    for file in files:
+        try:
+            os.remove(file.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.error(f"Impossible de supprimer {file.path}: {e}")
+
+
+class AttachmentStore:
+    """
+    Stockage des pièces jointes des annonces en attente, par brouillon.
+
+    Les octets sont écrits dans un dossier temporaire au lieu de rester en
+    mémoire aussi longtemps que la vue (sans timeout) existe. La taille totale
+    est plafonnée à `max_bytes` : au-delà, les brouillons les moins récemment
+    utilisés sont libérés. Un brouillon publié ou annulé doit être libéré avec
+    `release`.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._drafts: OrderedDict[str, list[SpooledFile]] = OrderedDict()
+        self._root: str | None = None
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+    def __contains__(self, draft_id: str) -> bool:
+        return draft_id in self._drafts
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(file.size for files in self._drafts.values() for file in files)
+
+    def _directory(self) -> str:
+        # Dossier créé au premier besoin et supprimé à l'arrêt du processus
+        if self._root is None:
+            self._root = tempfile.mkdtemp(prefix="statut-bot-")
+            weakref.finalize(self, shutil.rmtree, self._root, ignore_errors=True)
+        return self._root
+
+    def _make_room(self, size: int, keep: str) -> None:
+        """Libère les brouillons les plus anciens (sauf `keep`) jusqu'à pouvoir stocker `size` octets."""
+        while self.used_bytes + size > self.max_bytes:
+            victim = next((d for d in self._drafts if d != keep), None)
+            if victim is None:
+                raise AttachmentTooLargeError(
+                    f"Budget de stockage dépassé ({self.max_bytes} octets)."
+                )
+            log.warning(f"Brouillon {victim} libéré pour faire de la place.")
+            self.release(victim)
+            self.evicted += 1
+
+    async def add(self, draft_id: str, filename: str, data: bytes) -> SpooledFile:
+        """Écrit une pièce jointe sur disque et l'associe au brouillon `draft_id`."""
+        if len(data) > self.max_bytes:
+            raise AttachmentTooLargeError(
+                f"{filename} dépasse la taille maximale ({self.max_bytes} octets)."
+            )
+        self._make_room(len(data), keep=draft_id)
+
+        # Nom aléatoire : le nom d'origine n'est jamais utilisé comme chemin
+        extension = os.path.splitext(filename)[1].lower()
+        path = os.path.join(self._directory(), f"{uuid.uuid4().hex}{extension}")
+        spooled = SpooledFile(filename, path, len(data))
+
+        # La place est réservée avant l'écriture pour les ajouts concurrents
+        self._drafts.setdefault(draft_id, []).append(spooled)
+        self._drafts.move_to_end(draft_id)
+        try:
+            await asyncio.to_thread(_write, path, data)
+        except OSError:
+            if draft_id in self._drafts:
+                self._drafts[draft_id].remove(spooled)
+            raise
+        return spooled
+
+    def files(self, draft_id: str) -> list[SpooledFile]:
+        """Pièces jointes du brouillon (vide s'il a été libéré)."""
+        if draft_id not in self._drafts:
+            return []
+        self._drafts.move_to_end(draft_id)
+        return list(self._drafts[draft_id])
+
+    def release(self, draft_id: str) -> None:
+        """Supprime les fichiers d'un brouillon publié, annulé ou abandonné."""
+        files = self._drafts.pop(draft_id, [])
+        _remove(files)
+
+    def snapshot(self) -> dict:
+        return {
+            "drafts": len(self._drafts),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+        }
+
+
+# Stockage partagé par /update et /patch-note
+attachment_store = AttachmentStore(PARAM.ATTACHMENT_STORE_MAX_BYTES)
+
+
+def collect_attachments(
+    *attachments: discord.Attachment | None,
+) -> list[discord.Attachment]:
+    """Pièces jointes réellement fournies parmi les options d'une commande."""
+    return [attachment for attachment in attachments if attachment is not None]
+
+
+def format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} Mo"
+
+
+@dataclass
+class SpoolReport:
+    """Bilan du téléchargement des pièces jointes d'un brouillon."""
+
+    errors: list[str] = field(default_factory=list)
+    saved_bytes: int = 0
+
+    def saved_note(self) -> str:
+        """Ligne à ajouter au message de progression (vide si rien n'a été gagné)."""
+        if self.saved_bytes <= 0:
+            return ""
+        return f"\n🗜️ Images recompressées : {format_size(self.saved_bytes)} économisés."
+
+
+async def spool_attachments(
+    draft_id: str,
+    attachments: list[discord.Attachment],
+    store: AttachmentStore = attachment_store,
+) -> SpoolReport:
+    """
+    Télécharge les pièces jointes en parallèle (au plus `DOWNLOAD_CONCURRENCY` à la
+    fois), recompresse les images si l'étape média est active, et les range dans
+    le stockage du brouillon, dans l'ordre d'origine.
+
+    Le bilan liste les erreurs (une par fichier ignoré) et les octets économisés.
+    """
+    report = SpoolReport(
+        errors=[
+            f"`{attachment.filename}` : plus de {MAX_ATTACHMENTS} pièces jointes."
+            for attachment in attachments[MAX_ATTACHMENTS:]
+        ]
+    )
+    semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    max_size = PARAM.ATTACHMENT_MAX_FILE_BYTES
+
+    async def download(attachment: discord.Attachment) -> media.OptimizedImage | str:
+        # Taille connue avant le téléchargement : inutile de lire un fichier refusé.
+        # Une image recompressible peut dépasser la limite, tant que le résultat la respecte.
+        limit = max_size
+        if media.can_optimize(attachment.filename):
+            limit = PARAM.MEDIA_MAX_SOURCE_BYTES
+        if attachment.size > limit:
+            return f"`{attachment.filename}` : trop volumineux ({format_size(attachment.size)} > {format_size(limit)})."
+        async with semaphore:
+            try:
+                data = await attachment.read()
+            except discord.HTTPException as e:
+                log.error(f"Error reading attachment {attachment.filename}: {e}")
+                return f"`{attachment.filename}` : téléchargement impossible ({e})."
+
+        optimized = await media.optimize_image(attachment.filename, data)
+        if len(optimized.data) > max_size:
+            return f"`{attachment.filename}` : trop volumineux même après compression ({format_size(len(optimized.data))} > {format_size(max_size)})."
+        return optimized
+
+    results = await asyncio.gather(
+        *(download(attachment) for attachment in attachments[:MAX_ATTACHMENTS])
+    )
+
+    # Écriture dans l'ordre d'envoi pour conserver l'ordre des images
+    for attachment, result in zip(attachments, results, strict=False):
+        if isinstance(result, str):
+            report.errors.append(result)
+            continue
+        try:
+            await store.add(draft_id, result.filename, result.data)
+            report.saved_bytes += result.saved_bytes
+        except AttachmentTooLargeError as e:
+            report.errors.append(f"`{attachment.filename}` : {e}")
+        except OSError as e:
+            log.error(f"Impossible de stocker {attachment.filename}: {e}")
+            report.errors.append(f"`{attachment.filename}` : stockage impossible.")
+    return report
+
+
+async def upload_once(
+    channel: discord.abc.Messageable, files: list[SpooledFile]
+) -> list[HostedAttachment]:
+    """
+    Envoie les pièces jointes une seule fois dans `channel` et renvoie les
+    pièces jointes hébergées par Discord.
+
+    Les messages suivants (prévisualisation, publications) référencent ensuite
+    l'URL CDN des images au lieu de ré-uploader les octets. Le message d'hébergement
+    ne doit pas être supprimé tant que l'annonce est en cours.
+    """
+    if not files:
+        return []
+    message = await channel.send(
+        content="📎 Pièces jointes de l'annonce",
+        files=[file.to_discord_file() for file in files],
+    )
+    log.info(f"{len(files)} pièce(s) jointe(s) uploadée(s) une seule fois.")
+    return [
+        HostedAttachment(a.filename, a.url, channel.id, message.id)
+        for a in message.attachments
+    ]
+
+
+async def refresh_hosted(
+    guild: discord.Guild,
+    draft_id: str,
+    uploaded: list[HostedAttachment],
+    store: AttachmentStore = attachment_store,
+) -> list[HostedAttachment]:
+    """
+    Les URL CDN signées par Discord expirent après ~24 h : le message
+    d'hébergement est relu pour obtenir des URL à jour. Si les fichiers du
+    brouillon ont disparu du disque (brouillon restauré après un redémarrage),
+    ils sont retéléchargés depuis ce message.
+
+    En cas d'échec, les pièces jointes sont renvoyées telles quelles.
+    """
+    hosted = next((a for a in uploaded if a.message_id is not None), None)
+    if hosted is None:
+        return uploaded
+    channel = guild.get_channel(hosted.channel_id)
+    if channel is None:
+        log.warning(f"Salon d'hébergement {hosted.channel_id} introuvable.")
+        return uploaded
+    try:
+        message = await channel.fetch_message(hosted.message_id)
+    except discord.HTTPException as e:
+        log.warning(f"Message d'hébergement {hosted.message_id} illisible: {e}")
+        return uploaded
+
+    if not store.files(draft_id):
+        report = await spool_attachments(draft_id, message.attachments, store)
+        for error in report.errors:
+            log.warning(f"Pièce jointe du brouillon {draft_id} perdue : {error}")
+    return [
+        HostedAttachment(a.filename, a.url, channel.id, message.id)
+        for a in message.attachments
+    ]
+
+
+def attachment_embeds(uploaded: list[HostedAttachment]) -> list[discord.Embed]:
+    """Embeds affichant les images déjà uploadées (regroupées en galerie)."""
+    images = [a for a in uploaded if is_image(a.filename)]
+    if not images:
+        return []
+    # Des embeds partageant la même `url` sont affichés en galerie par Discord
+    gallery_url = images[0].url
+    return [discord.Embed(url=gallery_url).set_image(url=a.url) for a in images]
+
+
+def spooled_to_reupload(
+    files: list[SpooledFile], uploaded: list[HostedAttachment]
+) -> list[SpooledFile]:
+    """
+    Fichiers qui doivent encore être joints aux messages : ceux qui ne sont pas
+    des images (un embed ne peut pas les afficher) ou dont l'upload a échoué.
+    """
+    # L'upload conserve l'ordre des fichiers : on associe par position, car Discord
+    # peut modifier les noms (espaces, doublons)
+    if len(uploaded) == len(files):
+        embedded = [is_image(attachment.filename) for attachment in uploaded]
+    else:
+        embedded = [False] * len(files)
+
+    result = []
+    for file, is_embedded in zip(files, embedded, strict=True):
+        if is_embedded:
+            continue
+        if not file.exists():
+            log.warning(f"Pièce jointe {file.filename} introuvable sur le disque.")
+            continue
+        result.append(file)
+    return result
+
+
+def files_to_reupload(
+    files: list[SpooledFile], uploaded: list[HostedAttachment]
+) -> list[discord.File]:
+    """Version prête à l'envoi de `spooled_to_reupload`."""
+    return [file.to_discord_file() for file in spooled_to_reupload(files, uploaded)]
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+
+class Deadline:
+    """
+    Échéance d'une requête, transmise à chacune de ses étapes.
+
+    Chaque étape reçoit une part du temps restant (`share`) : les étapes les
+    moins importantes sont interrompues les premières, et le temps réservé aux
+    étapes finales (envoi de la prévisualisation) n'est jamais consommé avant.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def share(self, fraction: float = 1.0, reserve: float = 0.0) -> Deadline:
+        """
+        Sous-échéance : `fraction` du temps restant, après avoir mis de côté
+        `reserve` secondes pour les étapes suivantes.
+        """
+        return Deadline(max(0.0, self.remaining() - reserve) * fraction)
+
+    def timeout(self) -> asyncio.Timeout:
+        """Contexte qui annule le bloc à l'échéance (lève TimeoutError)."""
+        return asyncio.timeout(self.remaining())
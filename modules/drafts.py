@@ -0,0 +1,111 @@
+import asyncio
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+import time
+
+from modules.attachments import HostedAttachment
+from modules.json_file import write_json
+
+log = logging.getLogger("discord")
+
+DRAFTS_FILE = "data/drafts.json"
+
+
+@dataclass
+class Draft:
+    """Annonce en attente de publication (prévisualisation envoyée dans le canal test)."""
+
+    draft_id: str
+    kind: str  # "update" ou "patch"
+    texts: dict[str, dict]
+    version: str | None = None
+    uploaded: list[HostedAttachment] = field(default_factory=list)
+    message_id: int | None = None
+    created_at: float = field(default_factory=time.time)
+    # Dernier enregistrement (création ou édition), pour l'expiration après un redémarrage
+    updated_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Draft:
+        data = dict(data)
+        data["uploaded"] = [HostedAttachment(**a) for a in data.get("uploaded", [])]
+        return cls(**data)
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        log.error(f"Impossible de lire les brouillons ({path}): {e}")
+        return {}
+
+
+class DraftStore:
+    """
+    Brouillons d'annonces persistés dans un fichier JSON, indexés par identifiant.
+
+    Le fichier n'est lu qu'au premier accès (premier clic sur un bouton après un
+    redémarrage, nouvelle annonce, ou reprise des brouillons en tâche de fond
+    une fois le bot connecté) pour ne pas ralentir le démarrage.
+    """
+
+    def __init__(self, path: str = DRAFTS_FILE) -> None:
+        self.path = path
+        self._drafts: dict[str, Draft] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _loaded(self) -> dict[str, Draft]:
+        if self._drafts is None:
+            raw = await asyncio.to_thread(_read, self.path)
+            drafts = {}
+            for draft_id, data in raw.items():
+                try:
+                    drafts[draft_id] = Draft.from_dict(data)
+                except (TypeError, ValueError) as e:
+                    log.error(f"Brouillon {draft_id} ignoré (format invalide): {e}")
+            self._drafts = drafts
+            log.info(f"{len(drafts)} brouillon(s) d'annonce chargé(s).")
+        return self._drafts
+
+    async def _flush(self) -> None:
+        data = {draft_id: asdict(draft) for draft_id, draft in self._drafts.items()}
+        try:
+            await asyncio.to_thread(write_json, self.path, data)
+        except OSError as e:
+            # L'annonce reste utilisable, elle ne survivra simplement pas à un redémarrage
+            log.error(f"Impossible d'enregistrer les brouillons ({self.path}): {e}")
+
+    async def all(self) -> list[Draft]:
+        async with self._lock:
+            return list((await self._loaded()).values())
+
+    async def get(self, draft_id: str) -> Draft | None:
+        async with self._lock:
+            return (await self._loaded()).get(draft_id)
+
+    async def find_by_message(self, message_id: int) -> Draft | None:
+        """Brouillon dont la prévisualisation (avec les boutons) est `message_id`."""
+        async with self._lock:
+            drafts = await self._loaded()
+            return next(
+                (d for d in drafts.values() if d.message_id == message_id), None
+            )
+
+    async def save(self, draft: Draft) -> None:
+        async with self._lock:
+            (await self._loaded())[draft.draft_id] = draft
+            await self._flush()
+
+    async def delete(self, draft_id: str) -> None:
+        async with self._lock:
+            if (await self._loaded()).pop(draft_id, None) is not None:
+                await self._flush()
+
+
+# Brouillons partagés par /update et /patch-note
+draft_store = DraftStore()
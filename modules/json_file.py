@@ -0,0 +1,16 @@
+import json
+import os
+
+
+def write_json(path: str, data: object) -> None:
+    """
+    Écrit `data` en JSON dans `path` (dossiers créés au besoin).
+
+    Écriture atomique : un arrêt brutal ne laisse jamais un fichier à moitié
+    écrit, l'ancien contenu reste en place jusqu'au `os.replace`.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,102 @@
+from collections.abc import Awaitable, Callable
+import json
+import logging
+import re
+import time
+
+import discord
+
+log = logging.getLogger("discord")
+
+# Paires "clé": "valeur" d'un JSON éventuellement incomplet (chaîne non terminée incluse)
+_PARTIAL_FIELD_RE = re.compile(r'"(\w+)"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+
+def partial_json_fields(text: str) -> dict[str, str]:
+    """
+    Extrait les champs texte d'un objet JSON en cours de génération.
+
+    Le modèle renvoie son JSON par morceaux : on récupère les valeurs déjà
+    reçues, y compris celle qui n'est pas encore terminée.
+    """
+    fields = {}
+    for key, raw_value in _PARTIAL_FIELD_RE.findall(text):
+        # Un échappement coupé en fin de flux (ex: "\") ne peut pas être décodé
+        value = raw_value.removesuffix("\\")
+        try:
+            fields[key] = json.loads(f'"{value}"')
+        except json.JSONDecodeError:
+            fields[key] = value.replace("\\n", "\n")
+    return fields
+
+
+class LivePreview:
+    """
+    Affiche la sortie partielle des modèles dans le message de suivi.
+
+    Les modifications sont espacées d'au moins `interval` secondes pour rester
+    sous la limite d'édition de Discord ; la dernière version reçue est
+    toujours affichée par `flush()`. Après `close()`, le message appartient à
+    l'étape suivante : les sorties tardives sont ignorées.
+    """
+
+    def __init__(
+        self,
+        message: discord.WebhookMessage,
+        header: str,
+        interval: float = 1.5,
+        limit: int = 2000,
+    ) -> None:
+        self.message = message
+        self.header = header
+        self.interval = interval
+        self.limit = limit
+        self.sections: dict[str, str] = {}
+        self._last_edit = 0.0
+        self._dirty = False
+        self._closed = False
+
+    def callback(self, section: str) -> Callable[[str], Awaitable[None]]:
+        """Renvoie un callback `on_partial` qui alimente la section `section`."""
+
+        async def on_partial(raw_text: str) -> None:
+            fields = partial_json_fields(raw_text)
+            if fields:
+                self.sections[section] = "\n".join(v for v in fields.values() if v)
+                await self.update()
+
+        return on_partial
+
+    def render(self) -> str:
+        body = "\n\n".join(
+            f"**{name}**\n{text}" for name, text in self.sections.items() if text
+        )
+        content = f"{self.header}\n\n{body}" if body else self.header
+        if len(content) <= self.limit:
+            return content
+        # Trop long : on garde l'en-tête et la fin, là où le texte progresse
+        tail = content[-(self.limit - len(self.header) - 3) :]
+        return f"{self.header}\n…{tail}"
+
+    async def update(self) -> None:
+        if self._closed:
+            return
+        self._dirty = True
+        if time.monotonic() - self._last_edit >= self.interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Affiche immédiatement la dernière version reçue."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(content=self.render())
+        except discord.HTTPException as e:
+            log.warning(f"Impossible de mettre à jour l'aperçu en direct : {e}")
+
+    def close(self) -> None:
+        """Fin de l'aperçu : plus aucune modification du message."""
+        self._closed = True
+        self._dirty = False
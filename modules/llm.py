@@ -0,0 +1,252 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+import json
+import logging
+import os
+import random
+from typing import Protocol
+import zlib
+
+from google import genai
+from google.genai import types
+
+from modules.rate_limit import estimate_tokens
+
+log = logging.getLogger("discord")
+
+
+@dataclass
+class LLMResponse:
+    """Réponse (ou morceau de réponse en streaming) d'un modèle."""
+
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """Fiche d'un modèle du catalogue (limites de tokens et actions supportées)."""
+
+    name: str
+    display_name: str = ""
+    description: str = ""
+    input_token_limit: int = 0
+    output_token_limit: int = 0
+    actions: tuple[str, ...] = ()
+
+
+class LLMBackend(Protocol):
+    """Interface commune aux moteurs de génération utilisés par les annonces."""
+
+    async def generate(
+        self, model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> LLMResponse:
+        """
+        Génère une réponse JSON complète conforme à `schema`. `system` porte les
+        consignes communes à tous les appels, `prompt` uniquement le texte à traiter.
+        """
+        ...
+
+    def stream(
+        self, model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> AsyncIterator[LLMResponse]:
+        """Génère la réponse morceau par morceau (le dernier porte les compteurs de tokens)."""
+        ...
+
+    async def list_models(self) -> list[ModelInfo]:
+        """Modèles proposés par le moteur."""
+        ...
+
+
+def _json_config(schema: dict, system: str | None) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        system_instruction=system,
+        response_mime_type="application/json",
+        response_schema=schema,
+    )
+
+
+def _usage(response: object) -> tuple[int, int]:
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    return (
+        input_tokens if isinstance(input_tokens, int) else 0,
+        output_tokens if isinstance(output_tokens, int) else 0,
+    )
+
+
+class GeminiBackend:
+    """Moteur réel : l'API Google Gemini via le SDK `google-genai`."""
+
+    def __init__(self, client: genai.Client) -> None:
+        self.client = client
+
+    async def generate(
+        self, model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> LLMResponse:
+        # Même client asynchrone (et même pool de connexions) que `stream`
+        response = await self.client.aio.models.generate_content(
+            model=model, contents=prompt, config=_json_config(schema, system)
+        )
+        input_tokens, output_tokens = _usage(response)
+        return LLMResponse(response.text or "", input_tokens, output_tokens)
+
+    async def stream(
+        self, model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> AsyncIterator[LLMResponse]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model, contents=prompt, config=_json_config(schema, system)
+        )
+        async for chunk in stream:
+            input_tokens, output_tokens = _usage(chunk)
+            yield LLMResponse(chunk.text or "", input_tokens, output_tokens)
+
+    async def list_models(self) -> list[ModelInfo]:
+        # Le SDK parcourt lui-même les pages du catalogue
+        pager = await self.client.aio.models.list(config={"page_size": 100})
+        return [
+            ModelInfo(
+                name=(model.name or "").removeprefix("models/"),
+                display_name=model.display_name or "",
+                description=(model.description or "").replace("\n", " ").strip(),
+                input_token_limit=model.input_token_limit or 0,
+                output_token_limit=model.output_token_limit or 0,
+                actions=tuple(model.supported_actions or ()),
+            )
+            async for model in pager
+        ]
+
+
+class FakeBackendError(Exception):
+    """Erreur simulée par le FakeBackend (le message imite celui de l'API)."""
+
+
+class FakeBackend:
+    """
+    Moteur factice et déterministe pour les tests et les benchmarks hors ligne.
+
+    - `latency` / `jitter` : délai avant le premier token (secondes) ;
+    - `tokens_per_second` : débit de génération (None = instantané) ;
+    - `output_tokens` : taille approximative de chaque réponse ;
+    - `error_rate` / `fail_first` : erreurs aléatoires (graine fixe) ou sur les N premiers appels ;
+    - `responder` : fonction (prompt, schema) -> dict remplaçant la réponse par défaut ;
+    - `models` : noms renvoyés par `list_models`.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        tokens_per_second: float | None = None,
+        output_tokens: int = 50,
+        error_rate: float = 0.0,
+        fail_first: int = 0,
+        error_message: str = "503 UNAVAILABLE: fake backend error",
+        responder: Callable[[str, dict], dict] | None = None,
+        models: tuple[str, ...] = ("fake-model",),
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.error_message = error_message
+        self.responder = responder
+        self.models = models
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def _respond(self, model: str, prompt: str, schema: dict) -> str:
+        if self.responder:
+            return json.dumps(self.responder(prompt, schema), ensure_ascii=False)
+        # Chaque champ reçoit un texte de taille fixe, marqué par l'empreinte du
+        # prompt : la sortie est reproductible et diffère d'un prompt à l'autre
+        keys = list(schema.get("properties", {})) or ["text"]
+        digest = f"{zlib.crc32(prompt.encode('utf-8')):08x}"
+        filler = "lorem " * max(1, self.output_tokens * 4 // (6 * len(keys)))
+        return json.dumps(
+            {key: f"[{model}:{digest}] {key}: {filler.strip()}" for key in keys},
+            ensure_ascii=False,
+        )
+
+    async def _before_call(self) -> None:
+        self.calls += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.calls <= self.fail_first or self._random.random() < self.error_rate:
+            raise FakeBackendError(self.error_message)
+
+    async def generate(
+        self, model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> LLMResponse:
+        await self._before_call()
+        text = self._respond(model, prompt, schema)
+        output_tokens = estimate_tokens(text)
+        if self.tokens_per_second:
+            await asyncio.sleep(output_tokens / self.tokens_per_second)
+        return LLMResponse(
+            text, estimate_tokens((system or "") + prompt), output_tokens
+        )
+
+    async def stream(
+        self,
+        model: str,
+        prompt: str,
+        schema: dict,
+        system: str | None = None,
+        chunk_size: int = 64,
+    ) -> AsyncIterator[LLMResponse]:
+        await self._before_call()
+        text = self._respond(model, prompt, schema)
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start : start + chunk_size]
+            if self.tokens_per_second:
+                await asyncio.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield LLMResponse(chunk)
+        yield LLMResponse(
+            "", estimate_tokens((system or "") + prompt), estimate_tokens(text)
+        )
+
+    async def list_models(self) -> list[ModelInfo]:
+        return [
+            ModelInfo(
+                name,
+                display_name=name,
+                input_token_limit=1_048_576,
+                output_token_limit=65_536,
+                actions=("generateContent", "countTokens"),
+            )
+            for name in self.models
+        ]
+
+
+def create_backend() -> LLMBackend | None:
+    """
+    Crée le moteur configuré par les variables d'environnement.
+
+    - `LLM_BACKEND=fake` : FakeBackend (latence réglable via `FAKE_LLM_LATENCY`) ;
+    - sinon, l'API Gemini avec `GEMINI_API`, éventuellement redirigée vers un
+      serveur local (`GEMINI_BASE_URL`, ex: `bench/gemini_stub.py`).
+    """
+    if os.getenv("LLM_BACKEND") == "fake":
+        log.warning("LLM_BACKEND=fake : les annonces utilisent un modèle factice.")
+        return FakeBackend(latency=float(os.getenv("FAKE_LLM_LATENCY", "0.2")))
+
+    api_key = os.getenv("GEMINI_API")
+    if not api_key:
+        log.warning("GEMINI_API key not found. AI features will be disabled.")
+        return None
+
+    base_url = os.getenv("GEMINI_BASE_URL")
+    http_options = {"base_url": base_url} if base_url else None
+    return GeminiBackend(genai.Client(api_key=api_key, http_options=http_options))
@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import io
+import logging
+import os
+
+import PARAM
+
+# Pillow est optionnel : sans lui, les images sont envoyées telles quelles
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+log = logging.getLogger("discord")
+
+# Images fixes que l'on sait recompresser (les GIF peuvent être animés : on n'y touche pas)
+OPTIMIZABLE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+OUTPUT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+@dataclass
+class OptimizedImage:
+    """Résultat de l'étape média (l'original si rien n'a été gagné)."""
+
+    filename: str
+    data: bytes
+    original_size: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_size - len(self.data)
+
+
+def is_enabled() -> bool:
+    return PARAM.MEDIA_OPTIMIZE and Image is not None
+
+
+def can_optimize(filename: str) -> bool:
+    """Indique si le fichier passera par l'étape de recompression."""
+    extension = os.path.splitext(filename)[1].lower()
+    return is_enabled() and extension in OPTIMIZABLE_EXTENSIONS
+
+
+def _compress(
+    data: bytes, output_format: str, quality: int, max_dimension: int
+) -> bytes:
+    """Redimensionne et recompresse une image (exécuté dans un processus séparé)."""
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        if output_format == "jpeg":
+            # Le JPEG ne gère pas la transparence : on l'aplatit sur fond blanc
+            if image.mode in {"RGBA", "LA", "P"}:
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+        elif image.mode not in {"RGB", "RGBA"}:
+            image = image.convert("RGBA")
+
+        output = io.BytesIO()
+        image.save(output, format=output_format.upper(), quality=quality, optimize=True)
+        return output.getvalue()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PARAM.MEDIA_WORKERS)
+    return _executor
+
+
+async def optimize_image(filename: str, data: bytes) -> OptimizedImage:
+    """
+    Convertit l'image au format `PARAM.MEDIA_FORMAT` et la réduit au-delà de
+    `PARAM.MEDIA_MAX_DIMENSION` pixels, hors de la boucle asyncio.
+
+    L'original est conservé si la conversion échoue ou ne réduit pas la taille.
+    """
+    original = OptimizedImage(filename, data, len(data))
+    if not can_optimize(filename):
+        return original
+
+    output_format = PARAM.MEDIA_FORMAT
+    loop = asyncio.get_running_loop()
+    try:
+        compressed = await loop.run_in_executor(
+            _get_executor(),
+            _compress,
+            data,
+            output_format,
+            PARAM.MEDIA_QUALITY,
+            PARAM.MEDIA_MAX_DIMENSION,
+        )
+    except Exception as e:
+        log.warning(f"Recompression impossible pour {filename}: {e}")
+        return original
+
+    if len(compressed) >= len(data):
+        log.info(f"{filename} conservé tel quel (la recompression ne gagne rien).")
+        return original
+
+    stem = os.path.splitext(filename)[0]
+    result = OptimizedImage(
+        f"{stem}{OUTPUT_EXTENSIONS[output_format]}", compressed, len(data)
+    )
+    log.info(
+        f"{filename} recompressé : {len(data)} -> {len(compressed)} octets ({result.saved_bytes} économisés)."
+    )
+    return result
+
+
+def shutdown() -> None:
+    """Arrête les processus de recompression (à l'arrêt du bot)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
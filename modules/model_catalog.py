@@ -0,0 +1,138 @@
+import asyncio
+from dataclasses import asdict
+import json
+import logging
+import time
+
+from modules.json_file import write_json
+from modules.llm import LLMBackend, ModelInfo
+import PARAM
+
+log = logging.getLogger("discord")
+
+# Action nécessaire aux annonces (correction et traduction)
+GENERATE_ACTION = "generateContent"
+
+
+class ModelCatalog:
+    """
+    Catalogue des modèles Gemini, conservé sur disque dans `path`.
+
+    La liste n'est redemandée à l'API que lorsque le cache a plus de `ttl`
+    secondes : /models et la vérification de GEMINI_MODEL au démarrage lisent
+    le fichier, sans appel réseau.
+    """
+
+    def __init__(
+        self,
+        path: str = PARAM.GEMINI_CATALOG_FILE,
+        ttl: float = PARAM.GEMINI_CATALOG_TTL,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.models: dict[str, ModelInfo] = {}
+        self.fetched_at = 0.0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """Lit le cache disque (une seule fois)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                payload = json.load(f)
+            models = [
+                ModelInfo(**{**entry, "actions": tuple(entry.get("actions", ()))})
+                for entry in payload["models"]
+            ]
+            self.fetched_at = float(payload["fetched_at"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.error(f"Catalogue des modèles '{self.path}' illisible: {e}")
+            return
+        self.models = {model.name: model for model in models}
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def is_stale(self) -> bool:
+        self.load()
+        return not self.models or self.age > self.ttl
+
+    def _save(self) -> None:
+        payload = {
+            "fetched_at": self.fetched_at,
+            "models": [asdict(model) for model in self.models.values()],
+        }
+        write_json(self.path, payload)
+
+    async def refresh(self, backend: LLMBackend, force: bool = False) -> bool:
+        """
+        Redemande la liste à l'API si le cache est périmé (ou si `force`).
+        En cas d'erreur, le cache existant est conservé. Renvoie True si la
+        liste a été rechargée.
+        """
+        async with self._lock:
+            # Un autre appel a pu rafraîchir le cache pendant l'attente du verrou
+            if not force and not self.is_stale:
+                return False
+            try:
+                models = await backend.list_models()
+            except Exception as e:
+                log.error(f"Impossible de récupérer la liste des modèles Gemini: {e}")
+                return False
+            self.models = {model.name: model for model in models}
+            self.fetched_at = time.time()
+            try:
+                await asyncio.to_thread(self._save)
+            except OSError as e:
+                log.error(f"Impossible d'écrire le catalogue des modèles: {e}")
+            log.info(f"Catalogue des modèles Gemini rafraîchi ({len(models)} modèles).")
+            return True
+
+    def get(self, name: str) -> ModelInfo | None:
+        self.load()
+        return self.models.get(name.removeprefix("models/"))
+
+    def find(
+        self,
+        action: str | None = GENERATE_ACTION,
+        min_input_tokens: int = 0,
+        min_output_tokens: int = 0,
+    ) -> list[ModelInfo]:
+        """Modèles supportant `action` avec au moins les limites de tokens demandées."""
+        self.load()
+        return sorted(
+            (
+                model
+                for model in self.models.values()
+                if (action is None or action in model.actions)
+                and model.input_token_limit >= min_input_tokens
+                and model.output_token_limit >= min_output_tokens
+            ),
+            key=lambda model: model.name,
+        )
+
+    def check(self, name: str) -> str | None:
+        """
+        Problème détecté pour le modèle `name` d'après le cache (None si le
+        modèle convient ou si le catalogue n'a pas encore été récupéré).
+        """
+        self.load()
+        if not self.models:
+            return None
+        model = self.get(name)
+        if model is None:
+            return f"Le modèle '{name}' est absent du catalogue Gemini."
+        if GENERATE_ACTION not in model.actions:
+            return f"Le modèle '{name}' ne supporte pas {GENERATE_ACTION}."
+        return None
+
+
+# Instance partagée : /models, vérification au démarrage et models/list_models.py
+model_catalog = ModelCatalog()
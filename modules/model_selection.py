@@ -0,0 +1,88 @@
+from dataclasses import asdict, dataclass
+import json
+import logging
+import time
+
+from modules.json_file import write_json
+import PARAM
+
+log = logging.getLogger("discord")
+
+
+@dataclass(frozen=True)
+class ModelResult:
+    """Mesures d'un modèle sur la charge de référence (correction + traductions)."""
+
+    model: str
+    runs: int
+    p50: float  # secondes
+    p95: float  # secondes
+    tokens_per_second: float
+    json_valid_rate: float  # part des réponses JSON valides et complètes (0 à 1)
+
+
+def save_results(path: str, results: list[ModelResult], workload: dict) -> None:
+    """Écrit les résultats du benchmark (écriture atomique)."""
+    payload = {
+        "generated_at": time.time(),
+        "workload": workload,
+        "models": [asdict(result) for result in results],
+    }
+    write_json(path, payload)
+
+
+def load_results(path: str) -> list[ModelResult]:
+    """Résultats du dernier benchmark ([] si le fichier est absent ou invalide)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        return [ModelResult(**entry) for entry in payload["models"]]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.error(f"Résultats du benchmark '{path}' illisibles: {e}")
+        return []
+
+
+def select_model(results: list[ModelResult], min_json_rate: float) -> str | None:
+    """
+    Modèle le plus rapide (p95 le plus bas, puis p50) parmi ceux dont le taux de
+    réponses JSON valides atteint `min_json_rate`. None si aucun ne convient.
+    """
+    eligible = [
+        result
+        for result in results
+        if result.runs and result.json_valid_rate >= min_json_rate
+    ]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: (result.p95, result.p50)).model
+
+
+class ModelChoice:
+    """
+    Modèle Gemini utilisé par les annonces : PARAM.GEMINI_MODEL, ou le modèle
+    retenu au démarrage à partir des résultats de `bench/bench_models.py`.
+    """
+
+    def __init__(self) -> None:
+        self.selected: str | None = None
+
+    @property
+    def current(self) -> str:
+        return self.selected or PARAM.GEMINI_MODEL
+
+    def load(self, path: str, min_json_rate: float) -> str:
+        """Choisit le modèle d'après le fichier de résultats et le renvoie."""
+        self.selected = select_model(load_results(path), min_json_rate)
+        if self.selected:
+            log.info(f"Modèle Gemini sélectionné par le benchmark : {self.selected}")
+        else:
+            log.info(
+                f"Aucun résultat de benchmark exploitable, modèle par défaut : {PARAM.GEMINI_MODEL}"
+            )
+        return self.current
+
+
+# Instance partagée : choisie au démarrage dans main.py, lue à chaque appel
+gemini_model = ModelChoice()
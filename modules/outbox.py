@@ -0,0 +1,665 @@
+import asyncio
+from collections.abc import Callable
+import contextlib
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+import random
+import secrets
+import shutil
+import sqlite3
+import time
+
+import discord
+
+from modules.attachments import (
+    HostedAttachment,
+    SpooledFile,
+    attachment_embeds,
+)
+from modules.release_queue import release_queue
+from modules.releases import release_store
+from modules.sqlite_store import SQLiteStore
+import PARAM
+
+log = logging.getLogger("discord")
+
+OUTBOX_FILE = "data/outbox.sqlite3"
+# Copie des pièces jointes des annonces en file (le stockage des brouillons est temporaire)
+OUTBOX_FILES_DIR = "data/outbox"
+
+# Code renvoyé par Discord quand un message a déjà été publié
+ALREADY_CROSSPOSTED = 40033
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    announcement_id TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    files TEXT NOT NULL DEFAULT '[]',
+    embeds TEXT NOT NULL DEFAULT '[]',
+    publish INTEGER NOT NULL DEFAULT 0,
+    ghost INTEGER NOT NULL DEFAULT 0,
+    nonce INTEGER NOT NULL,
+    message_id INTEGER,
+    published INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (announcement_id, channel_id, position)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+
+
+@dataclass
+class Delivery:
+    """Annonce à envoyer dans un salon : ses morceaux, dans l'ordre."""
+
+    channel_id: int
+    chunks: list[str]
+    publish: bool = False
+    # Mention envoyée puis supprimée après les morceaux (None : pas de ping)
+    ghost_ping: str | None = None
+
+
+@dataclass
+class OutboxMessage:
+    """Morceau d'annonce en file (une ligne de la table `outbox`)."""
+
+    id: int
+    announcement_id: str
+    channel_id: int
+    position: int
+    content: str
+    files: list[SpooledFile] = field(default_factory=list)
+    embeds: list[HostedAttachment] = field(default_factory=list)
+    publish: bool = False
+    ghost: bool = False
+    nonce: int = 0
+    message_id: int | None = None
+    published: bool = False
+    attempts: int = 0
+    next_attempt: float = 0
+
+    @property
+    def group(self) -> tuple[str, int]:
+        return (self.announcement_id, self.channel_id)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> OutboxMessage:
+        return cls(
+            id=row["id"],
+            announcement_id=row["announcement_id"],
+            channel_id=row["channel_id"],
+            position=row["position"],
+            content=row["content"],
+            files=[SpooledFile(**f) for f in json.loads(row["files"])],
+            embeds=[HostedAttachment(**e) for e in json.loads(row["embeds"])],
+            publish=bool(row["publish"]),
+            ghost=bool(row["ghost"]),
+            nonce=row["nonce"],
+            message_id=row["message_id"],
+            published=bool(row["published"]),
+            attempts=row["attempts"],
+            next_attempt=row["next_attempt"],
+        )
+
+
+@dataclass
+class ScheduledAnnouncement:
+    """Annonce programmée dont aucun morceau n'est encore parti."""
+
+    announcement_id: str
+    not_before: float
+    channel_ids: list[int]
+
+
+def _copy_files(directory: str, files: list[SpooledFile]) -> list[dict]:
+    os.makedirs(directory, exist_ok=True)
+    copies = []
+    for index, file in enumerate(files):
+        extension = os.path.splitext(file.path)[1]
+        path = os.path.join(directory, f"{index:02d}{extension}")
+        shutil.copyfile(file.path, path)
+        copies.append({"filename": file.filename, "path": path, "size": file.size})
+    return copies
+
+
+class Outbox(SQLiteStore):
+    """
+    File d'envoi durable des annonces (SQLite).
+
+    Chaque morceau d'annonce est une ligne (salon, position, contenu, fichiers,
+    publication). Toute l'annonce est enregistrée en une transaction avant le
+    premier envoi : après une erreur ou un redémarrage, `OutboxWorker` reprend
+    là où il s'était arrêté, sans renvoyer les morceaux déjà postés.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(
+        self, path: str = OUTBOX_FILE, files_dir: str = OUTBOX_FILES_DIR
+    ) -> None:
+        super().__init__(path)
+        self.files_dir = files_dir
+        self._wake = asyncio.Event()
+        # Envois en cours par (annonce, salon). Gardés ici plutôt que dans le
+        # worker : après un rechargement du cog (/sync), le nouveau worker ne
+        # relance pas un salon que l'ancien est encore en train d'envoyer
+        self.in_flight: dict[tuple[str, int], asyncio.Task] = {}
+        self._settled: dict[str, asyncio.Event] = {}
+        self._results: dict[str, str] = {}
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def wait_for_work(self, delay: float | None) -> None:
+        """Attend un nouvel envoi en file (ou `delay` secondes)."""
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._wake.wait(), delay)
+        self._wake.clear()
+
+    async def enqueue(
+        self,
+        announcement_id: str,
+        deliveries: list[Delivery],
+        files: list[SpooledFile] | None = None,
+        embeds: list[HostedAttachment] | None = None,
+        not_before: float | None = None,
+    ) -> None:
+        """
+        Met une annonce en file. Les fichiers et les images sont joints au dernier
+        morceau de chaque salon. Mettre deux fois la même annonce en file est sans effet.
+
+        Avec `not_before` (secondes UNIX), l'annonce est programmée : le worker
+        dort jusqu'à cette date, y compris après un redémarrage.
+        """
+        directory = os.path.join(self.files_dir, announcement_id)
+        copies = await asyncio.to_thread(_copy_files, directory, files or [])
+        embeds_json = json.dumps(
+            [{"filename": e.filename, "url": e.url} for e in embeds or []]
+        )
+        now = time.time()
+        due = not_before or 0
+
+        rows = []
+        for delivery in deliveries:
+            for index, chunk in enumerate(delivery.chunks):
+                is_last = index == len(delivery.chunks) - 1
+                rows.append(
+                    (
+                        announcement_id,
+                        delivery.channel_id,
+                        index,
+                        chunk,
+                        json.dumps(copies) if is_last else "[]",
+                        embeds_json if is_last else "[]",
+                        int(delivery.publish),
+                        0,
+                        secrets.randbits(63),
+                        due,
+                        now,
+                    )
+                )
+            if delivery.ghost_ping:
+                rows.append(
+                    (
+                        announcement_id,
+                        delivery.channel_id,
+                        len(delivery.chunks),
+                        delivery.ghost_ping,
+                        "[]",
+                        "[]",
+                        0,
+                        1,
+                        secrets.randbits(63),
+                        due,
+                        now,
+                    )
+                )
+
+        def insert(connection: sqlite3.Connection) -> None:
+            connection.executemany(
+                "INSERT OR IGNORE INTO outbox (announcement_id, channel_id, position,"
+                " content, files, embeds, publish, ghost, nonce, next_attempt,"
+                " created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        await self._run(insert)
+        if not_before is None:
+            # Envoi immédiat : le bouton "Envoyer" attend le résultat avec `wait`
+            self._settled.setdefault(announcement_id, asyncio.Event())
+        log.info(f"Annonce {announcement_id} en file ({len(rows)} message(s)).")
+        self.wake()
+
+    async def pending(self) -> dict[tuple[str, int], list[OutboxMessage]]:
+        """
+        Morceaux restant à envoyer, regroupés par (annonce, salon) et dans l'ordre,
+        les salons les plus tôt dus en premier.
+        """
+
+        def select(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            return connection.execute(
+                "SELECT * FROM outbox WHERE status = 'pending'"
+                " ORDER BY announcement_id, channel_id, position"
+            ).fetchall()
+
+        groups: dict[tuple[str, int], list[OutboxMessage]] = {}
+        for row in await self._run(select):
+            message = OutboxMessage.from_row(row)
+            groups.setdefault(message.group, []).append(message)
+        return dict(sorted(groups.items(), key=lambda item: item[1][0].next_attempt))
+
+    async def mark_sent(self, message: OutboxMessage, message_id: int) -> None:
+        message.message_id = message_id
+        done = not message.publish
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "UPDATE outbox SET message_id = ?, status = ? WHERE id = ?",
+                (message_id, "done" if done else "pending", message.id),
+            )
+
+        await self._run(update)
+
+    async def mark_done(self, message: OutboxMessage) -> None:
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "UPDATE outbox SET published = publish, status = 'done' WHERE id = ?",
+                (message.id,),
+            )
+
+        await self._run(update)
+
+    async def retry_later(
+        self, group: list[OutboxMessage], error: str, delay: float
+    ) -> None:
+        """Reporte les morceaux restants d'un salon de `delay` secondes."""
+        ids = [(time.time() + delay, error, message.id) for message in group]
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt = ?,"
+                " last_error = ? WHERE id = ? AND status = 'pending'",
+                ids,
+            )
+
+        await self._run(update)
+
+    async def sent_messages(self, announcement_id: str, channel_id: int) -> list[int]:
+        """Identifiants des morceaux déjà postés (hors ghost ping) d'une annonce dans un salon."""
+
+        def select(connection: sqlite3.Connection) -> list[int]:
+            rows = connection.execute(
+                "SELECT message_id FROM outbox WHERE announcement_id = ?"
+                " AND channel_id = ? AND ghost = 0 AND message_id IS NOT NULL"
+                " ORDER BY position",
+                (announcement_id, channel_id),
+            ).fetchall()
+            return [message_id for (message_id,) in rows]
+
+        return await self._run(select)
+
+    async def message_ids(self, announcement_id: str) -> dict[int, list[int]]:
+        """Identifiants des morceaux postés d'une annonce, par salon."""
+
+        def select(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            return connection.execute(
+                "SELECT channel_id, message_id FROM outbox WHERE announcement_id = ?"
+                " AND ghost = 0 AND message_id IS NOT NULL ORDER BY channel_id, position",
+                (announcement_id,),
+            ).fetchall()
+
+        message_ids: dict[int, list[int]] = {}
+        for channel_id, message_id in await self._run(select):
+            message_ids.setdefault(channel_id, []).append(message_id)
+        return message_ids
+
+    async def fail(self, group: list[OutboxMessage], error: str) -> None:
+        def update(connection: sqlite3.Connection) -> None:
+            connection.executemany(
+                "UPDATE outbox SET status = 'failed', last_error = ?"
+                " WHERE id = ? AND status = 'pending'",
+                [(error, message.id) for message in group],
+            )
+
+        await self._run(update)
+
+    async def settle(self, announcement_id: str) -> str | None:
+        """
+        Termine l'annonce si plus aucun morceau n'est en attente : ses fichiers sont
+        supprimés et `wait` est réveillé. Renvoie "done", "failed" ou None (en cours).
+        """
+
+        def count(connection: sqlite3.Connection) -> dict[str, int]:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM outbox WHERE announcement_id = ?"
+                " GROUP BY status",
+                (announcement_id,),
+            ).fetchall()
+            return {status: total for status, total in rows}
+
+        counts = await self._run(count)
+        if counts.get("pending"):
+            return None
+
+        result = "failed" if counts.get("failed") else "done"
+        directory = os.path.join(self.files_dir, announcement_id)
+        await asyncio.to_thread(shutil.rmtree, directory, ignore_errors=True)
+        event = self._settled.get(announcement_id)
+        if event is not None:
+            self._results[announcement_id] = result
+            event.set()
+        log.info(f"Annonce {announcement_id} terminée ({result}).")
+        return result
+
+    async def wait(self, announcement_id: str, max_wait: float) -> str | None:
+        """Attend la fin de l'envoi d'une annonce : "done", "failed" ou None (toujours en cours)."""
+        event = self._settled.setdefault(announcement_id, asyncio.Event())
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(event.wait(), max_wait)
+        self._settled.pop(announcement_id, None)
+        return self._results.pop(announcement_id, None)
+
+    async def scheduled(self) -> list[ScheduledAnnouncement]:
+        """Annonces programmées pas encore commencées, de la plus proche à la plus lointaine."""
+        now = time.time()
+
+        def select(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            return connection.execute(
+                "SELECT announcement_id, MIN(next_attempt) AS not_before,"
+                " GROUP_CONCAT(DISTINCT channel_id) AS channel_ids FROM outbox"
+                " GROUP BY announcement_id HAVING MIN(next_attempt) > ?"
+                " AND SUM(status != 'pending' OR attempts > 0"
+                " OR message_id IS NOT NULL) = 0 ORDER BY not_before",
+                (now,),
+            ).fetchall()
+
+        return [
+            ScheduledAnnouncement(
+                row["announcement_id"],
+                row["not_before"],
+                [int(channel_id) for channel_id in row["channel_ids"].split(",")],
+            )
+            for row in await self._run(select)
+        ]
+
+    async def cancel(self, announcement_id: str) -> bool:
+        """
+        Retire une annonce programmée de la file. Refusé (False) si elle est
+        introuvable ou si son envoi a déjà commencé.
+        """
+        if any(key[0] == announcement_id for key in self.in_flight):
+            return False
+        now = time.time()
+
+        def delete(connection: sqlite3.Connection) -> bool:
+            # Même condition que `scheduled` : le worker n'a pas encore pris l'annonce
+            row = connection.execute(
+                "SELECT COUNT(*) AS total FROM outbox WHERE announcement_id = ?"
+                " GROUP BY announcement_id HAVING MIN(next_attempt) > ? AND SUM(status != 'pending'"
+                " OR attempts > 0 OR message_id IS NOT NULL) = 0",
+                (announcement_id, now),
+            ).fetchone()
+            if row is None:
+                return False
+            connection.execute(
+                "DELETE FROM outbox WHERE announcement_id = ?", (announcement_id,)
+            )
+            return True
+
+        if not await self._run(delete):
+            return False
+        directory = os.path.join(self.files_dir, announcement_id)
+        await asyncio.to_thread(shutil.rmtree, directory, ignore_errors=True)
+        log.info(f"Annonce programmée {announcement_id} annulée.")
+        return True
+
+    async def snapshot(self) -> dict[str, int]:
+        def count(connection: sqlite3.Connection) -> dict[str, int]:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+            return {status: total for status, total in rows}
+
+        return await self._run(count)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Erreur qui ne disparaîtra pas en réessayant (permissions, salon supprimé, requête invalide)."""
+    if isinstance(error, discord.Forbidden | discord.NotFound):
+        return True
+    if isinstance(error, discord.HTTPException):
+        return error.status < 500 and error.status != 429
+    return False
+
+
+def backoff_delay(attempts: int) -> float:
+    """Délai avant le prochain essai : exponentiel, plafonné, avec une part aléatoire."""
+    delay = min(
+        PARAM.OUTBOX_BACKOFF_MAX, PARAM.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1)
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+async def _add_verify_reaction(msg: discord.Message | discord.PartialMessage) -> None:
+    try:
+        verify_emoji = discord.PartialEmoji(
+            name="verify", animated=True, id=1350435235015426130
+        )
+        await msg.add_reaction(verify_emoji)
+    except Exception as e:
+        log.error(f"Impossible d'ajouter la réaction: {e}")
+
+
+class OutboxWorker:
+    """
+    Envoie les annonces en file.
+
+    Les salons sont traités en parallèle ; dans un salon, les morceaux sont envoyés
+    dans l'ordre et chacun n'est publié qu'après le précédent. Un salon en erreur
+    temporaire (5xx, réseau) est réessayé plus tard sans bloquer les autres. En cas
+    d'erreur définitive (ou trop d'essais), les morceaux déjà postés dans ce salon
+    sont supprimés : une annonce n'y reste jamais à moitié envoyée.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        get_channel: Callable[[int], discord.abc.GuildChannel | None],
+    ) -> None:
+        self.outbox = outbox
+        self.get_channel = get_channel
+
+    async def run(self) -> None:
+        """Boucle du worker : reprend les envois en attente puis attend les suivants."""
+        while True:
+            try:
+                delay = await self.dispatch()
+            except Exception as e:
+                log.error(f"Erreur dans la file d'envoi des annonces: {e}")
+                delay = PARAM.OUTBOX_BACKOFF_BASE
+            await self.outbox.wait_for_work(delay)
+
+    async def dispatch(self) -> float | None:
+        """
+        Lance l'envoi des salons prêts. Renvoie le délai avant le prochain essai
+        prévu (None : rien en attente hors envois en cours).
+        """
+        now = time.time()
+        waiting = []
+        for key, group in (await self.outbox.pending()).items():
+            if key in self.outbox.in_flight:
+                continue
+            if group[0].next_attempt > now:
+                waiting.append(group[0].next_attempt)
+                continue
+            task = asyncio.create_task(self.deliver(group))
+            self.outbox.in_flight[key] = task
+            task.add_done_callback(lambda _, key=key: self._done(key))
+        return max(0.0, min(waiting) - now) if waiting else None
+
+    def _done(self, key: tuple[str, int]) -> None:
+        self.outbox.in_flight.pop(key, None)
+        self.outbox.wake()
+
+    async def deliver(self, group: list[OutboxMessage]) -> None:
+        """Envoie (ou reprend) les morceaux d'une annonce dans un salon."""
+        announcement_id = group[0].announcement_id
+        channel = self.get_channel(group[0].channel_id)
+        if channel is None:
+            await self._abort(None, group, "salon introuvable")
+        else:
+            # Deux annonces pour le même salon partent l'une après l'autre
+            async with release_queue.turn(channel.id):
+                error = await self._send_group(channel, group)
+                if error is not None:
+                    await self._handle_error(channel, group, error)
+        if await self.outbox.settle(announcement_id) is not None:
+            # Les messages envoyés rejoignent l'historique des versions
+            message_ids = await self.outbox.message_ids(announcement_id)
+            await release_store.attach_messages(announcement_id, message_ids)
+            # Une annonce programmée ne devient la version actuelle qu'une fois partie
+            if message_ids:
+                await release_store.confirm(announcement_id)
+            else:
+                await release_store.cancel(announcement_id)
+
+    async def _send_group(
+        self, channel: discord.TextChannel, group: list[OutboxMessage]
+    ) -> Exception | None:
+        # La publication et la réaction ne bloquent pas l'envoi du morceau suivant
+        pending: list[asyncio.Task] = []
+        publishing: list[asyncio.Task] = []
+        error = None
+        try:
+            for message in group:
+                if message.ghost:
+                    # La mention part après la publication de toute l'annonce
+                    await asyncio.gather(*publishing)
+                    await self._ghost_ping(channel, message)
+                    continue
+
+                if message.message_id is None:
+                    # Le nonce rend l'envoi idempotent : si le bot s'arrête avant
+                    # d'enregistrer l'identifiant, Discord renvoie le même message
+                    msg = await channel.send(
+                        content=message.content,
+                        nonce=message.nonce,
+                        **self._attachments(message),
+                    )
+                    await self.outbox.mark_sent(message, msg.id)
+                    pending.append(asyncio.create_task(_add_verify_reaction(msg)))
+                else:
+                    msg = channel.get_partial_message(message.message_id)
+
+                if message.publish:
+                    previous = publishing[-1] if publishing else None
+                    publishing.append(
+                        asyncio.create_task(
+                            self._publish(channel, message, msg, previous)
+                        )
+                    )
+        except Exception as e:
+            error = e
+        finally:
+            results = await asyncio.gather(
+                *pending, *publishing, return_exceptions=True
+            )
+        if error is None:
+            error = next((r for r in results if isinstance(r, Exception)), None)
+        return error
+
+    def _attachments(self, message: OutboxMessage) -> dict:
+        kwargs = {}
+        files = [file.to_discord_file() for file in message.files if file.exists()]
+        if files:
+            kwargs["files"] = files
+        # Les images ne sont pas ré-uploadées : on réutilise leur URL CDN
+        embeds = attachment_embeds(message.embeds)
+        if embeds:
+            kwargs["embeds"] = embeds
+        return kwargs
+
+    async def _publish(
+        self,
+        channel: discord.TextChannel,
+        message: OutboxMessage,
+        msg: discord.Message | discord.PartialMessage,
+        previous: asyncio.Task | None,
+    ) -> None:
+        """Publie un morceau, après la publication du précédent."""
+        # Les serveurs abonnés reçoivent les morceaux dans l'ordre d'envoi. Si le
+        # précédent a échoué, celui-ci sera publié au prochain essai.
+        if previous:
+            await previous
+        try:
+            await msg.publish()
+            log.info(f"Message publié dans le canal d'annonces {channel.name}.")
+        except discord.Forbidden:
+            log.error(f"Permissions insuffisantes pour publier dans {channel.name}.")
+        except discord.HTTPException as e:
+            if e.code != ALREADY_CROSSPOSTED:
+                raise
+        await self.outbox.mark_done(message)
+
+    async def _ghost_ping(
+        self, channel: discord.TextChannel, message: OutboxMessage
+    ) -> None:
+        """Envoie une mention de rôle supprimée rapidement."""
+        try:
+            mention = await channel.send(message.content, nonce=message.nonce)
+            await asyncio.sleep(1)
+            await mention.delete()
+        except Exception as e:
+            log.error(f"Erreur lors du ghost ping dans {channel.name}: {e}")
+        await self.outbox.mark_done(message)
+
+    async def _handle_error(
+        self,
+        channel: discord.TextChannel,
+        group: list[OutboxMessage],
+        error: Exception,
+    ) -> None:
+        attempts = group[0].attempts + 1
+        if _is_permanent(error) or attempts >= PARAM.OUTBOX_MAX_ATTEMPTS:
+            await self._abort(channel, group, f"{type(error).__name__}: {error}")
+            return
+
+        delay = backoff_delay(attempts)
+        log.warning(
+            f"Envoi dans {channel.name} interrompu ({error}), nouvel essai"
+            f" {attempts + 1}/{PARAM.OUTBOX_MAX_ATTEMPTS} dans {delay:.0f}s."
+        )
+        await self.outbox.retry_later(group, str(error), delay)
+
+    async def _abort(
+        self,
+        channel: discord.TextChannel | None,
+        group: list[OutboxMessage],
+        reason: str,
+    ) -> None:
+        """Abandonne l'annonce dans ce salon et retire les morceaux déjà postés."""
+        log.error(
+            f"Envoi de l'annonce {group[0].announcement_id} abandonné dans le salon"
+            f" {group[0].channel_id}: {reason}"
+        )
+        if channel is not None:
+            announcement_id, channel_id = group[0].group
+            for message_id in await self.outbox.sent_messages(
+                announcement_id, channel_id
+            ):
+                with contextlib.suppress(discord.HTTPException):
+                    await channel.get_partial_message(message_id).delete()
+        await self.outbox.fail(group, reason)
+
+
+# File partagée par /update et /patch-note
+outbox = Outbox()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+
+import PARAM
+
+log = logging.getLogger("discord")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens d'un texte (~4 caractères par token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Seau à jetons : `capacity` jetons maximum, rechargés en continu."""
+
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = self.capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self._last_refill = now
+
+    def wait_time(self, amount: float) -> float:
+        """Temps (en secondes) à attendre avant de pouvoir retirer `amount` jetons."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        """Retire `amount` jetons (le solde peut devenir négatif pour régulariser)."""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Limiteur partagé : requêtes par minute et tokens par minute."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        # Le verrou garantit un ordre FIFO entre les appelants en attente
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.total_wait = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """Attend qu'une requête de `tokens` tokens puisse partir, puis la comptabilise."""
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    delay = max(
+                        self.requests.wait_time(1), self.tokens.wait_time(tokens)
+                    )
+                    if delay <= 0:
+                        break
+                    log.info(f"Limiteur Gemini : attente de {delay:.1f}s.")
+                    await asyncio.sleep(delay)
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+        finally:
+            self.waiting -= 1
+            self.total_wait += time.monotonic() - started
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Corrige le seau de tokens avec la consommation réelle renvoyée par l'API."""
+        self.tokens.consume(actual - estimated)
+
+    def snapshot(self) -> dict:
+        """État courant du limiteur (pour /infos-tech)."""
+        self.requests._refill()
+        self.tokens._refill()
+        return {
+            "requests_available": int(self.requests.tokens),
+            "requests_capacity": int(self.requests.capacity),
+            "tokens_available": int(self.tokens.tokens),
+            "tokens_capacity": int(self.tokens.capacity),
+            "waiting": self.waiting,
+            "total_wait": self.total_wait,
+        }
+
+
+class CircuitBreaker:
+    """
+    Coupe-circuit : après `failure_threshold` échecs consécutifs, les appels
+    échouent immédiatement pendant `reset_timeout` secondes. Un seul appel
+    d'essai est ensuite autorisé pour vérifier si l'API est rétablie.
+    """
+
+    CLOSED = "fermé"
+    OPEN = "ouvert"
+    HALF_OPEN = "semi-ouvert"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+
+    def retry_after(self) -> float:
+        """Secondes restantes avant qu'un nouvel essai soit autorisé."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and self.retry_after() > 0
+
+    def allow(self) -> bool:
+        """Indique si un appel peut être tenté maintenant."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_progress = False
+        # Semi-ouvert : un seul appel d'essai à la fois
+        if self._trial_in_progress:
+            return False
+        self._trial_in_progress = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            log.info("Coupe-circuit Gemini refermé : l'API répond de nouveau.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                log.warning(
+                    f"Coupe-circuit Gemini ouvert après {self.failures} échec(s), "
+                    f"pause de {self.reset_timeout:.0f}s."
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """État courant du coupe-circuit (pour /infos-tech)."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": self.retry_after(),
+        }
+
+
+# Instances partagées par toutes les commandes qui appellent Gemini
+gemini_limiter = RateLimiter(PARAM.GEMINI_RPM, PARAM.GEMINI_TPM)
+gemini_breaker = CircuitBreaker(
+    PARAM.GEMINI_BREAKER_THRESHOLD, PARAM.GEMINI_BREAKER_COOLDOWN
+)
@@ -0,0 +1,78 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+import contextlib
+import logging
+import time
+
+log = logging.getLogger("discord")
+
+# Nombre d'attentes récentes conservées pour les statistiques
+WAIT_HISTORY = 200
+
+
+class ReleaseQueue:
+    """
+    File des publications, une par salon de destination.
+
+    Deux annonces (ou deux prévisualisations) destinées au même salon sont
+    envoyées l'une après l'autre, dans l'ordre d'arrivée : leurs morceaux ne se
+    mélangent jamais. Les salons différents restent servis en parallèle, et la
+    préparation (correction, traductions) n'attend pas la file.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._waiting: dict[int, int] = {}
+        self._waits: deque[float] = deque(maxlen=WAIT_HISTORY)
+        self.served = 0
+        self.max_wait = 0.0
+
+    @contextlib.asynccontextmanager
+    async def turn(self, channel_id: int) -> AsyncIterator[None]:
+        """Attend le tour du salon `channel_id` et le garde pendant le bloc."""
+        lock = self._locks.setdefault(channel_id, asyncio.Lock())
+        started = time.monotonic()
+        self._waiting[channel_id] = self._waiting.get(channel_id, 0) + 1
+        try:
+            await lock.acquire()
+        finally:
+            self._waiting[channel_id] -= 1
+            if not self._waiting[channel_id]:
+                del self._waiting[channel_id]
+
+        waited = time.monotonic() - started
+        self._waits.append(waited)
+        self.served += 1
+        self.max_wait = max(self.max_wait, waited)
+        if waited >= 1:
+            log.info(
+                f"Publication dans le salon {channel_id} après {waited:.1f}s d'attente."
+            )
+        try:
+            yield
+        finally:
+            lock.release()
+            if not lock.locked() and channel_id not in self._waiting:
+                self._locks.pop(channel_id, None)
+
+    def depth(self, channel_id: int | None = None) -> int:
+        """Publications en attente de leur tour (dans un salon, ou au total)."""
+        if channel_id is not None:
+            return self._waiting.get(channel_id, 0)
+        return sum(self._waiting.values())
+
+    def snapshot(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "depth": self.depth(),
+            "busy_channels": sum(lock.locked() for lock in self._locks.values()),
+            "served": self.served,
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+# Instance partagée par les prévisualisations et la file d'envoi (outbox)
+release_queue = ReleaseQueue()
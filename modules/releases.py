@@ -0,0 +1,302 @@
+from dataclasses import dataclass, field
+import json
+import logging
+import sqlite3
+import time
+
+from modules.sqlite_store import SQLiteStore
+
+log = logging.getLogger("discord")
+
+RELEASES_FILE = "data/releases.sqlite3"
+# Ancien fichier de version, importé une seule fois à la création de la base
+LEGACY_VERSION_FILE = "data/version.json"
+DEFAULT_VERSION = "1.0.0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    announcement_id TEXT UNIQUE,
+    kind TEXT NOT NULL,
+    version TEXT NOT NULL,
+    released_at REAL NOT NULL,
+    texts TEXT NOT NULL DEFAULT '{}',
+    message_ids TEXT NOT NULL DEFAULT '{}',
+    scheduled INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS releases_version ON releases (version);
+CREATE INDEX IF NOT EXISTS releases_date ON releases (released_at);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def parse_version(version: str) -> tuple[int, ...] | None:
+    """(majeur, mineur, patch) pour une version `x.y.z`, None sinon."""
+    parts = version.split(".")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    return tuple(int(part) for part in parts)
+
+
+def next_patch(version: str) -> str:
+    """Version suivante : `x.y.z` → `x.y.(z+1)`."""
+    parsed = parse_version(version)
+    if parsed is None:
+        return version
+    major, minor, patch = parsed
+    return f"{major}.{minor}.{patch + 1}"
+
+
+class VersionBumpError(Exception):
+    """Version refusée : antérieure à la version actuelle."""
+
+
+@dataclass
+class Release:
+    """Version publiée (une ligne de la table `releases`)."""
+
+    id: int
+    announcement_id: str | None
+    kind: str  # "update" ou "patch"
+    version: str
+    released_at: float
+    texts: dict[str, dict] = field(default_factory=dict)  # {langue: textes}
+    message_ids: dict[int, list[int]] = field(default_factory=dict)  # {salon: messages}
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> Release:
+        return cls(
+            id=row["id"],
+            announcement_id=row["announcement_id"],
+            kind=row["kind"],
+            version=row["version"],
+            released_at=row["released_at"],
+            texts=json.loads(row["texts"]),
+            message_ids={
+                int(channel_id): ids
+                for channel_id, ids in json.loads(row["message_ids"]).items()
+            },
+        )
+
+
+def _legacy_version(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            version = json.load(f).get("version")
+    except OSError, ValueError, AttributeError:
+        return None
+    return version if isinstance(version, str) else None
+
+
+class ReleaseStore(SQLiteStore):
+    """
+    Version actuelle du bot et historique des publications (SQLite).
+
+    La version actuelle est gardée en mémoire : les formulaires /update et
+    /patch-note calculent la version suivante sans lire le disque. Chaque
+    publication ajoute une ligne (version, date, textes de chaque langue,
+    messages envoyés), indexée par version et par date. Une annonce programmée
+    reste à part (`scheduled`) jusqu'à son envoi : elle n'apparaît pas dans
+    l'historique et ne change pas la version actuelle.
+
+    Les écritures sont sérialisées et la vérification « la version ne recule
+    pas » se fait sous le même verrou que l'écriture.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(
+        self, path: str = RELEASES_FILE, legacy_path: str = LEGACY_VERSION_FILE
+    ) -> None:
+        super().__init__(path)
+        self.legacy_path = legacy_path
+        self._current: str | None = None
+
+    def _setup(self, connection: sqlite3.Connection) -> None:
+        """Met à jour une base plus ancienne et reprend la version de data/version.json."""
+        columns = {
+            row["name"] for row in connection.execute("PRAGMA table_info(releases)")
+        }
+        if "scheduled" not in columns:
+            connection.execute(
+                "ALTER TABLE releases ADD COLUMN scheduled INTEGER NOT NULL DEFAULT 0"
+            )
+        if connection.execute("SELECT 1 FROM state WHERE key = 'version'").fetchone():
+            return
+        version = _legacy_version(self.legacy_path)
+        if version is not None:
+            connection.execute(
+                "INSERT INTO state (key, value) VALUES ('version', ?)", (version,)
+            )
+            log.info(f"Version {version} reprise depuis {self.legacy_path}.")
+
+    @staticmethod
+    def _read_current(connection: sqlite3.Connection) -> str:
+        row = connection.execute(
+            "SELECT value FROM state WHERE key = 'version'"
+        ).fetchone()
+        return row["value"] if row else DEFAULT_VERSION
+
+    async def load(self) -> None:
+        """Charge la version actuelle (au démarrage, avant le premier formulaire)."""
+        self._current = await self._run(self._read_current)
+
+    @property
+    def current(self) -> str:
+        """Version actuelle, servie depuis la mémoire."""
+        if self._current is None:
+            # Filet de sécurité si `load` n'a pas été appelé : une seule lecture
+            self._current = self._read_current(self._connect())
+        return self._current
+
+    def check(self, version: str) -> None:
+        """Lève VersionBumpError si `version` est antérieure à la version actuelle."""
+        new, old = parse_version(version), parse_version(self.current)
+        if new is not None and old is not None and new < old:
+            raise VersionBumpError(
+                f"La version {version} est antérieure à la version actuelle {self.current}."
+            )
+
+    @staticmethod
+    def _set_current(connection: sqlite3.Connection, version: str) -> None:
+        connection.execute(
+            "INSERT INTO state (key, value) VALUES ('version', ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (version,),
+        )
+
+    async def set(self, version: str) -> None:
+        """Remplace la version sans condition ni publication (commande /version)."""
+        await self._run(lambda connection: self._set_current(connection, version))
+        self._current = version
+        log.info(f"Version mise à jour vers : {version}")
+
+    async def record(
+        self,
+        kind: str,
+        version: str,
+        texts: dict[str, dict],
+        announcement_id: str | None = None,
+        released_at: float | None = None,
+        scheduled: bool = False,
+    ) -> None:
+        """
+        Enregistre la publication de `version` et en fait la version actuelle.
+        Une annonce déjà enregistrée (même `announcement_id`) est mise à jour.
+
+        Une annonce programmée (`scheduled`) est seulement réservée : elle devient
+        la version actuelle à son envoi (`confirm`).
+        """
+
+        def insert(connection: sqlite3.Connection) -> None:
+            self.check(version)
+            connection.execute(
+                "INSERT INTO releases (announcement_id, kind, version, released_at,"
+                " texts, scheduled) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (announcement_id) DO UPDATE SET"
+                " version = excluded.version, released_at = excluded.released_at,"
+                " texts = excluded.texts, scheduled = excluded.scheduled",
+                (
+                    announcement_id,
+                    kind,
+                    version,
+                    released_at or time.time(),
+                    json.dumps(texts, ensure_ascii=False),
+                    int(scheduled),
+                ),
+            )
+            if not scheduled:
+                self._set_current(connection, version)
+
+        await self._run(insert)
+        if scheduled:
+            log.info(f"Version {version} programmée ({kind}).")
+            return
+        self._current = version
+        log.info(f"Version {version} enregistrée ({kind}).")
+
+    async def confirm(self, announcement_id: str) -> None:
+        """
+        Annonce programmée envoyée : elle rejoint l'historique et devient la version
+        actuelle, sauf si une version plus récente a été publiée entre-temps.
+        """
+
+        def update(connection: sqlite3.Connection) -> str | None:
+            row = connection.execute(
+                "SELECT version FROM releases WHERE announcement_id = ? AND scheduled = 1",
+                (announcement_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE releases SET scheduled = 0 WHERE announcement_id = ?",
+                (announcement_id,),
+            )
+            new = parse_version(row["version"])
+            old = parse_version(self._read_current(connection))
+            if new is None or old is None or new >= old:
+                self._set_current(connection, row["version"])
+            return self._read_current(connection)
+
+        current = await self._run(update)
+        if current is not None:
+            self._current = current
+            log.info(
+                f"Annonce programmée {announcement_id} envoyée, version actuelle : {current}."
+            )
+
+    async def cancel(self, announcement_id: str) -> None:
+        """Oublie la version d'une annonce programmée qui ne partira pas."""
+
+        def delete(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "DELETE FROM releases WHERE announcement_id = ? AND scheduled = 1",
+                (announcement_id,),
+            )
+
+        await self._run(delete)
+
+    async def attach_messages(
+        self, announcement_id: str, message_ids: dict[int, list[int]]
+    ) -> None:
+        """Associe les messages envoyés (par salon) à la publication de l'annonce."""
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "UPDATE releases SET message_ids = ? WHERE announcement_id = ?",
+                (json.dumps(message_ids), announcement_id),
+            )
+
+        await self._run(update)
+
+    async def history(self, limit: int = 10) -> list[Release]:
+        """Dernières publications, de la plus récente à la plus ancienne."""
+
+        def select(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            return connection.execute(
+                "SELECT * FROM releases WHERE scheduled = 0"
+                " ORDER BY released_at DESC, id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+        return [Release.from_row(row) for row in await self._run(select)]
+
+    async def find(self, version: str) -> Release | None:
+        """Dernière publication de `version`."""
+
+        def select(connection: sqlite3.Connection) -> sqlite3.Row | None:
+            return connection.execute(
+                "SELECT * FROM releases WHERE version = ? AND scheduled = 0"
+                " ORDER BY released_at DESC, id DESC LIMIT 1",
+                (version,),
+            ).fetchone()
+
+        row = await self._run(select)
+        return Release.from_row(row) if row else None
+
+
+# Instance partagée par /version, /update et /patch-note
+release_store = ReleaseStore()
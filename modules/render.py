@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from collections.abc import Callable
+import hashlib
+import json
+import re
+
+# Marqueurs de début de ligne des annonces → nom de l'icône dans PARAM.
+# Ajouter un marqueur ici suffit pour qu'il soit reconnu partout.
+MARKER_ICONS = {
+    "&": "checkmark",
+    "~": "crossmarck",
+    "£": "in_progress",
+}
+
+
+class LineMarkers:
+    """
+    Remplace les marqueurs placés en début de ligne, en un seul passage.
+
+    Un `&` au milieu d'une phrase ou d'un lien est laissé tel quel : seul le
+    premier caractère (hors indentation) d'une ligne est un marqueur.
+    """
+
+    def __init__(self, replacements: dict[str, str]) -> None:
+        self.replacements = dict(replacements)
+        # Les marqueurs les plus longs d'abord, si l'un est le préfixe d'un autre
+        symbols = sorted(self.replacements, key=len, reverse=True)
+        alternatives = "|".join(re.escape(symbol) for symbol in symbols)
+        self._pattern = re.compile(rf"^([ \t]*)({alternatives})", re.MULTILINE)
+
+    def _expand(self, match: re.Match) -> str:
+        return match.group(1) + self.replacements[match.group(2)]
+
+    def render(self, text: str) -> str:
+        if not self.replacements:
+            return text
+        return self._pattern.sub(self._expand, text)
+
+
+def fingerprint(data: object) -> str:
+    """Empreinte stable d'une structure JSON (textes d'une annonce, version...)."""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """
+    Mémoïse le rendu d'une annonce par l'empreinte de ses textes.
+
+    Rafraîchir une prévisualisation dont les textes n'ont pas changé (autre
+    langue éditée, bouton recliqué) ne reconstruit ni ne redécoupe le message.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get[T](self, data: object, render: Callable[[], T]) -> T:
+        key = fingerprint(data)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        result = render()
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
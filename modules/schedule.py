@@ -0,0 +1,66 @@
+from collections.abc import Awaitable, Callable
+import datetime
+import logging
+
+import discord
+from discord import ui
+import pytz
+
+log = logging.getLogger("discord")
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+# Format saisi dans le formulaire de programmation
+SCHEDULE_FORMAT = "%d/%m/%Y %H:%M"
+
+# Callback appelé avec l'horodatage (secondes UNIX) choisi
+type ScheduleCallback = Callable[[discord.Interaction, float], Awaitable[None]]
+
+
+def parse_paris_datetime(
+    text: str, now: datetime.datetime | None = None
+) -> datetime.datetime:
+    """
+    Convertit une date saisie ("JJ/MM/AAAA HH:MM", heure de Paris) en datetime
+    avec fuseau. Lève ValueError si le format est invalide ou la date passée.
+    """
+    try:
+        naive = datetime.datetime.strptime(text.strip(), SCHEDULE_FORMAT)
+    except ValueError:
+        raise ValueError(
+            "Format invalide, utilisez JJ/MM/AAAA HH:MM (ex: 25/12/2026 18:00)."
+        ) from None
+    # localize gère le changement d'heure (heure d'été / d'hiver)
+    moment = PARIS_TZ.localize(naive)
+    now = now or datetime.datetime.now(PARIS_TZ)
+    if moment <= now:
+        raise ValueError("La date choisie est déjà passée.")
+    return moment
+
+
+def format_paris(timestamp: float) -> str:
+    moment = datetime.datetime.fromtimestamp(timestamp, PARIS_TZ)
+    return moment.strftime("%d/%m/%Y à %H:%M")
+
+
+class ScheduleModal(ui.Modal, title="Programmer l'annonce"):
+    """Demande la date de publication d'une annonce (heure de Paris)."""
+
+    when = ui.TextInput(
+        label="Date et heure de publication (Paris)",
+        placeholder="25/12/2026 18:00",
+        max_length=16,
+    )
+
+    def __init__(self, on_schedule: ScheduleCallback) -> None:
+        super().__init__()
+        self.on_schedule = on_schedule
+        tomorrow = datetime.datetime.now(PARIS_TZ) + datetime.timedelta(days=1)
+        self.when.default = tomorrow.strftime(SCHEDULE_FORMAT)
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        try:
+            moment = parse_paris_datetime(self.when.value)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        await self.on_schedule(interaction, moment.timestamp())
@@ -0,0 +1,64 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import hashlib
+import json
+import logging
+
+log = logging.getLogger("discord")
+
+
+def request_key(*parts: object) -> str:
+    """Clé stable (SHA-256) identifiant une requête à partir de ses paramètres."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Table des requêtes en cours : les appels concurrents portant la même clé
+    partagent un seul et même calcul au lieu de le relancer chacun de leur côté.
+
+    Le calcul est annulé dès que son dernier appelant abandonne (échéance
+    dépassée) : rien ne continue à tourner pour un résultat que personne
+    n'attend plus.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._waiters.pop(task, None)
+
+    async def do[T](self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Exécute `func` une seule fois pour tous les appels simultanés de même clé."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        else:
+            self.coalesced += 1
+            log.info(f"Requête identique déjà en cours ({key[:8]}), résultat partagé.")
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield : l'annulation d'un appelant n'annule pas le calcul des autres
+            return await asyncio.shield(task)
+        finally:
+            if not task.done():
+                self._waiters[task] -= 1
+                if not self._waiters[task]:
+                    log.info(f"Requête abandonnée par tous ses appelants ({key[:8]}).")
+                    # Retirée tout de suite : un nouvel appel relance le calcul
+                    self._done(key, task)
+                    task.cancel()
+
+
+# Table partagée par toutes les commandes qui appellent Gemini
+gemini_flight = SingleFlight()
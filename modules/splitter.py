@@ -0,0 +1,158 @@
+from bisect import bisect_left, bisect_right
+import re
+
+# Limite de caractères d'un message Discord
+MESSAGE_LIMIT = 2000
+
+# Éléments qu'un découpage ne doit jamais couper : emojis personnalisés,
+# mentions (membre, rôle, salon, commande) et timestamps
+_TOKEN_RE = re.compile(
+    r"<a?:\w+:\d+>"
+    r"|<@[!&]?\d+>"
+    r"|<#\d+>"
+    r"|</[\w -]+:\d+>"
+    r"|<t:-?\d+(?::[tTdDfFR])?>"
+)
+# Longueur maximale d'un de ces éléments (nom de commande à 3 mots compris)
+_MAX_TOKEN = 120
+# Titres Markdown (# à ###) et sous-texte (-#)
+_HEADINGS = ("# ", "## ", "### ", "-# ")
+_FENCE = "```"
+FENCE_CLOSE = "\n```"
+
+
+def _fences(content: str) -> list[tuple[int, str, int]]:
+    """
+    Blocs de code du texte : (début de la ligne d'ouverture, ligne d'ouverture,
+    fin du bloc). Seules les occurrences de ``` sont visitées.
+    """
+    fences = []
+    opening = None
+    index = content.find(_FENCE)
+    while index != -1:
+        line_start = content.rfind("\n", 0, index) + 1
+        line_end = content.find("\n", index)
+        line_end = len(content) if line_end == -1 else line_end
+        line = content[line_start:line_end].strip()
+        # Une clôture n'est reconnue qu'en début de ligne, et un bloc ouvert et
+        # fermé sur la même ligne n'est pas un bloc
+        if content[line_start:index].strip(" \t") == "" and line.count(_FENCE) == 1:
+            if opening is None:
+                opening = (line_start, line)
+            else:
+                fences.append((opening[0], opening[1], line_end))
+                opening = None
+        index = content.find(_FENCE, line_end)
+    if opening is not None:
+        fences.append((opening[0], opening[1], len(content)))
+    return fences
+
+
+def _is_sticky_line(content: str, line_start: int, fences: list) -> bool:
+    """Ligne qui ne doit pas finir un morceau : titre ou ouverture de bloc de code."""
+    if content.startswith(_HEADINGS, line_start):
+        return True
+    index = bisect_left(fences, line_start, key=lambda fence: fence[0])
+    return index < len(fences) and fences[index][0] == line_start
+
+
+def _token_at(content: str, cut: int, start: int) -> int | None:
+    """
+    Début de l'élément (emoji, mention, lien) coupé par une coupure à `cut`.
+    La recherche ne remonte pas avant `start`, le début du morceau.
+    """
+    window_start = max(start, cut - _MAX_TOKEN)
+    for match in _TOKEN_RE.finditer(content, window_start, cut + _MAX_TOKEN):
+        if match.start() < cut < match.end():
+            return match.start()
+    # Un lien ne contient pas d'espace : il commence après le dernier blanc
+    if content[cut : cut + 1].isspace():
+        return None
+    word_start = (
+        max(content.rfind(" ", start, cut), content.rfind("\n", start, cut), start - 1)
+        + 1
+    )
+    if word_start < cut and content.startswith(("http://", "https://"), word_start):
+        return word_start
+    return None
+
+
+def _find_cut(content: str, start: int, end: int, fences: list) -> int:
+    """Position de coupure dans ]start, end] : saut de ligne, sinon espace, sinon brute."""
+    cut = content.rfind("\n", start + 1, end + 1)
+    if cut != -1:
+        # On évite de finir un morceau sur un titre : il part avec son contenu
+        line_start = content.rfind("\n", start, cut) + 1
+        if line_start - 1 > start and _is_sticky_line(content, line_start, fences):
+            return line_start - 1
+        return cut
+
+    cut = content.rfind(" ", start + 1, end + 1)
+    while cut != -1:
+        token_start = _token_at(content, cut, start)
+        if token_start is None:
+            return cut
+        cut = content.rfind(" ", start + 1, token_start)
+
+    # Aucun séparateur : coupure brute, avant l'élément coupé si possible
+    token_start = _token_at(content, end, start)
+    if token_start is not None and token_start > start:
+        return token_start
+    return end
+
+
+def _fence_at(fences: list[tuple[int, str, int]], cut: int) -> str | None:
+    """Ligne d'ouverture du bloc de code coupé par une coupure à `cut`."""
+    index = bisect_right(fences, cut, key=lambda fence: fence[0]) - 1
+    if index >= 0:
+        start, opening, end = fences[index]
+        if start < cut < end:
+            return opening
+    return None
+
+
+def split_message(content: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """
+    Découpe un message en morceaux de `limit` caractères maximum.
+
+    La coupure se fait de préférence à un saut de ligne, sinon à un espace, sans
+    jamais couper un emoji, une mention, un lien ou un titre. Un bloc de code
+    coupé est refermé à la fin du morceau et rouvert (avec son langage) au début
+    du suivant. Le texte est parcouru une seule fois, sans recopier le reste à
+    chaque morceau : le coût reste linéaire même pour de très longs messages.
+    """
+    if len(content) <= limit:
+        return [content]
+
+    fences = _fences(content) if _FENCE in content else []
+    # Place réservée pour refermer un bloc de code coupé
+    reserve = len(FENCE_CLOSE) if fences else 0
+    length = len(content)
+    chunks = []
+    prefix = ""
+    position = 0
+
+    while position < length:
+        budget = limit - len(prefix)
+        if length - position <= budget:
+            chunks.append(prefix + content[position:])
+            break
+
+        cut = _find_cut(content, position, position + budget - reserve, fences)
+        chunk = prefix + content[position:cut]
+        opening = _fence_at(fences, cut) if fences else None
+        if opening is not None:
+            chunks.append(chunk + FENCE_CLOSE)
+            # Le bloc est rouvert tel quel (indentation du code conservée)
+            prefix = f"{opening}\n" if len(opening) < limit // 2 else "```\n"
+            position = cut + 1 if content[cut : cut + 1] in ("\n", " ") else cut
+            continue
+
+        chunks.append(chunk)
+        prefix = ""
+        # On retire les espaces/sauts de ligne au début du morceau suivant
+        position = cut
+        while position < length and content[position] in " \n":
+            position += 1
+
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import Callable
+import os
+import sqlite3
+
+
+class SQLiteStore:
+    """
+    Base des stockages SQLite du bot (file d'envoi, historique des versions).
+
+    La base est ouverte au premier accès (mode WAL, schéma `schema` créé si
+    besoin). Les requêtes passent une à une par un thread, chacune dans sa
+    propre transaction, pour ne pas bloquer la boucle d'événements.
+    """
+
+    schema: str = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    def _setup(self, connection: sqlite3.Connection) -> None:
+        """Étape exécutée une fois après la création du schéma (migrations)."""
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.schema)
+            self._setup(connection)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    async def _run[T](self, query: Callable[[sqlite3.Connection], T]) -> T:
+        def run() -> T:
+            connection = self._connect()
+            with connection:
+                return query(connection)
+
+        async with self._lock:
+            return await asyncio.to_thread(run)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
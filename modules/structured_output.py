@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+import json
+import re
+
+# Bloc de code Markdown entourant parfois la réponse (```json ... ```)
+_FENCE_RE = re.compile(r"^```[\w-]*\s*\n?(.*?)\n?\s*```$", re.DOTALL)
+# Virgule en trop avant la fin d'un objet ou d'une liste
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+@dataclass
+class StructuredOutput:
+    """Réponse JSON validée : données exploitables, champs manquants, réparations."""
+
+    data: dict
+    missing: list[str] = field(default_factory=list)
+    repairs: list[str] = field(default_factory=list)
+
+
+def _decode(text: str, repairs: list[str]) -> dict | None:
+    """Décode l'objet JSON de `text` en corrigeant les défauts de forme courants."""
+    text = text.strip()
+    fenced = _FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1)
+        repairs.append("bloc de code retiré")
+
+    # strict=False : les sauts de ligne bruts dans les chaînes sont acceptés
+    try:
+        data = json.loads(text, strict=False)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        candidate = _TRAILING_COMMA_RE.sub(r"\1", text[start : end + 1])
+        try:
+            data = json.loads(candidate, strict=False)
+        except ValueError:
+            return None
+        repairs.append("objet JSON extrait du texte")
+    return data if isinstance(data, dict) else None
+
+
+def _as_text(value: object) -> str | None:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "\n".join(value)
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def parse_structured(text: str, schema: dict) -> StructuredOutput:
+    """
+    Valide la réponse `text` d'après `schema` (objet de chaînes) et la répare
+    au lieu de la rejeter : bloc de code Markdown, texte autour de l'objet,
+    virgules en trop, `\\n` échappés deux fois, listes au lieu de texte.
+
+    Les champs requis absents, vides ou inutilisables sont listés dans
+    `missing` : seuls ceux-là sont à redemander au modèle.
+    """
+    repairs: list[str] = []
+    data = _decode(text, repairs)
+    if data is None:
+        return StructuredOutput({}, list(schema.get("required", [])), repairs)
+
+    properties = schema.get("properties", {})
+    for key, spec in properties.items():
+        if key not in data or spec.get("type") != "STRING":
+            continue
+        value = _as_text(data[key])
+        if value is None:
+            del data[key]
+            continue
+        if value is not data[key]:
+            repairs.append(f"'{key}' converti en texte")
+        if "\\n" in value:
+            value = value.replace("\\n", "\n")
+            repairs.append(f"sauts de ligne de '{key}'")
+        data[key] = value
+
+    missing = [key for key in schema.get("required", []) if not data.get(key)]
+    return StructuredOutput(data, missing, repairs)
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+import string
+
+log = logging.getLogger("discord")
+
+# Un fichier JSON par domaine (update.json, patch.json, statut.json) : pour chaque
+# langue, le nom de chaque formulation et son texte avec ses champs entre accolades
+TEMPLATES_DIR = "data/templates"
+# Langue utilisée pour les formulations absentes d'une langue
+FALLBACK_LANGUAGE = "en"
+
+_formatter = string.Formatter()
+
+
+@dataclass(frozen=True)
+class Template:
+    """
+    Modèle de texte compilé une seule fois : le texte est découpé à la création
+    en morceaux littéraux et en champs `{nom}` (avec un éventuel format, ex:
+    `{count:>3}`), le rendu se contente ensuite de les assembler.
+    """
+
+    source: str
+    _parts: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        parts = []
+        for literal, name, spec, conversion in _formatter.parse(self.source):
+            if name is not None and (
+                not name.isidentifier() or conversion or "{" in (spec or "")
+            ):
+                raise ValueError(f"Champ invalide '{{{name}}}' dans « {self.source} »")
+            parts.append((literal, name, spec or ""))
+        object.__setattr__(self, "_parts", tuple(parts))
+
+    @property
+    def fields(self) -> set[str]:
+        return {name for _, name, _ in self._parts if name is not None}
+
+    def __call__(self, **values: object) -> str:
+        out = []
+        for literal, name, spec in self._parts:
+            out.append(literal)
+            if name is None:
+                continue
+            if name not in values:
+                # Un champ mal orthographié dans un fichier ne doit pas bloquer
+                # une annonce : il est laissé tel quel
+                log.warning(
+                    f"Champ inconnu '{{{name}}}' dans le modèle « {self.source} »"
+                )
+                out.append(f"{{{name}}}")
+                continue
+            out.append(format(values[name], spec))
+        return "".join(out)
+
+
+def _compile(data: object) -> dict[str, dict[str, Template]]:
+    """Compile le contenu d'un fichier de modèles (langue → nom → Template)."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError("Le fichier doit contenir un objet {langue: {nom: texte}}.")
+    compiled = {}
+    for language, entries in data.items():
+        if not isinstance(entries, dict) or not all(
+            isinstance(source, str) for source in entries.values()
+        ):
+            raise ValueError(f"Langue '{language}' : textes attendus.")
+        compiled[language] = {name: Template(src) for name, src in entries.items()}
+
+    # Chaque langue est complétée par la langue de repli, une fois pour toutes
+    fallback = compiled.get(FALLBACK_LANGUAGE, {})
+    return {
+        language: {**fallback, **templates} for language, templates in compiled.items()
+    }
+
+
+class TemplateStore:
+    """
+    Formulations des annonces et des embeds de statut, lues dans `directory`.
+
+    Chaque fichier est rechargé (et recompilé) uniquement quand sa date de
+    modification change : modifier un texte ne demande ni redémarrage ni /sync.
+    Un fichier invalide est signalé dans les logs et la dernière version valide
+    reste utilisée.
+    """
+
+    def __init__(self, directory: str = TEMPLATES_DIR) -> None:
+        self.directory = directory
+        self._domains: dict[str, dict[str, dict[str, Template]]] = {}
+        self._mtimes: dict[str, int] = {}
+        # Incrémenté à chaque rechargement, pour invalider les rendus en cache
+        self._generation = 0
+
+    def _refresh(self, domain: str) -> None:
+        path = os.path.join(self.directory, f"{domain}.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            if domain in self._domains:
+                log.error(f"Modèles '{path}' introuvables, dernière version conservée.")
+                return
+            raise
+        if self._mtimes.get(domain) == mtime:
+            return
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                compiled = _compile(json.load(f))
+        except (OSError, ValueError) as e:
+            if domain not in self._domains:
+                raise
+            # On ne relit pas le même fichier invalide à chaque appel
+            self._mtimes[domain] = mtime
+            log.error(f"Modèles '{path}' invalides, dernière version conservée: {e}")
+            return
+
+        self._domains[domain] = compiled
+        self._mtimes[domain] = mtime
+        self._generation += 1
+        log.info(f"Modèles '{path}' chargés.")
+
+    def get(self, domain: str, language: str) -> dict[str, Template]:
+        """Modèles d'un domaine dans `language` (ou dans la langue de repli)."""
+        self._refresh(domain)
+        languages = self._domains[domain]
+        return (
+            languages.get(language)
+            or languages.get(FALLBACK_LANGUAGE)
+            or next(iter(languages.values()))
+        )
+
+    def revision(self, *domains: str) -> int:
+        """
+        Numéro de version des modèles, après relecture des fichiers modifiés :
+        à inclure dans la clé des rendus mis en cache.
+        """
+        for domain in domains:
+            self._refresh(domain)
+        return self._generation
+
+    def render(self, domain: str, name: str, language: str, **values: object) -> str:
+        return self.get(domain, language)[name](**values)
+
+
+# Instance partagée par /update, /patch-note et les embeds de statut
+templates = TemplateStore()
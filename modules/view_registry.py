@@ -0,0 +1,162 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+import json
+import logging
+import time
+
+import discord
+from discord import ui
+
+from modules.attachments import attachment_store
+from modules.drafts import draft_store
+import PARAM
+
+log = logging.getLogger("discord")
+
+
+@dataclass
+class _Entry:
+    # None : brouillon restauré au démarrage, pas encore cliqué depuis
+    view: ui.View | None
+    message: discord.Message | None
+    last_used: float
+
+
+def _texts_footprint(view: ui.View) -> int:
+    """Taille approximative (octets) des textes gardés en mémoire par la vue."""
+    texts = getattr(view, "texts", {})
+    return len(json.dumps(texts, ensure_ascii=False).encode("utf-8"))
+
+
+class ViewRegistry:
+    """
+    Registre borné des vues d'annonces vivantes (une par brouillon).
+
+    Au-delà de `max_views`, ou après `idle_ttl` secondes sans interaction, le
+    brouillon le plus ancien est expiré : ses boutons sont désactivés, la vue
+    est retirée de discord.py et ses pièces jointes et son brouillon sont libérés.
+    """
+
+    def __init__(
+        self, max_views: int, idle_ttl: float, sweep_interval: float = 300
+    ) -> None:
+        self.max_views = max_views
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._entries: dict[str, _Entry] = {}
+        self._sweeper: asyncio.Task | None = None
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, draft_id: str) -> bool:
+        return draft_id in self._entries
+
+    async def track(
+        self, draft_id: str, view: ui.View, message: discord.Message | None = None
+    ) -> None:
+        """Enregistre (ou rafraîchit) la vue d'un brouillon et expire les plus anciennes."""
+        entry = self._entries.get(draft_id)
+        if entry and entry.view is view and message is None:
+            message = entry.message
+        self._entries[draft_id] = _Entry(view, message, time.monotonic())
+        self._ensure_sweeper()
+        await self._enforce_max(keep=draft_id)
+
+    async def _enforce_max(self, keep: str | None = None) -> None:
+        while len(self._entries) > self.max_views:
+            oldest = min(
+                (d for d in self._entries if d != keep),
+                key=lambda d: self._entries[d].last_used,
+            )
+            await self.evict(oldest, reason="trop de brouillons actifs")
+
+    async def restore(self) -> None:
+        """
+        Inscrit les brouillons persistés (une fois le bot connecté) avec leur dernière
+        utilisation : ceux qui ne sont plus jamais cliqués expirent comme les
+        autres. Les brouillons déjà inactifs depuis `idle_ttl` sont supprimés.
+        """
+        now = time.time()
+        for draft in await draft_store.all():
+            if draft.draft_id in self._entries:
+                continue
+            idle = max(0.0, now - draft.updated_at)
+            self._entries[draft.draft_id] = _Entry(None, None, time.monotonic() - idle)
+        if self._entries:
+            self._ensure_sweeper()
+        await self.sweep()
+        await self._enforce_max()
+
+    def touch(self, draft_id: str) -> None:
+        entry = self._entries.get(draft_id)
+        if entry:
+            entry.last_used = time.monotonic()
+
+    def forget(self, draft_id: str) -> None:
+        """Retire un brouillon publié ou annulé (sans toucher à son message)."""
+        entry = self._entries.pop(draft_id, None)
+        if entry and entry.view:
+            entry.view.stop()
+
+    async def evict(self, draft_id: str, reason: str) -> None:
+        """Désactive les boutons du brouillon et libère tout ce qu'il occupe."""
+        entry = self._entries.pop(draft_id, None)
+        if entry is None:
+            return
+        log.info(f"Brouillon {draft_id} expiré ({reason}).")
+        self.evicted += 1
+
+        # Un brouillon restauré jamais cliqué n'a pas de vue : ses boutons
+        # répondront que le brouillon est introuvable
+        if entry.view:
+            for child in entry.view.children:
+                if isinstance(child, ui.Button):
+                    child.disabled = True
+            if entry.message:
+                with contextlib.suppress(discord.HTTPException):
+                    await entry.message.edit(view=entry.view)
+            entry.view.stop()
+
+        attachment_store.release(draft_id)
+        await draft_store.delete(draft_id)
+
+    async def sweep(self) -> None:
+        """Expire les brouillons inactifs depuis plus de `idle_ttl` secondes."""
+        now = time.monotonic()
+        expired = [
+            draft_id
+            for draft_id, entry in self._entries.items()
+            if now - entry.last_used > self.idle_ttl
+        ]
+        for draft_id in expired:
+            await self.evict(draft_id, reason="inactif")
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def _sweep_forever(self) -> None:
+        while self._entries:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                log.error(f"Erreur lors de l'expiration des brouillons: {e}")
+
+    def snapshot(self) -> dict:
+        return {
+            "views": len(self._entries),
+            "max_views": self.max_views,
+            "memory_bytes": sum(
+                _texts_footprint(entry.view) for entry in self._entries.values()
+            ),
+            "attachment_bytes": attachment_store.used_bytes,
+            "evicted": self.evicted,
+        }
+
+
+# Registre partagé par /update et /patch-note
+view_registry = ViewRegistry(PARAM.VIEW_REGISTRY_MAX, PARAM.VIEW_IDLE_TTL)
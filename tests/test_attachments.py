@@ -0,0 +1,251 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+import modules.attachments as attachments_module
+from modules.attachments import (
+    DOWNLOAD_CONCURRENCY,
+    MAX_ATTACHMENTS,
+    AttachmentStore,
+    AttachmentTooLargeError,
+    HostedAttachment,
+    SpooledFile,
+    attachment_embeds,
+    files_to_reupload,
+    is_image,
+    refresh_hosted,
+    spool_attachments,
+    upload_once,
+)
+
+
+def _attachment(filename: str, url: str) -> MagicMock:
+    attachment = MagicMock(spec=discord.Attachment)
+    attachment.filename = filename
+    attachment.url = url
+    return attachment
+
+
+def _spooled(tmp_path: object, filename: str, data: bytes = b"data") -> SpooledFile:
+    path = tmp_path / filename
+    path.write_bytes(data)
+    return SpooledFile(filename, str(path), len(data))
+
+
+def test_is_image() -> None:
+    assert is_image("capture.PNG")
+    assert is_image("anim.gif")
+    assert not is_image("notes.txt")
+
+
+@pytest.mark.asyncio
+async def test_upload_once_sends_files_a_single_time(tmp_path: object) -> None:
+    uploaded = [_attachment("a.png", "https://cdn/a.png")]
+    channel = AsyncMock(id=5)
+    channel.send.return_value = MagicMock(id=9, attachments=uploaded)
+
+    result = await upload_once(channel, [_spooled(tmp_path, "a.png")])
+
+    assert result == [HostedAttachment("a.png", "https://cdn/a.png", 5, 9)]
+    channel.send.assert_awaited_once()
+    assert len(channel.send.call_args.kwargs["files"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_once_without_files() -> None:
+    channel = AsyncMock()
+
+    assert await upload_once(channel, []) == []
+    channel.send.assert_not_called()
+
+
+def test_images_are_embedded_and_other_files_reuploaded(tmp_path: object) -> None:
+    uploaded = [
+        _attachment("a.png", "https://cdn/a.png"),
+        _attachment("b.jpg", "https://cdn/b.jpg"),
+        _attachment("notes.txt", "https://cdn/notes.txt"),
+    ]
+    files_data = [_spooled(tmp_path, name) for name in ("a.png", "b.jpg", "notes.txt")]
+
+    embeds = attachment_embeds(uploaded)
+    files = files_to_reupload(files_data, uploaded)
+
+    assert [e.image.url for e in embeds] == ["https://cdn/a.png", "https://cdn/b.jpg"]
+    # Même url pour tous les embeds : affichage en galerie
+    assert {e.url for e in embeds} == {"https://cdn/a.png"}
+    assert [f.filename for f in files] == ["notes.txt"]
+
+
+def test_failed_upload_falls_back_to_reupload(tmp_path: object) -> None:
+    files = files_to_reupload([_spooled(tmp_path, "a.png")], [])
+
+    assert [f.filename for f in files] == ["a.png"]
+
+
+@pytest.mark.asyncio
+async def test_store_spools_to_disk_and_releases() -> None:
+    store = AttachmentStore(max_bytes=100)
+
+    spooled = await store.add("draft", "../../etc/passwd.png", b"x" * 10)
+
+    assert spooled.exists()
+    assert "passwd" not in spooled.path
+    assert store.files("draft") == [spooled]
+    assert store.used_bytes == 10
+
+    store.release("draft")
+
+    assert not spooled.exists()
+    assert store.files("draft") == []
+    assert store.used_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_least_recently_used_draft() -> None:
+    store = AttachmentStore(max_bytes=100)
+    old = await store.add("old", "a.png", b"x" * 40)
+    await store.add("recent", "b.png", b"x" * 40)
+    store.files("old")  # "old" redevient le plus récent
+
+    await store.add("new", "c.png", b"x" * 40)
+
+    assert "recent" not in store
+    assert old.exists()
+    assert store.evicted == 1
+    assert store.used_bytes == 80
+
+
+@pytest.mark.asyncio
+async def test_store_rejects_files_over_budget() -> None:
+    store = AttachmentStore(max_bytes=100)
+    await store.add("draft", "a.png", b"x" * 60)
+
+    with pytest.raises(AttachmentTooLargeError):
+        await store.add("other", "huge.png", b"x" * 101)
+    with pytest.raises(AttachmentTooLargeError):
+        await store.add("draft", "b.png", b"x" * 60)
+
+    assert store.used_bytes == 60
+
+
+@pytest.mark.asyncio
+async def test_spool_attachments_downloads_concurrently_in_order() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    def make(filename: str, size: int = 4) -> MagicMock:
+        async def read() -> bytes:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return filename.encode()
+
+        attachment = _attachment(filename, "")
+        attachment.size = size
+        attachment.read = read
+        return attachment
+
+    attachments = [make(f"{i}.png") for i in range(MAX_ATTACHMENTS + 1)]
+    attachments[2] = make("huge.png", size=1000)
+    store = AttachmentStore(max_bytes=10_000)
+
+    with (
+        patch.object(attachments_module.PARAM, "ATTACHMENT_MAX_FILE_BYTES", 100),
+        patch.object(attachments_module.PARAM, "MEDIA_OPTIMIZE", False),
+    ):
+        report = await spool_attachments("draft", attachments, store)
+
+    assert 1 < max_in_flight <= DOWNLOAD_CONCURRENCY
+    names = [file.filename for file in store.files("draft")]
+    assert names == [f"{i}.png" for i in range(MAX_ATTACHMENTS) if i != 2]
+    assert len(report.errors) == 2
+    assert "huge.png" in report.errors[1]
+    assert f"{MAX_ATTACHMENTS}.png" in report.errors[0]
+    assert report.saved_bytes == 0
+    store.release("draft")
+
+
+@pytest.mark.asyncio
+async def test_refresh_hosted_renews_urls_and_respools_lost_files() -> None:
+    # Brouillon restauré plus de 24 h après : URL expirées, fichiers perdus
+    expired = [HostedAttachment("a.png", "https://cdn/a.png?ex=old", 5, 9)]
+    fresh = _attachment("a.png", "https://cdn/a.png?ex=new")
+    fresh.size = 2
+    fresh.read = AsyncMock(return_value=b"ok")
+    channel = AsyncMock(id=5)
+    channel.fetch_message.return_value = MagicMock(id=9, attachments=[fresh])
+    guild = MagicMock()
+    guild.get_channel.return_value = channel
+    store = AttachmentStore(max_bytes=1000)
+
+    with patch.object(attachments_module.PARAM, "MEDIA_OPTIMIZE", False):
+        result = await refresh_hosted(guild, "draft", expired, store)
+
+    assert result == [HostedAttachment("a.png", "https://cdn/a.png?ex=new", 5, 9)]
+    channel.fetch_message.assert_awaited_once_with(9)
+    [spooled] = store.files("draft")
+    with open(spooled.path, "rb") as f:
+        assert f.read() == b"ok"
+    store.release("draft")
+
+
+@pytest.mark.asyncio
+async def test_refresh_hosted_keeps_urls_when_message_is_gone() -> None:
+    uploaded = [HostedAttachment("a.png", "https://cdn/a.png", 5, 9)]
+    channel = AsyncMock(id=5)
+    channel.fetch_message.side_effect = discord.NotFound(MagicMock(status=404), "")
+    guild = MagicMock()
+    guild.get_channel.return_value = channel
+
+    assert await refresh_hosted(guild, "draft", uploaded) == uploaded
+
+
+@pytest.mark.asyncio
+async def test_spool_attachments_reports_read_errors_per_file() -> None:
+    ok = _attachment("ok.png", "")
+    ok.size = 2
+    ok.read = AsyncMock(return_value=b"ok")
+    broken = _attachment("broken.png", "")
+    broken.size = 2
+    broken.read = AsyncMock(
+        side_effect=discord.HTTPException(MagicMock(status=404), "Not Found")
+    )
+    store = AttachmentStore(max_bytes=1000)
+
+    with (
+        patch.object(attachments_module.PARAM, "ATTACHMENT_MAX_FILE_BYTES", 100),
+        patch.object(attachments_module.PARAM, "MEDIA_OPTIMIZE", False),
+    ):
+        report = await spool_attachments("draft", [broken, ok], store)
+
+    assert [file.filename for file in store.files("draft")] == ["ok.png"]
+    assert len(report.errors) == 1
+    assert "broken.png" in report.errors[0]
+    store.release("draft")
+
+
+@pytest.mark.asyncio
+async def test_spool_attachments_recompresses_large_images() -> None:
+    attachment = _attachment("capture.png", "")
+    attachment.size = 500  # au-delà de la limite, mais recompressible
+    attachment.read = AsyncMock(return_value=b"x" * 500)
+    optimized = attachments_module.media.OptimizedImage("capture.webp", b"x" * 50, 500)
+    store = AttachmentStore(max_bytes=1000)
+
+    with (
+        patch.object(attachments_module.PARAM, "ATTACHMENT_MAX_FILE_BYTES", 100),
+        patch.object(attachments_module.PARAM, "MEDIA_MAX_SOURCE_BYTES", 1000),
+        patch("modules.media.can_optimize", return_value=True),
+        patch("modules.media.optimize_image", AsyncMock(return_value=optimized)),
+    ):
+        report = await spool_attachments("draft", [attachment], store)
+
+    assert report.errors == []
+    assert report.saved_bytes == 450
+    assert "économisés" in report.saved_note()
+    assert [file.filename for file in store.files("draft")] == ["capture.webp"]
+    store.release("draft")
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from modules.deadline import Deadline
+
+
+def test_share_keeps_reserve_for_later_stages() -> None:
+    deadline = Deadline(10)
+
+    assert 9 < deadline.remaining() <= 10
+    assert 3.5 < deadline.share(0.5, reserve=2).remaining() <= 4
+    assert deadline.share(reserve=20).expired
+    assert Deadline(-1).remaining() == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_cancels_slow_stage() -> None:
+    deadline = Deadline(0.05)
+
+    with pytest.raises(TimeoutError):
+        async with deadline.timeout():
+            await asyncio.sleep(1)
+    assert deadline.expired
@@ -0,0 +1,96 @@
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+os.environ["GEMINI_API"] = "fake_key"
+
+from cog.patch_note import PatchNoteView  # noqa: E402
+from modules.attachments import HostedAttachment  # noqa: E402
+from modules.drafts import Draft, DraftStore  # noqa: E402
+
+
+def _draft(draft_id: str = "1", message_id: int = 42) -> Draft:
+    return Draft(
+        draft_id,
+        "patch",
+        {"fr": {"changes": "FR"}, "en": {"changes": "EN"}},
+        version="1.0.1",
+        uploaded=[HostedAttachment("a.png", "https://cdn/a.png")],
+        message_id=message_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_store_round_trip(tmp_path: object) -> None:
+    path = str(tmp_path / "drafts.json")
+    saved = _draft()
+    await DraftStore(path).save(saved)
+
+    # Un nouveau store (après redémarrage) relit le fichier au premier accès
+    store = DraftStore(path)
+    assert store._drafts is None
+    draft = await store.find_by_message(42)
+
+    assert draft == saved
+    assert await store.get("unknown") is None
+
+    await store.delete("1")
+    with open(path) as f:
+        assert json.load(f) == {}
+
+
+@pytest.mark.asyncio
+async def test_store_ignores_corrupted_file(tmp_path: object) -> None:
+    path = tmp_path / "drafts.json"
+    path.write_text("{not json")
+
+    assert await DraftStore(str(path)).get("1") is None
+
+
+@pytest.mark.asyncio
+async def test_persistent_view_has_stable_custom_ids() -> None:
+    with patch("cog.patch_note.PARAM") as mock_param:
+        mock_param.UPDATE_LANGUAGES = {"fr": 1, "en": 2}
+        view = PatchNoteView.persistent()
+
+    assert view.is_persistent()
+    assert sorted(item.custom_id for item in view.children) == [
+        "patch:cancel",
+        "patch:edit:en",
+        "patch:edit:fr",
+        "patch:schedule",
+        "patch:send",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_persistent_view_loads_draft_on_click(tmp_path: object) -> None:
+    store = DraftStore(str(tmp_path / "drafts.json"))
+    await store.save(_draft())
+    interaction = AsyncMock()
+    interaction.message = MagicMock(id=42)
+
+    with patch("modules.announcements.preview.draft_store", store):
+        view = await PatchNoteView(
+            {"fr": {}, "en": {}}, "", None
+        ).resolve(interaction)
+
+    assert view.draft_id == "1"
+    assert view.new_version == "1.0.1"
+    assert view.texts["en"] == {"changes": "EN"}
+    assert view.uploaded == [HostedAttachment("a.png", "https://cdn/a.png")]
+
+
+@pytest.mark.asyncio
+async def test_persistent_view_reports_missing_draft(tmp_path: object) -> None:
+    store = DraftStore(str(tmp_path / "drafts.json"))
+    interaction = AsyncMock()
+    interaction.message = MagicMock(id=7)
+
+    with patch("modules.announcements.preview.draft_store", store):
+        view = await PatchNoteView({"fr": {}}, "", None).resolve(interaction)
+
+    assert view is None
+    interaction.response.send_message.assert_awaited_once()
@@ -0,0 +1,17 @@
+import json
+import os
+
+from modules.json_file import write_json
+
+
+def test_write_json_creates_directory_and_replaces(tmp_path: object) -> None:
+    path = str(tmp_path / "data" / "state.json")
+
+    write_json(path, {"texte": "é"})
+    write_json(path, {"texte": "à"})
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == '{\n  "texte": "à"\n}'
+    assert os.listdir(os.path.dirname(path)) == ["state.json"]
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"texte": "à"}
@@ -0,0 +1,68 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from modules.live_preview import LivePreview, partial_json_fields
+
+
+def test_partial_json_fields_complete_object() -> None:
+    text = '{"title": "Titre", "changes": "Ligne 1\\nLigne 2"}'
+    assert partial_json_fields(text) == {
+        "title": "Titre",
+        "changes": "Ligne 1\nLigne 2",
+    }
+
+
+def test_partial_json_fields_unterminated_value() -> None:
+    assert partial_json_fields('{"title": "Tit') == {"title": "Tit"}
+    # Un échappement coupé en fin de flux est ignoré
+    assert partial_json_fields('{"changes": "a\\') == {"changes": "a"}
+    assert partial_json_fields('{"tit') == {}
+
+
+@pytest.mark.asyncio
+async def test_live_preview_throttles_edits() -> None:
+    message = AsyncMock()
+    preview = LivePreview(message, header="✨ En cours...", interval=10)
+    on_partial = preview.callback("FR")
+
+    with patch("modules.live_preview.time.monotonic", return_value=100.0):
+        await on_partial('{"changes": "Bon')
+        await on_partial('{"changes": "Bonjour')
+        await on_partial('{"changes": "Bonjour tout')
+
+    # Seule la première version part immédiatement, les suivantes attendent
+    message.edit.assert_awaited_once()
+    assert "Bon" in message.edit.await_args.kwargs["content"]
+
+    await preview.flush()
+    assert message.edit.await_count == 2
+    assert "Bonjour tout" in message.edit.await_args.kwargs["content"]
+
+    # Rien de nouveau : pas de modification inutile
+    await preview.flush()
+    assert message.edit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_closed_live_preview_ignores_late_output() -> None:
+    message = AsyncMock()
+    preview = LivePreview(message, header="✨", interval=0)
+    on_partial = preview.callback("FR")
+
+    await on_partial('{"changes": "Bon')
+    preview.close()
+    await on_partial('{"changes": "Bonjour')
+    await preview.flush()
+
+    message.edit.assert_awaited_once()
+
+
+def test_live_preview_render_stays_under_limit() -> None:
+    preview = LivePreview(AsyncMock(), header="Header", limit=100)
+    preview.sections["FR"] = "x" * 500
+
+    content = preview.render()
+
+    assert len(content) <= 100
+    assert content.startswith("Header")
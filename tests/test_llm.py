@@ -0,0 +1,89 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+
+from bench.gemini_stub import start_stub
+from modules.llm import FakeBackend, FakeBackendError, GeminiBackend
+
+SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"title": {"type": "STRING"}, "changes": {"type": "STRING"}},
+}
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_is_deterministic() -> None:
+    first = await FakeBackend().generate("model", "prompt", SCHEMA)
+    second = await FakeBackend().generate("model", "prompt", SCHEMA)
+    other = await FakeBackend().generate("model", "autre prompt", SCHEMA)
+
+    assert first == second
+    assert first.text != other.text
+    assert set(json.loads(first.text)) == {"title", "changes"}
+    assert first.input_tokens > 0
+    assert first.output_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_fail_first() -> None:
+    backend = FakeBackend(fail_first=2, error_message="429 RESOURCE_EXHAUSTED")
+
+    for _ in range(2):
+        with pytest.raises(FakeBackendError, match="429"):
+            await backend.generate("model", "prompt", SCHEMA)
+    await backend.generate("model", "prompt", SCHEMA)
+
+    assert backend.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_stream_matches_generate() -> None:
+    backend = FakeBackend(output_tokens=200)
+    full = await backend.generate("model", "prompt", SCHEMA)
+
+    chunks = [chunk async for chunk in backend.stream("model", "prompt", SCHEMA)]
+
+    assert len(chunks) > 2
+    assert "".join(chunk.text for chunk in chunks) == full.text
+    # Seul le dernier morceau porte les compteurs de tokens
+    assert chunks[-1].total_tokens == full.total_tokens
+
+
+@pytest.mark.asyncio
+async def test_gemini_stub_serves_rest_api() -> None:
+    runner, base_url = await start_stub(FakeBackend(fail_first=1))
+    body = {
+        "contents": [{"role": "user", "parts": [{"text": "Bonjour"}]}],
+        "generationConfig": {"responseSchema": SCHEMA},
+    }
+    url = f"{base_url}/v1beta/models/gemini-test:generateContent"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, json=body) as response:
+                assert response.status == 503
+
+            async with session.post(url, json=body) as response:
+                assert response.status == 200
+                payload = await response.json()
+    finally:
+        await runner.cleanup()
+
+    text = payload["candidates"][0]["content"]["parts"][0]["text"]
+    assert set(json.loads(text)) == {"title", "changes"}
+    assert payload["usageMetadata"]["totalTokenCount"] > 0
+
+
+@pytest.mark.asyncio
+async def test_gemini_backend_generate_uses_async_client() -> None:
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        return_value=MagicMock(text='{"title": "T"}', usage_metadata=None)
+    )
+
+    response = await GeminiBackend(client).generate("model", "prompt", SCHEMA)
+
+    assert response.text == '{"title": "T"}'
+    client.aio.models.generate_content.assert_awaited_once()
+    client.models.generate_content.assert_not_called()
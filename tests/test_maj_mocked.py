@@ -1,6 +1,9 @@
+import asyncio
+import contextlib
+import json
 import os
 import sys
-from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -14,6 +17,19 @@ mock_param.UPDATE_ROLE_ID = 101
 mock_param.UPDATE_CHANNEL_ID_FR = 201
 mock_param.UPDATE_CHANNEL_ID_EN = 202
 mock_param.UPDATE_CHANNEL_ID_TEST = 203
+mock_param.UPDATE_LANGUAGES = {"fr": 201, "en": 202}
+mock_param.GEMINI_RPM = 60
+mock_param.GEMINI_TPM = 1_000_000
+mock_param.GEMINI_BREAKER_THRESHOLD = 3
+mock_param.GEMINI_BREAKER_COOLDOWN = 60
+mock_param.ATTACHMENT_STORE_MAX_BYTES = 10 * 1024 * 1024
+mock_param.ATTACHMENT_MAX_FILE_BYTES = 1024 * 1024
+mock_param.MEDIA_OPTIMIZE = False
+mock_param.VIEW_REGISTRY_MAX = 20
+mock_param.VIEW_IDLE_TTL = 3600
+mock_param.OUTBOX_CONFIRM_TIMEOUT = 1
+mock_param.PREVIEW_DEADLINE = 60
+mock_param.GEMINI_MAX_REQUEST_TOKENS = 8000
 mock_param.BOT_ID = 999
 mock_param.checkmark = "✅"
 mock_param.crossmarck = "❌"
@@ -28,21 +44,44 @@ sys.modules["google"] = MagicMock()
 sys.modules["google.genai"] = MagicMock()
 sys.modules["google.genai.types"] = MagicMock()
 
-import cog.maj as maj_module  # to access client  # noqa: E402
-from cog.maj import (  # noqa: E402
-    UpdateManagerView,
-    UpdateModal,
-    _build_message,
-    _call_gemini_api,
-    _correct_french_text,
-    _send_and_publish,
-    _send_ping,
+from cog.maj import UpdateManagerView, UpdateModal, _build_message  # noqa: E402
+from modules.announcements import ai, render  # noqa: E402
+from modules.announcements.ai import (  # noqa: E402
+    TRANSLATION_CONCURRENCY,
+    TRANSLATION_SYSTEM,
+    call_model,
+    correct_texts,
+    translate_all,
+    translate_texts,
 )
-
-# Explicitly set the client mock to ensure it's not None
-# The module import might have set it to None if import happened before env var or mocking
-if maj_module.client is None:
-    maj_module.client = MagicMock()
+from modules.deadline import Deadline  # noqa: E402
+from modules.live_preview import LivePreview  # noqa: E402
+from modules.llm import FakeBackend, LLMResponse, ModelInfo  # noqa: E402
+from modules.rate_limit import RateLimiter  # noqa: E402
+from modules.templates import templates  # noqa: E402
+
+# Use the deterministic fake backend instead of the Gemini API
+ai.backend = FakeBackend()
+
+
+@pytest.fixture(autouse=True)
+def announcement_param() -> object:
+    # Le pipeline partagé a pu être importé avec le vrai PARAM par un autre test
+    render.line_markers.cache_clear()
+    render.preview_cache.clear()
+    # Modèles lus avant que les tests ne remplacent open()
+    templates.revision("update", "patch")
+    with contextlib.ExitStack() as stack:
+        for module in ("ai", "ingest", "preview", "publish", "render"):
+            stack.enter_context(
+                patch(f"modules.announcements.{module}.PARAM", mock_param)
+            )
+        # Limiteur neuf : le quota consommé ne dépend pas de l'ordre des tests
+        stack.enter_context(
+            patch.object(ai, "gemini_limiter", RateLimiter(1000, 1_000_000))
+        )
+        yield
+    render.line_markers.cache_clear()
 
 
 @pytest.fixture
@@ -53,87 +92,54 @@ def mock_bot() -> MagicMock:
 
 
 @pytest.mark.asyncio
-async def test_send_ping() -> None:
-    channel = AsyncMock()
-
-    await _send_ping(channel)
+async def test_call_gemini_api_success() -> None:
+    ai.backend = FakeBackend(responder=lambda prompt, schema: {"key": "value"})
 
-    channel.send.assert_called_with(f"<@&{mock_param.UPDATE_ROLE_ID}>")
+    result = await call_model("prompt", {})
+    assert result == {"key": "value"}
 
 
 @pytest.mark.asyncio
-async def test_send_and_publish_normal_channel() -> None:
-    channel = AsyncMock()
-    # Ensure is_news is treated as a method returning False, and NOT async
-    channel.is_news = MagicMock(return_value=False)
-
-    msg = AsyncMock()
-    channel.send.return_value = msg
-
-    await _send_and_publish(channel, "Hello")
-
-    channel.send.assert_called_with(content="Hello", files=None)
-
-    # msg.publish should not be called
-    assert msg.publish.call_count == 0
+async def test_call_gemini_api_failure_retry() -> None:
+    # First call raises exception, second succeeds
+    ai.backend = FakeBackend(
+        fail_first=1, responder=lambda prompt, schema: {"success": True}
+    )
 
-    msg.add_reaction.assert_called_once()
+    with patch("asyncio.sleep", new_callable=AsyncMock):
+        result = await call_model("prompt", {})
+        assert result == {"success": True}
+        assert ai.backend.calls == 2
 
 
 @pytest.mark.asyncio
-async def test_send_and_publish_news_channel() -> None:
-    channel = AsyncMock()
-    # Ensure is_news is treated as a method returning True, and NOT async
-    channel.is_news = MagicMock(return_value=True)
-
-    msg = AsyncMock()
-    channel.send.return_value = msg
+async def test_call_gemini_api_streaming() -> None:
+    chunks = [LLMResponse('{"key": "val'), LLMResponse('ue"}', 10, 5)]
 
-    await _send_and_publish(channel, "Hello")
+    async def stream(
+        model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> object:
+        for chunk in chunks:
+            yield chunk
 
-    msg.publish.assert_called_once()
+    ai.backend = MagicMock()
+    ai.backend.stream = stream
+    on_partial = AsyncMock()
 
+    result = await call_model("stream prompt", {}, on_partial=on_partial)
 
-@pytest.mark.asyncio
-async def test_call_gemini_api_success() -> None:
-    mock_response = MagicMock()
-    mock_response.text = '{"key": "value"}'
-
-    # Ensure client is mocked
-    maj_module.client = MagicMock()
-
-    # Reset mock call count
-    maj_module.client.models.generate_content.reset_mock()
-    maj_module.client.models.generate_content.return_value = mock_response
-
-    result = await _call_gemini_api("prompt", {})
     assert result == {"key": "value"}
-
-
-@pytest.mark.asyncio
-async def test_call_gemini_api_failure_retry() -> None:
-    # First call raises exception, second succeeds
-    mock_response = MagicMock()
-    mock_response.text = '{"success": true}'
-
-    maj_module.client = MagicMock()
-
-    maj_module.client.models.generate_content.reset_mock()
-    maj_module.client.models.generate_content.side_effect = [
-        Exception("API Error"),
-        mock_response,
-    ]
-
-    with patch("asyncio.sleep", new_callable=AsyncMock):
-        result = await _call_gemini_api("prompt", {})
-        assert result == {"success": True}
-        assert maj_module.client.models.generate_content.call_count == 2
+    assert on_partial.await_args_list[0].args == ('{"key": "val',)
+    assert on_partial.await_args_list[-1].args == ('{"key": "value"}',)
+    ai.backend.generate.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_correct_french_text() -> None:
-    # Mock _call_gemini_api
-    with patch("cog.maj._call_gemini_api", new_callable=AsyncMock) as mock_api:
+    # Mock call_model
+    with patch(
+        "modules.announcements.ai.call_model", new_callable=AsyncMock
+    ) as mock_api:
         mock_api.return_value = {
             "corrected_title": "Titre Corrigé",
             "corrected_changes": "Changements Corrigés",
@@ -148,12 +154,172 @@ async def test_correct_french_text() -> None:
             "outro": "Outro",
         }
 
-        result = await _correct_french_text(input_data)
+        result = await correct_texts(input_data, UpdateManagerView.fields)
 
         assert result["title"] == "Titre Corrigé"
         assert result["changes"] == "Changements Corrigés"
 
 
+@pytest.mark.asyncio
+async def test_regular_update_is_translated_in_one_request() -> None:
+    # Titre, introduction et ~1 750 caractères de changements : une seule requête
+    texts = {
+        "title": "Mise à jour 1.2",
+        "intro": "i" * 300,
+        "changes": "\n".join(f"& Changement {i} " + "c" * 40 for i in range(30)),
+        "outro": "",
+    }
+    prompts = []
+
+    def responder(prompt: str, schema: dict) -> dict:
+        prompts.append(json.loads(prompt)["texts"])
+        return dict(prompts[-1])
+
+    ai.backend = FakeBackend(responder=responder)
+    await translate_texts(texts, UpdateManagerView.fields, "en")
+
+    assert prompts == [{key: value for key, value in texts.items() if value}]
+
+
+def test_request_budget_follows_model_catalog() -> None:
+    small = ModelInfo("small", input_token_limit=1000, output_token_limit=600)
+    with patch.object(ai.model_catalog, "get", return_value=small):
+        assert ai.request_token_budget() == 300
+    with patch.object(ai.model_catalog, "get", return_value=None):
+        assert ai.request_token_budget() == 8000
+
+
+@pytest.mark.asyncio
+async def test_correct_texts_chunks_long_field() -> None:
+    # Un champ trop long part dans plusieurs requêtes parallèles, puis est recollé
+    changes = "\n".join(f"& Ligne {i} " + "x" * 60 for i in range(120))
+    prompts = []
+
+    def responder(prompt: str, schema: dict) -> dict:
+        batch = json.loads(prompt)
+        prompts.append(batch)
+        return {f"corrected_{name}": text.upper() for name, text in batch.items()}
+
+    ai.backend = FakeBackend(responder=responder)
+    with patch.object(ai.PARAM, "GEMINI_MAX_REQUEST_TOKENS", 500):
+        result = await correct_texts(
+            {"title": "Titre", "changes": changes, "intro": "", "outro": ""},
+            UpdateManagerView.fields,
+        )
+
+    assert len(prompts) > 1
+    assert all(len(json.dumps(batch)) < 500 * 8 for batch in prompts)
+    # Les champs vides ne sont pas envoyés
+    assert not any("intro" in batch for batch in prompts)
+    assert result["changes"] == changes.upper()
+    assert result["title"] == "TITRE"
+    assert result["intro"] == ""
+
+
+@pytest.mark.asyncio
+async def test_translate_texts_sends_compact_payload() -> None:
+    calls = []
+
+    async def generate(
+        model: str, prompt: str, schema: dict, system: str | None = None
+    ) -> LLMResponse:
+        calls.append((prompt, system))
+        return LLMResponse(json.dumps({"title": "Title", "changes": "Changes"}), 40, 8)
+
+    ai.backend = MagicMock()
+    ai.backend.generate = generate
+    result = await translate_texts(
+        {"title": "Titre", "changes": "Changements", "intro": "", "outro": ""},
+        UpdateManagerView.fields,
+        "en",
+    )
+
+    assert result == {"title": "Title", "intro": "", "changes": "Changes", "outro": ""}
+    [(prompt, system)] = calls
+    assert system == TRANSLATION_SYSTEM
+    assert json.loads(prompt) == {
+        "lang": "anglais",
+        "texts": {"title": "Titre", "changes": "Changements"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_translate_texts_requests_only_missing_fields() -> None:
+    prompts = []
+
+    def responder(prompt: str, schema: dict) -> dict:
+        texts = json.loads(prompt)["texts"]
+        prompts.append(texts)
+        # Première réponse incomplète : "changes" manque
+        if len(prompts) == 1:
+            return {"title": "Title"}
+        return {"changes": "Changes"}
+
+    ai.backend = FakeBackend(responder=responder)
+    result = await translate_texts(
+        {"title": "Titre", "changes": "Changements", "intro": "", "outro": ""},
+        UpdateManagerView.fields,
+        "en",
+    )
+
+    assert result["title"] == "Title"
+    assert result["changes"] == "Changes"
+    assert prompts[1] == {"changes": "Changements"}
+    assert ai.backend.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_correction_degrades_to_original_at_deadline() -> None:
+    ai.backend = FakeBackend(latency=1)
+    texts = {"title": "Titre", "changes": "Lent", "intro": "", "outro": ""}
+
+    started = asyncio.get_running_loop().time()
+    result = await correct_texts(
+        texts, UpdateManagerView.fields, deadline=Deadline(0.05)
+    )
+
+    assert result == texts
+    assert asyncio.get_running_loop().time() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_when_deadline_expires() -> None:
+    ai.backend = FakeBackend(latency=0.1, tokens_per_second=50)
+    message = AsyncMock()
+    preview = LivePreview(message, header="✨", interval=0)
+    partials = []
+    show = preview.callback("Correction (FR)")
+
+    async def on_partial(text: str) -> None:
+        partials.append(text)
+        await show(text)
+
+    result = await call_model(
+        "prompt", {"properties": {"changes": {}}}, on_partial, deadline=Deadline(0.3)
+    )
+    preview.close()
+    seen, edits = len(partials), message.edit.await_count
+    await asyncio.sleep(0.5)
+
+    # Requête annulée : plus aucun texte partiel ni modification du message
+    assert result is None
+    assert len(partials) == seen
+    assert message.edit.await_count == edits
+    assert len(ai.gemini_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_no_retry_past_deadline() -> None:
+    ai.backend = FakeBackend(fail_first=1)
+
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        result = await call_model("prompt", {}, deadline=Deadline(0.5))
+
+    assert result is None
+    assert ai.backend.calls == 1
+    mock_sleep.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_build_message_french() -> None:
     texts = {
@@ -163,7 +329,7 @@ async def test_build_message_french() -> None:
         "outro": "Outro text.",
     }
 
-    msg = _build_message(texts, is_english=False)
+    msg = _build_message(texts, "fr")
 
     assert "# 📢 My Update 📢" in msg
     assert "<@999> a reçu une mise à jour ! 🧪" in msg
@@ -182,13 +348,69 @@ async def test_build_message_english() -> None:
         "outro": "Outro text.",
     }
 
-    msg = _build_message(texts, is_english=True)
+    msg = _build_message(texts, "en")
 
     assert "<@999> received an update ! 🧪" in msg
     assert "- ✅ Added feature" in msg
     assert "The Development Team." in msg
 
 
+@pytest.mark.asyncio
+async def test_build_message_keeps_inline_markers() -> None:
+    texts = {
+        "title": "T",
+        "intro": "",
+        "changes": "& Q&A ajoutée\nVoir https://exemple.fr/?a=1&b=2 ~ 5 min",
+        "outro": "",
+    }
+
+    msg = _build_message(texts, "fr")
+
+    assert "- ✅: Q&A ajoutée" in msg
+    assert "Voir https://exemple.fr/?a=1&b=2 ~ 5 min" in msg
+
+
+@pytest.mark.asyncio
+async def test_build_message_other_language_falls_back_to_english() -> None:
+    texts = {"title": "T", "intro": "", "changes": "& Nueva función", "outro": ""}
+
+    msg = _build_message(texts, "es")
+
+    assert "- ✅ Nueva función" in msg
+    assert "The Development Team." in msg
+
+
+@pytest.mark.asyncio
+async def test_translate_all_runs_languages_concurrently() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_translate(
+        text_parts: dict,
+        fields: tuple,
+        language: str,
+        on_partial: object = None,
+        deadline: object = None,
+    ) -> dict:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"title": language, "changes": "", "intro": "", "outro": ""}
+
+    languages = {"fr": 1, "en": 2, "es": 3, "de": 4, "it": 5, "pt": 6}
+    with (
+        patch.object(mock_param, "UPDATE_LANGUAGES", languages),
+        patch("modules.announcements.ai.translate_texts", side_effect=fake_translate),
+    ):
+        result = await translate_all({"title": "T"}, UpdateManagerView.fields)
+
+    assert list(result) == ["en", "es", "de", "it", "pt"]
+    assert result["es"]["title"] == "es"
+    assert 1 < max_in_flight <= TRANSLATION_CONCURRENCY
+
+
 @pytest.mark.asyncio
 async def test_update_modal_submit() -> None:
     # Setup
@@ -197,18 +419,19 @@ async def test_update_modal_submit() -> None:
     interaction.guild = MagicMock()
 
     test_channel = AsyncMock()
+    test_channel.send.return_value = MagicMock(id=42)
     interaction.guild.get_channel.return_value = test_channel
 
     followup = AsyncMock()
     interaction.original_response.return_value = followup
 
-    # Mock open for version.json
     with (
-        patch("builtins.open", mock_open(read_data='{"version": "1.0.0"}')),
-        patch("json.dump") as mock_json_dump,
-        patch("cog.maj._correct_french_text", new_callable=AsyncMock) as mock_correct,
+        patch("cog.maj.release_store", MagicMock(current="1.0.0")) as mock_releases,
+        patch(
+            "modules.announcements.ai.correct_texts", new_callable=AsyncMock
+        ) as mock_correct,
         patch(
-            "cog.maj._translate_to_english", new_callable=AsyncMock
+            "modules.announcements.ai.translate_texts", new_callable=AsyncMock
         ) as mock_translate,
     ):
         mock_correct.return_value = {
@@ -238,7 +461,7 @@ async def test_update_modal_submit() -> None:
 
         # Assert
         interaction.response.send_message.assert_called_once()
-        mock_json_dump.assert_called()  # Version saved
+        mock_releases.check.assert_called_once_with("1.1.0")  # Version vérifiée
         mock_correct.assert_called_once()
         mock_translate.assert_called_once()
 
@@ -258,7 +481,7 @@ async def test_update_manager_view_send_prod() -> None:
     en_texts = {"title": "EN", "changes": "C", "intro": "I", "outro": "O"}
     interaction = AsyncMock()
 
-    view = UpdateManagerView(fr_texts, en_texts, [], interaction)
+    view = UpdateManagerView({"fr": fr_texts, "en": en_texts}, "draft", interaction)
 
     fr_channel = MagicMock()
     fr_channel.name = "fr-channel"
@@ -276,11 +499,11 @@ async def test_update_manager_view_send_prod() -> None:
     interaction.guild = MagicMock()
     interaction.guild.get_channel.side_effect = get_channel
 
-    # Mock _send_and_publish and _ghost_ping
-    with (
-        patch("cog.maj._send_and_publish", new_callable=AsyncMock) as mock_send,
-        patch("cog.maj._send_ping", new_callable=AsyncMock) as mock_ping,
-    ):
+    # Mock the outbox
+    with patch(
+        "modules.announcements.publish.outbox", new_callable=AsyncMock
+    ) as mock_outbox:
+        mock_outbox.wait.return_value = "done"
         # Mock button click
         # Access the callback. Since we're in a test and it's a bound method on the view instance,
         # but decorated by ui.button, accessing view.send_prod returns the Item (Button).
@@ -304,8 +527,13 @@ async def test_update_manager_view_send_prod() -> None:
             # It is a function (unlikely with @ui.button)
             await view.send_prod(interaction)
 
-        assert mock_send.call_count == 2  # FR and EN
-        assert mock_ping.call_count == 2  # FR and EN
+        deliveries = mock_outbox.enqueue.call_args.args[1]
+        assert len(deliveries) == 2  # FR and EN
+        # Le rôle est mentionné en tête de chaque annonce
+        assert all(
+            d.chunks[0].startswith(f"<@&{mock_param.UPDATE_ROLE_ID}>\n")
+            for d in deliveries
+        )
         interaction.followup.send.assert_called_with(
             "✅ Mise à jour déployée en production !", ephemeral=True
         )
@@ -1,3 +1,4 @@
+import contextlib
 import sys
 from unittest.mock import AsyncMock, MagicMock, mock_open, patch
 
@@ -7,6 +8,19 @@ import pytest
 mock_param = MagicMock()
 mock_param.owners = [123]
 mock_param.UPDATE_CHANNEL_ID_TEST = 203
+mock_param.UPDATE_LANGUAGES = {"fr": 201, "en": 202}
+mock_param.GEMINI_RPM = 60
+mock_param.GEMINI_TPM = 1_000_000
+mock_param.GEMINI_BREAKER_THRESHOLD = 3
+mock_param.GEMINI_BREAKER_COOLDOWN = 60
+mock_param.ATTACHMENT_STORE_MAX_BYTES = 10 * 1024 * 1024
+mock_param.ATTACHMENT_MAX_FILE_BYTES = 1024 * 1024
+mock_param.MEDIA_OPTIMIZE = False
+mock_param.VIEW_REGISTRY_MAX = 20
+mock_param.VIEW_IDLE_TTL = 3600
+mock_param.OUTBOX_CONFIRM_TIMEOUT = 1
+mock_param.PREVIEW_DEADLINE = 60
+mock_param.GEMINI_MAX_REQUEST_TOKENS = 8000
 mock_param.BOT_ID = 999
 mock_param.checkmark = "✅"
 mock_param.crossmarck = "❌"
@@ -20,14 +34,33 @@ sys.modules["google"] = MagicMock()
 sys.modules["google.genai"] = MagicMock()
 sys.modules["google.genai.types"] = MagicMock()
 
-from cog.maj import UpdateModal, _split_message  # noqa: E402
+from cog.maj import UpdateModal  # noqa: E402
+from modules.announcements import render  # noqa: E402
+from modules.splitter import split_message  # noqa: E402
+from modules.templates import templates  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def announcement_param() -> object:
+    # Le pipeline partagé a pu être importé avec le vrai PARAM par un autre test
+    render.line_markers.cache_clear()
+    render.preview_cache.clear()
+    # Modèles lus avant que les tests ne remplacent open()
+    templates.revision("update", "patch")
+    with contextlib.ExitStack() as stack:
+        for module in ("ai", "ingest", "preview", "publish", "render"):
+            stack.enter_context(
+                patch(f"modules.announcements.{module}.PARAM", mock_param)
+            )
+        yield
+    render.line_markers.cache_clear()
 
 
 @pytest.mark.asyncio
 async def test_split_message_logic() -> None:
     # Test basic splitting
     long_text = "A" * 2005
-    chunks = _split_message(long_text, limit=2000)
+    chunks = split_message(long_text, limit=2000)
     assert len(chunks) == 2
     assert len(chunks[0]) == 2000
     assert len(chunks[1]) == 5
@@ -36,7 +69,7 @@ async def test_split_message_logic() -> None:
     text_newline = ("A" * 1000) + "\n" + ("B" * 1000)
     # Total 2001 chars. Should split at newline.
     # Actually 1000 'A' + 1 '\n' + 1000 'B' = 2001.
-    chunks_nl = _split_message(text_newline, limit=2000)
+    chunks_nl = split_message(text_newline, limit=2000)
     assert len(chunks_nl) == 2
     assert chunks_nl[0] == "A" * 1000
     assert (
@@ -52,6 +85,7 @@ async def test_update_modal_split_message() -> None:
     interaction = AsyncMock()
     interaction.guild = MagicMock()
     test_channel = AsyncMock()
+    test_channel.send.return_value = MagicMock(id=42)
     interaction.guild.get_channel.return_value = test_channel
     followup = AsyncMock()
     interaction.original_response.return_value = followup
@@ -60,9 +94,12 @@ async def test_update_modal_split_message() -> None:
     with (
         patch("builtins.open", mock_open(read_data='{"version": "1.0.0"}')),
         patch("json.dump"),
-        patch("cog.maj._correct_french_text", new_callable=AsyncMock) as mock_correct,
+        patch("cog.maj.release_store", MagicMock(current="1.0.0")),
+        patch(
+            "modules.announcements.ai.correct_texts", new_callable=AsyncMock
+        ) as mock_correct,
         patch(
-            "cog.maj._translate_to_english", new_callable=AsyncMock
+            "modules.announcements.ai.translate_texts", new_callable=AsyncMock
         ) as mock_translate,
     ):
         # Create a very long string
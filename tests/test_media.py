@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+from unittest.mock import patch
+
+from PIL import Image
+import pytest
+
+from modules import media
+
+
+@pytest.fixture(autouse=True)
+def media_settings() -> object:
+    executor = ThreadPoolExecutor(max_workers=1)
+    with (
+        patch.object(media.PARAM, "MEDIA_OPTIMIZE", True),
+        patch.object(media.PARAM, "MEDIA_FORMAT", "webp"),
+        patch.object(media.PARAM, "MEDIA_QUALITY", 80),
+        patch.object(media.PARAM, "MEDIA_MAX_DIMENSION", 800),
+        # Un thread suffit pour les tests (le vrai pool utilise des processus)
+        patch.object(media, "_get_executor", return_value=executor),
+    ):
+        yield
+    executor.shutdown()
+
+
+def _png(width: int, height: int, mode: str = "RGB") -> bytes:
+    image = Image.effect_noise((width, height), 64).convert(mode)
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_can_optimize() -> None:
+    assert media.can_optimize("capture.PNG")
+    assert not media.can_optimize("anim.gif")
+    assert not media.can_optimize("notes.txt")
+
+
+@pytest.mark.asyncio
+async def test_optimize_image_converts_and_downscales() -> None:
+    data = _png(1600, 1000)
+
+    result = await media.optimize_image("capture.png", data)
+
+    assert result.filename == "capture.webp"
+    assert result.saved_bytes > 0
+    with Image.open(io.BytesIO(result.data)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (800, 500)
+
+
+@pytest.mark.asyncio
+async def test_optimize_image_jpeg_flattens_transparency() -> None:
+    data = _png(400, 400, mode="RGBA")
+
+    with patch.object(media.PARAM, "MEDIA_FORMAT", "jpeg"):
+        result = await media.optimize_image("logo.png", data)
+
+    assert result.filename == "logo.jpg"
+    with Image.open(io.BytesIO(result.data)) as image:
+        assert image.mode == "RGB"
+
+
+@pytest.mark.asyncio
+async def test_optimize_image_keeps_original_when_not_smaller() -> None:
+    data = _png(50, 50)
+
+    with patch.object(media, "_compress", return_value=data + b"padding"):
+        result = await media.optimize_image("capture.png", data)
+
+    assert result.filename == "capture.png"
+    assert result.data is data
+    assert result.saved_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_optimize_image_keeps_original_on_invalid_image() -> None:
+    result = await media.optimize_image("broken.png", b"not an image")
+
+    assert result.filename == "broken.png"
+    assert result.data == b"not an image"
+
+
+@pytest.mark.asyncio
+async def test_optimize_image_disabled() -> None:
+    data = _png(1600, 1000)
+
+    with patch.object(media.PARAM, "MEDIA_OPTIMIZE", False):
+        result = await media.optimize_image("capture.png", data)
+
+    assert result.data is data
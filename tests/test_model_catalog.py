@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from modules.llm import FakeBackend, ModelInfo
+from modules.model_catalog import ModelCatalog
+
+
+def _catalog(tmp_path: object, ttl: float = 3600) -> ModelCatalog:
+    return ModelCatalog(str(tmp_path / "catalog.json"), ttl)
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_cached_on_disk(tmp_path: object) -> None:
+    backend = FakeBackend(models=("gemini-a", "gemini-b"))
+    catalog = _catalog(tmp_path)
+
+    assert catalog.is_stale
+    assert await catalog.refresh(backend)
+    # Cache récent : pas de nouvel appel
+    assert not await catalog.refresh(backend)
+
+    # Une nouvelle instance (redémarrage) relit le fichier sans appeler l'API
+    reloaded = _catalog(tmp_path)
+    assert not reloaded.is_stale
+    assert reloaded.get("models/gemini-a") == catalog.get("gemini-a")
+    assert [model.name for model in reloaded.find()] == ["gemini-a", "gemini-b"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_after_ttl_and_failure_keeps_cache(tmp_path: object) -> None:
+    catalog = _catalog(tmp_path, ttl=0)
+    await catalog.refresh(FakeBackend(models=("gemini-a",)))
+    assert catalog.is_stale
+
+    backend = FakeBackend()
+    backend.list_models = AsyncMock(side_effect=RuntimeError("503"))
+    assert not await catalog.refresh(backend)
+    assert catalog.get("gemini-a") is not None
+
+
+def test_find_and_check(tmp_path: object) -> None:
+    catalog = _catalog(tmp_path)
+    # Catalogue jamais récupéré : rien à signaler
+    assert catalog.check("gemini-a") is None
+
+    catalog.models = {
+        model.name: model
+        for model in (
+            ModelInfo(
+                "gemini-a",
+                input_token_limit=1000,
+                output_token_limit=100,
+                actions=("generateContent",),
+            ),
+            ModelInfo(
+                "gemini-b",
+                input_token_limit=9000,
+                output_token_limit=900,
+                actions=("generateContent",),
+            ),
+            ModelInfo("embedding", input_token_limit=9000, actions=("embedContent",)),
+        )
+    }
+
+    assert [model.name for model in catalog.find(min_input_tokens=5000)] == ["gemini-b"]
+    assert len(catalog.find(action=None)) == 3
+    assert catalog.check("gemini-a") is None
+    assert "absent" in catalog.check("gemini-z")
+    assert "generateContent" in catalog.check("embedding")
@@ -0,0 +1,52 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from modules.model_selection import (
+    ModelChoice,
+    ModelResult,
+    load_results,
+    save_results,
+    select_model,
+)
+
+
+def _result(model: str, p95: float, json_rate: float = 1.0) -> ModelResult:
+    return ModelResult(model, 10, p95 / 2, p95, 100.0, json_rate)
+
+
+def test_select_fastest_model_meeting_quality() -> None:
+    results = [
+        _result("slow", 2.0),
+        _result("fast-but-broken", 0.5, json_rate=0.8),
+        _result("fast", 1.0),
+    ]
+
+    assert select_model(results, 0.95) == "fast"
+    assert select_model(results, 0.5) == "fast-but-broken"
+    assert select_model([_result("broken", 0.5, json_rate=0.5)], 0.95) is None
+
+
+def test_results_round_trip(tmp_path: object) -> None:
+    path = str(tmp_path / "bench" / "models.json")
+    results = [_result("a", 1.0), _result("b", 2.0)]
+
+    save_results(path, results, {"runs": 5})
+
+    assert load_results(path) == results
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["workload"] == {"runs": 5}
+
+
+@patch("modules.model_selection.PARAM", MagicMock(GEMINI_MODEL="default"))
+def test_model_choice_falls_back_to_param(tmp_path: object) -> None:
+    choice = ModelChoice()
+    path = tmp_path / "models.json"
+
+    # Fichier absent, puis invalide : modèle de PARAM
+    assert choice.load(str(path), 0.95) == "default"
+    path.write_text("{pas du json", encoding="utf-8")
+    assert choice.load(str(path), 0.95) == "default"
+
+    save_results(str(path), [_result("benchmarked", 1.0)], {})
+    assert choice.load(str(path), 0.95) == "benchmarked"
+    assert choice.current == "benchmarked"
@@ -0,0 +1,347 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from modules import outbox as outbox_module
+from modules.announcements.publish import publish, unschedule
+from modules.attachments import HostedAttachment, SpooledFile, attachment_store
+from modules.outbox import Delivery, Outbox, OutboxWorker
+from modules.releases import ReleaseStore
+
+
+@pytest.fixture(autouse=True)
+def outbox_settings() -> object:
+    with (
+        patch.object(outbox_module.PARAM, "OUTBOX_MAX_ATTEMPTS", 3),
+        patch.object(outbox_module.PARAM, "OUTBOX_BACKOFF_BASE", 2),
+        patch.object(outbox_module.PARAM, "OUTBOX_BACKOFF_MAX", 60),
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def releases(tmp_path: object) -> ReleaseStore:
+    releases = ReleaseStore(
+        str(tmp_path / "releases.sqlite3"), str(tmp_path / "version.json")
+    )
+    with patch.object(outbox_module, "release_store", releases):
+        yield releases
+    releases.close()
+
+
+@pytest.fixture
+def store(tmp_path: object) -> Outbox:
+    store = Outbox(str(tmp_path / "outbox.sqlite3"), str(tmp_path / "files"))
+    yield store
+    store.close()
+
+
+def _channel(channel_id: int = 1) -> MagicMock:
+    channel = MagicMock(id=channel_id)
+    channel.name = f"salon-{channel_id}"
+    sent = iter(range(100, 200))
+    channel.send = AsyncMock(side_effect=lambda **kwargs: AsyncMock(id=next(sent)))
+    channel.get_partial_message = MagicMock(side_effect=lambda id: AsyncMock(id=id))
+    return channel
+
+
+def _server_error() -> discord.DiscordServerError:
+    return discord.DiscordServerError(MagicMock(status=503, reason="Unavailable"), "")
+
+
+@pytest.mark.asyncio
+async def test_delivers_chunks_in_order_and_publishes(store: Outbox) -> None:
+    channel = _channel()
+    published = []
+
+    def make_message(index: int) -> AsyncMock:
+        async def publish() -> None:
+            # Le premier morceau est le plus lent à publier
+            await asyncio.sleep(0.02 if index == 0 else 0)
+            published.append(index)
+
+        msg = AsyncMock(id=index)
+        msg.publish = publish
+        return msg
+
+    channel.send.side_effect = [make_message(i) for i in range(3)]
+    await store.enqueue("a", [Delivery(1, ["a", "b", "c"], publish=True)])
+
+    for group in (await store.pending()).values():
+        await OutboxWorker(store, {1: channel}.get).deliver(group)
+
+    assert [c.kwargs["content"] for c in channel.send.call_args_list] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert published == [0, 1, 2]
+    assert await store.pending() == {}
+    assert await store.snapshot() == {"done": 3}
+
+
+@pytest.mark.asyncio
+async def test_sent_messages_join_release_history(
+    store: Outbox, releases: ReleaseStore
+) -> None:
+    await releases.record("patch", "1.0.1", {"fr": {"changes": "FR"}}, "a")
+    await store.enqueue("a", [Delivery(1, ["a", "b"]), Delivery(2, ["c"])])
+
+    for group in (await store.pending()).values():
+        await OutboxWorker(store, {1: _channel(1), 2: _channel(2)}.get).deliver(group)
+
+    [release] = await releases.history()
+    assert release.message_ids == {1: [100, 101], 2: [100]}
+
+
+@pytest.mark.asyncio
+async def test_files_and_ghost_ping(store: Outbox, tmp_path: object) -> None:
+    source = tmp_path / "notes.txt"
+    source.write_text("notes")
+    channel = _channel()
+    ping = AsyncMock()
+    channel.send.side_effect = [AsyncMock(id=1), AsyncMock(id=2), ping]
+
+    await store.enqueue(
+        "a",
+        [Delivery(1, ["a", "b"], ghost_ping="<@&5>")],
+        files=[SpooledFile("notes.txt", str(source), 5)],
+    )
+    with patch("modules.outbox.asyncio.sleep", new_callable=AsyncMock):
+        for group in (await store.pending()).values():
+            await OutboxWorker(store, {1: channel}.get).deliver(group)
+
+    first, last, mention = channel.send.call_args_list
+    assert "files" not in first.kwargs
+    assert [f.filename for f in last.kwargs["files"]] == ["notes.txt"]
+    assert mention.args == ("<@&5>",)
+    ping.delete.assert_awaited_once()
+    # Une fois l'annonce terminée, la copie des fichiers est supprimée
+    assert not (tmp_path / "files" / "a").exists()
+
+
+@pytest.mark.asyncio
+async def test_transient_error_resumes_without_resending(
+    store: Outbox, tmp_path: object
+) -> None:
+    channel = _channel()
+    channel.send.side_effect = [AsyncMock(id=10), _server_error()]
+    await store.enqueue("a", [Delivery(1, ["a", "b"])])
+
+    for group in (await store.pending()).values():
+        await OutboxWorker(store, {1: channel}.get).deliver(group)
+
+    # Le second morceau est reporté, le premier n'est plus en attente
+    [group] = (await store.pending()).values()
+    assert [m.content for m in group] == ["b"]
+    assert group[0].attempts == 1
+    assert group[0].next_attempt > 0
+
+    # Après un redémarrage, l'envoi reprend au morceau interrompu
+    store.close()
+    restarted = Outbox(store.path, store.files_dir)
+    channel.send.side_effect = None
+    channel.send.return_value = AsyncMock(id=11)
+    for group in (await restarted.pending()).values():
+        await OutboxWorker(restarted, {1: channel}.get).deliver(group)
+
+    assert [c.kwargs["content"] for c in channel.send.call_args_list] == [
+        "a",
+        "b",
+        "b",
+    ]
+    assert await restarted.snapshot() == {"done": 2}
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_rolls_back_channel(store: Outbox) -> None:
+    channel = _channel()
+    sent = AsyncMock(id=10)
+    channel.send.side_effect = [
+        sent,
+        discord.Forbidden(MagicMock(status=403, reason="Forbidden"), ""),
+    ]
+    await store.enqueue("a", [Delivery(1, ["a", "b"])])
+
+    waiting = asyncio.create_task(store.wait("a", 1))
+    for group in (await store.pending()).values():
+        await OutboxWorker(store, {1: channel}.get).deliver(group)
+
+    # Pas d'annonce à moitié postée : le premier morceau est supprimé
+    channel.get_partial_message.assert_called_once_with(10)
+    assert await waiting == "failed"
+    assert await store.snapshot() == {"done": 1, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(store: Outbox) -> None:
+    channel = _channel()
+    channel.send.side_effect = _server_error()
+    await store.enqueue("a", [Delivery(1, ["a"])])
+    worker = OutboxWorker(store, {1: channel}.get)
+
+    for _ in range(3):
+        for group in (await store.pending()).values():
+            await worker.deliver(group)
+
+    assert channel.send.await_count == 3
+    assert await store.snapshot() == {"failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_channels_are_delivered_concurrently(store: Outbox) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_send(**kwargs: object) -> AsyncMock:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return AsyncMock(id=1)
+
+    channels = {1: _channel(1), 2: _channel(2)}
+    for channel in channels.values():
+        channel.send.side_effect = slow_send
+    await store.enqueue("a", [Delivery(1, ["fr"]), Delivery(2, ["en"])])
+
+    worker = OutboxWorker(store, channels.get)
+    await worker.dispatch()
+    assert await store.wait("a", 1) == "done"
+
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_enqueue_twice_is_ignored(store: Outbox) -> None:
+    await store.enqueue("a", [Delivery(1, ["a", "b"])])
+    await store.enqueue("a", [Delivery(1, ["a", "b"])])
+
+    assert await store.snapshot() == {"pending": 2}
+
+
+@pytest.mark.asyncio
+async def test_scheduled_images_survive_cdn_url_expiry(store: Outbox) -> None:
+    await attachment_store.add("a", "capture.png", b"png-bytes")
+    uploaded = [HostedAttachment("capture.png", "https://cdn/capture.png?ex=1")]
+    not_before = time.time() + 25 * 3600
+
+    with (
+        patch("modules.announcements.publish.outbox", store),
+        patch("modules.announcements.publish.draft_store", AsyncMock()),
+    ):
+        await publish("a", [Delivery(1, ["a"])], uploaded, not_before)
+
+    # Le brouillon est libéré, mais la file garde sa propre copie de l'image
+    assert attachment_store.files("a") == []
+    [[message]] = (await store.pending()).values()
+    assert message.embeds == []
+    [image] = message.files
+    with open(image.path, "rb") as f:
+        assert f.read() == b"png-bytes"
+
+    # À l'échéance, l'image est ré-uploadée au lieu de pointer vers l'URL expirée
+    channel = _channel()
+    with patch("modules.outbox.time.time", return_value=not_before + 1):
+        await OutboxWorker(store, {1: channel}.get).deliver([message])
+    sent = channel.send.call_args.kwargs
+    assert [f.filename for f in sent["files"]] == ["capture.png"]
+    assert "embeds" not in sent
+
+
+@pytest.mark.asyncio
+async def test_scheduled_announcement_waits_until_due(store: Outbox) -> None:
+    channel = _channel()
+    not_before = time.time() + 3600
+    await store.enqueue("a", [Delivery(1, ["a"])], not_before=not_before)
+    worker = OutboxWorker(store, {1: channel}.get)
+
+    # Le worker dort jusqu'à l'échéance au lieu d'interroger la file
+    delay = await worker.dispatch()
+    assert 3590 < delay <= 3600
+    channel.send.assert_not_called()
+
+    with patch("modules.outbox.time.time", return_value=not_before + 1):
+        assert await worker.dispatch() is None
+    await asyncio.gather(*store.in_flight.values())
+    channel.send.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_announcement_can_be_cancelled(
+    store: Outbox, releases: ReleaseStore
+) -> None:
+    not_before = time.time() + 3600
+    await releases.record("patch", "1.0.1", {}, "a", not_before, scheduled=True)
+    await store.enqueue(
+        "a", [Delivery(1, ["a", "b"]), Delivery(2, ["c"])], not_before=not_before
+    )
+    await store.enqueue("now", [Delivery(1, ["d"])])
+
+    [scheduled] = await store.scheduled()
+    assert scheduled.announcement_id == "a"
+    assert scheduled.not_before == not_before
+    assert sorted(scheduled.channel_ids) == [1, 2]
+
+    with (
+        patch("modules.announcements.publish.outbox", store),
+        patch("modules.announcements.publish.release_store", releases),
+    ):
+        assert await unschedule("a")
+        assert not await unschedule("a")
+        # Annonce immédiate, déjà due : le worker peut l'avoir prise
+        assert not await unschedule("now")
+
+    assert await store.scheduled() == []
+    assert [m.announcement_id for g in (await store.pending()).values() for m in g] == [
+        "now"
+    ]
+    await releases.confirm("a")
+    assert releases.current == "1.0.0"
+
+
+@pytest.mark.asyncio
+async def test_scheduled_release_becomes_current_when_sent(
+    store: Outbox, releases: ReleaseStore
+) -> None:
+    not_before = time.time() + 3600
+    await releases.record("patch", "1.0.1", {}, "a", not_before, scheduled=True)
+    await store.enqueue("a", [Delivery(1, ["a"])], not_before=not_before)
+    assert releases.current == "1.0.0"
+
+    [group] = (await store.pending()).values()
+    with patch("modules.outbox.time.time", return_value=not_before + 1):
+        await OutboxWorker(store, {1: _channel()}.get).deliver(group)
+
+    assert releases.current == "1.0.1"
+    [release] = await releases.history()
+    assert release.message_ids == {1: [100]}
+
+
+@pytest.mark.asyncio
+async def test_reloaded_worker_skips_groups_still_in_flight(store: Outbox) -> None:
+    channel = _channel()
+    release = asyncio.Event()
+
+    async def slow_send(**kwargs: object) -> AsyncMock:
+        await release.wait()
+        return AsyncMock(id=100)
+
+    channel.send.side_effect = slow_send
+    await store.enqueue("a", [Delivery(1, ["a"])])
+    await OutboxWorker(store, {1: channel}.get).dispatch()
+    await asyncio.sleep(0)
+
+    # Cog rechargé (/sync) : le nouveau worker voit l'envoi en cours de l'ancien
+    await OutboxWorker(store, {1: channel}.get).dispatch()
+    assert not await store.cancel("a")
+    release.set()
+    await asyncio.gather(*store.in_flight.values())
+
+    channel.send.assert_awaited_once()
+    assert await store.snapshot() == {"done": 1}
@@ -1,5 +1,6 @@
 import os
-from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+import tempfile
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import discord
 from discord import ui
@@ -9,6 +10,12 @@ import pytest
 os.environ["GEMINI_API"] = "fake_key"
 
 from cog.patch_note import PatchNoteCog, PatchNoteModal, PatchNoteView
+from modules.drafts import draft_store
+from modules.releases import VersionBumpError, release_store
+
+# Brouillons et versions écrits dans un dossier temporaire plutôt que dans data/
+draft_store.path = os.path.join(tempfile.mkdtemp(), "drafts.json")
+release_store.path = os.path.join(tempfile.mkdtemp(), "releases.sqlite3")
 
 
 @pytest.mark.asyncio
@@ -28,11 +35,13 @@ async def test_patch_note_modal_submit() -> None:
 
     # get_channel is synchronous, returns a Channel (AsyncMock in this case)
     interaction.guild.get_channel = MagicMock(return_value=AsyncMock())
+    interaction.guild.get_channel.return_value.send.return_value = MagicMock(id=42)
 
     # Mock attachment data
     attachment_data = [MagicMock(spec=discord.Attachment)]
     attachment_data[0].read = AsyncMock(return_value=b"fake_image_data")
     attachment_data[0].filename = "image.png"
+    attachment_data[0].size = 15
 
     # Initialize Modal
     modal = PatchNoteModal(attachment_data)
@@ -44,23 +53,26 @@ async def test_patch_note_modal_submit() -> None:
     # Mock Gemini helper
     with (
         patch(
-            "cog.patch_note._correct_french_text", new_callable=AsyncMock
+            "modules.announcements.ai.correct_texts", new_callable=AsyncMock
         ) as mock_correct,
         patch(
-            "cog.patch_note._translate_to_english", new_callable=AsyncMock
+            "modules.announcements.ai.translate_texts", new_callable=AsyncMock
         ) as mock_translate,
-        patch("cog.patch_note._split_message", return_value=["msg1"]),
-        patch("cog.patch_note.PARAM") as mock_param,
+        patch("modules.announcements.preview.split_message", return_value=["msg1"]),
+        patch("modules.announcements.ingest.PARAM") as mock_param,
+        patch("modules.announcements.ai.PARAM", mock_param),
     ):
         mock_correct.return_value = {"changes": "Corrigé FR"}
         mock_translate.return_value = {"changes": "Translated EN"}
         mock_param.UPDATE_CHANNEL_ID_TEST = 123
+        mock_param.PREVIEW_DEADLINE = 60
+        mock_param.UPDATE_LANGUAGES = {"fr": 111, "en": 222}
 
         await modal.on_submit(interaction)
 
     # Verify flow
     interaction.response.send_message.assert_called()
-    mock_correct.assert_called_with({"changes": "New patch features"})
+    assert mock_correct.call_args.args[0] == {"changes": "New patch features"}
     # Verify preview sent to test channel
     interaction.guild.get_channel.assert_called_with(123)
     channel = interaction.guild.get_channel.return_value
@@ -71,45 +83,212 @@ async def test_patch_note_modal_submit() -> None:
 async def test_patch_note_view_send_prod() -> None:
     # Mock interaction
     interaction = AsyncMock()
-    interaction.guild.get_channel = MagicMock(return_value=AsyncMock())
+    channels = {111: MagicMock(id=111), 222: MagicMock(id=222)}
+    channels[111].is_news.return_value = True
+    channels[222].is_news.return_value = False
+    interaction.guild.get_channel = MagicMock(side_effect=channels.get)
+
+    view = PatchNoteView(
+        texts={"fr": {"changes": "Message FR"}, "en": {"changes": "Message EN"}},
+        new_version="1.0.1",
+        draft_id="draft",
+        original_interaction=interaction,
+    )
+
+    # Mock file operations and the outbox
+    with (
+        patch(
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
+        patch("modules.announcements.preview.PARAM") as mock_param,
+    ):
+        mock_param.UPDATE_LANGUAGES = {"fr": 111, "en": 222}
+        mock_param.UPDATE_ROLE_ID = 5
+        mock_outbox.wait.return_value = "done"
+
+        await PatchNoteView.send_prod(view, interaction, MagicMock(spec=ui.Button))
+
+    # Toute l'annonce (FR et EN) est mise en file en une fois
+    mock_outbox.enqueue.assert_awaited_once()
+    announcement_id, deliveries = mock_outbox.enqueue.call_args.args
+    assert announcement_id == "draft"
+    assert [(d.channel_id, d.publish) for d in deliveries] == [
+        (111, True),
+        (222, False),
+    ]
+    assert all(d.ghost_ping == "<@&5>" for d in deliveries)
+    interaction.followup.send.assert_called_with(
+        "✅ Patch **1.0.1** déployé !", ephemeral=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_patch_note_view_send_prod_skips_removed_language() -> None:
+    interaction = AsyncMock()
+    interaction.guild.get_channel = MagicMock(return_value=MagicMock(id=111))
+    # Brouillon restauré dont la langue "de" a été retirée de PARAM depuis
+    view = PatchNoteView(
+        texts={"fr": {"changes": "FR"}, "de": {"changes": "DE"}},
+        new_version="1.0.1",
+        draft_id="draft",
+        original_interaction=interaction,
+    )
+
+    with (
+        patch(
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
+        patch("modules.announcements.preview.PARAM") as mock_param,
+    ):
+        mock_param.UPDATE_LANGUAGES = {"fr": 111}
+        mock_outbox.wait.return_value = "done"
+        await PatchNoteView.send_prod(view, interaction, MagicMock())
+
+    _, deliveries = mock_outbox.enqueue.call_args.args
+    assert [d.channel_id for d in deliveries] == [111]
+
+
+@pytest.mark.asyncio
+async def test_patch_note_view_send_prod_without_any_channel() -> None:
+    interaction = AsyncMock()
+    interaction.guild.get_channel = MagicMock(return_value=None)
+    view = PatchNoteView(
+        texts={"fr": {"changes": "FR"}},
+        new_version="1.0.1",
+        draft_id="draft",
+        original_interaction=interaction,
+    )
+
+    with (
+        patch(
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+        ) as mock_record,
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
+        patch("modules.announcements.preview.PARAM") as mock_param,
+    ):
+        mock_param.UPDATE_LANGUAGES = {"fr": 111}
+        await PatchNoteView.send_prod(view, interaction, MagicMock())
+
+    # Rien ne partirait : ni version enregistrée, ni mise en file, ni attente
+    mock_record.assert_not_called()
+    mock_outbox.enqueue.assert_not_called()
+    mock_outbox.wait.assert_not_called()
+    assert "Aucun salon" in interaction.followup.send.call_args.args[0]
+    assert not any(child.disabled for child in view.children)
+
+
+@pytest.mark.asyncio
+async def test_patch_note_view_send_prod_reports_background_delivery() -> None:
+    interaction = AsyncMock()
+    interaction.guild.get_channel = MagicMock(return_value=MagicMock(id=111))
+    view = PatchNoteView(
+        texts={"fr": {"changes": "FR"}},
+        new_version="1.0.1",
+        draft_id="draft",
+        original_interaction=interaction,
+    )
+
+    with (
+        patch(
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
+        patch("modules.announcements.preview.PARAM") as mock_param,
+    ):
+        mock_param.UPDATE_LANGUAGES = {"fr": 111}
+        # Discord n'a pas répondu à temps : l'envoi continue dans le worker
+        mock_outbox.wait.return_value = None
+        await PatchNoteView.send_prod(view, interaction, MagicMock())
+
+    assert "arrière-plan" in interaction.followup.send.call_args.args[0]
+
 
+@pytest.mark.asyncio
+async def test_patch_note_view_schedule_at() -> None:
+    interaction = AsyncMock()
+    interaction.guild.get_channel = MagicMock(return_value=MagicMock(id=111))
     view = PatchNoteView(
-        fr_texts={"changes": "Message FR"},
-        en_texts={"changes": "Message EN"},
+        texts={"fr": {"changes": "FR"}},
         new_version="1.0.1",
-        files_data=[("image.png", b"data")],
+        draft_id="draft",
         original_interaction=interaction,
     )
 
-    # Mock file operations and helpers
     with (
-        patch("builtins.open", mock_open()),
-        patch("json.dump"),
         patch(
-            "cog.patch_note._send_and_publish", new_callable=AsyncMock
-        ) as mock_send_pub,
-        patch("cog.patch_note._ghost_ping", new_callable=AsyncMock),
-        patch("cog.patch_note.PARAM") as mock_param,
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+        ) as mock_record,
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
+        patch("modules.announcements.preview.PARAM") as mock_param,
+    ):
+        mock_param.UPDATE_LANGUAGES = {"fr": 111}
+        await view.schedule_at(interaction, 1_800_000_000)
+
+    # Programmée : mise en file avec sa date, sans attendre l'envoi
+    assert mock_record.call_args.kwargs["scheduled"] is True
+    assert mock_outbox.enqueue.call_args.kwargs["not_before"] == 1_800_000_000
+    mock_outbox.wait.assert_not_called()
+    assert "programmé" in interaction.followup.send.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_patch_note_view_refused_version_keeps_buttons_usable() -> None:
+    interaction = AsyncMock()
+    interaction.guild.get_channel = MagicMock(return_value=MagicMock(id=111))
+    view = PatchNoteView(
+        texts={"fr": {"changes": "FR"}},
+        new_version="1.0.0",
+        draft_id="draft",
+        original_interaction=interaction,
+    )
+
+    with (
+        patch(
+            "modules.announcements.preview.release_store.record",
+            new_callable=AsyncMock,
+            side_effect=VersionBumpError("La version 1.0.0 est antérieure."),
+        ),
+        patch(
+            "modules.announcements.publish.outbox", new_callable=AsyncMock
+        ) as mock_outbox,
     ):
-        mock_param.UPDATE_CHANNEL_ID_FR = 111
-        mock_param.UPDATE_CHANNEL_ID_EN = 222
-
-        # Simulate button click
-        button = MagicMock(spec=ui.Button)
-
-        # Try calling the callback via the descriptor's callback attribute on the class
-        # If PatchNoteView.send_prod is a _ViewCallback, it has a .callback attribute which is the function.
-        # If PatchNoteView.send_prod is the function itself (unlikely with @ui.button), we call it.
-        # The previous error "AttributeError: 'function' object has no attribute 'callback'" suggests
-        # that PatchNoteView.send_prod MIGHT be the function in this environment?
-
-        if hasattr(PatchNoteView.send_prod, "callback"):
-            await PatchNoteView.send_prod.callback(view, interaction, button)
-        else:
-            # It's just the function?
-            await PatchNoteView.send_prod(view, interaction, button)
-
-    # Verify
-    # Should get channels for FR and EN
-    assert interaction.guild.get_channel.call_count == 2
-    assert mock_send_pub.call_count == 2  # Once for FR, once for EN
+        await PatchNoteView.send_prod(view, interaction, MagicMock())
+
+    # Rien n'est envoyé et le brouillon peut être corrigé puis republié
+    mock_outbox.enqueue.assert_not_called()
+    assert "❌" in interaction.followup.send.call_args.args[0]
+    assert interaction.edit_original_response.await_count == 2
+    assert not any(child.disabled for child in view.children)
+
+
+def test_announcement_hooks_are_abstract() -> None:
+    from modules.announcements import AnnouncementModal, AnnouncementView
+
+    class IncompleteView(AnnouncementView):
+        kind = "incomplete"
+
+    class IncompleteModal(AnnouncementModal, title="Incomplet"):
+        view_type = IncompleteView
+
+    # Un hook oublié est signalé dès la création, pas à la soumission du formulaire
+    with pytest.raises(TypeError, match="build_message"):
+        IncompleteView({}, "draft")
+    with pytest.raises(TypeError, match="original_texts"):
+        IncompleteModal([])
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from modules import rate_limit
+from modules.rate_limit import CircuitBreaker, RateLimiter, TokenBucket
+
+
+def test_token_bucket_wait_time() -> None:
+    with patch("modules.rate_limit.time.monotonic", return_value=100.0):
+        bucket = TokenBucket(capacity=2, refill_per_second=1)
+        assert bucket.wait_time(1) == 0
+        bucket.consume(2)
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+
+    with patch("modules.rate_limit.time.monotonic", return_value=101.0):
+        assert bucket.wait_time(1) == 0
+
+
+def test_token_bucket_clamps_oversized_requests() -> None:
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    # Une requête plus grande que le seau ne doit pas attendre indéfiniment
+    assert bucket.wait_time(50) == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_when_exhausted() -> None:
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    await limiter.acquire(10)
+
+    sleep = AsyncMock()
+
+    async def fake_sleep(delay: float) -> None:
+        await sleep(delay)
+        # Simule l'écoulement du temps en rechargeant le seau
+        limiter.requests.tokens = limiter.requests.capacity
+
+    with patch("modules.rate_limit.asyncio.sleep", side_effect=fake_sleep):
+        await limiter.acquire(10)
+
+    sleep.assert_awaited_once()
+    assert sleep.await_args.args[0] > 0
+    assert limiter.snapshot()["waiting"] == 0
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    now = [0.0]
+    with patch.object(rate_limit.time, "monotonic", side_effect=lambda: now[0]):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow()
+        assert breaker.retry_after() == pytest.approx(30)
+
+        now[0] = 31.0
+        # Un seul appel d'essai en semi-ouvert
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+
+def test_circuit_breaker_reopens_on_failed_trial() -> None:
+    now = [0.0]
+    with patch.object(rate_limit.time, "monotonic", side_effect=lambda: now[0]):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        now[0] = 11.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.is_open
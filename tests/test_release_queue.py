@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from modules.release_queue import ReleaseQueue
+
+
+@pytest.mark.asyncio
+async def test_same_channel_is_served_in_order() -> None:
+    queue = ReleaseQueue()
+    events: list[str] = []
+
+    async def publish(name: str) -> None:
+        async with queue.turn(1):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    first = asyncio.create_task(publish("a"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(publish("b"))
+    await asyncio.sleep(0)
+    assert queue.depth(1) == 1
+    await asyncio.gather(first, second)
+
+    assert events == ["a:start", "a:end", "b:start", "b:end"]
+    stats = queue.snapshot()
+    assert stats["served"] == 2
+    assert stats["depth"] == 0
+    assert stats["max_wait"] >= 0.005
+    assert queue._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_other_channels_are_not_blocked() -> None:
+    queue = ReleaseQueue()
+    released = asyncio.Event()
+
+    async def hold() -> None:
+        async with queue.turn(1):
+            await released.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    async with asyncio.timeout(1):
+        async with queue.turn(2):
+            assert queue.snapshot()["busy_channels"] == 2
+
+    released.set()
+    await holder
@@ -0,0 +1,130 @@
+import json
+import sqlite3
+
+import pytest
+
+from modules.releases import ReleaseStore, VersionBumpError, next_patch
+
+
+@pytest.fixture
+def releases(tmp_path: object) -> ReleaseStore:
+    releases = ReleaseStore(
+        str(tmp_path / "releases.sqlite3"), str(tmp_path / "version.json")
+    )
+    yield releases
+    releases.close()
+
+
+def test_next_patch() -> None:
+    assert next_patch("1.2.3") == "1.2.4"
+    assert next_patch("beta") == "beta"
+
+
+def test_current_defaults_when_empty(releases: ReleaseStore) -> None:
+    assert releases.current == "1.0.0"
+
+
+@pytest.mark.asyncio
+async def test_legacy_version_file_is_imported(tmp_path: object) -> None:
+    (tmp_path / "version.json").write_text(json.dumps({"version": "2.3.4"}))
+    releases = ReleaseStore(
+        str(tmp_path / "releases.sqlite3"), str(tmp_path / "version.json")
+    )
+    await releases.load()
+
+    assert releases.current == "2.3.4"
+    releases.close()
+
+
+@pytest.mark.asyncio
+async def test_record_appends_history_and_serves_version_from_memory(
+    releases: ReleaseStore,
+) -> None:
+    await releases.record("update", "1.1.0", {"fr": {"title": "Titre"}}, "a", 100.0)
+    await releases.record("patch", "1.1.1", {"en": {"changes": "Fix"}}, "b", 200.0)
+    await releases.attach_messages("b", {5: [10, 11]})
+
+    latest, first = await releases.history()
+    assert (latest.version, latest.kind, latest.message_ids) == (
+        "1.1.1",
+        "patch",
+        {5: [10, 11]},
+    )
+    assert first.texts == {"fr": {"title": "Titre"}}
+    assert (await releases.find("1.1.0")).announcement_id == "a"
+    assert await releases.find("9.9.9") is None
+
+    # Le fichier n'est plus lu : la version vient de la mémoire
+    releases.close()
+    releases.path = "/nonexistent/releases.sqlite3"
+    assert releases.current == "1.1.1"
+
+
+@pytest.mark.asyncio
+async def test_record_refuses_older_version(releases: ReleaseStore) -> None:
+    await releases.record("patch", "1.2.0", {})
+
+    with pytest.raises(VersionBumpError):
+        await releases.record("patch", "1.1.9", {})
+
+    assert releases.current == "1.2.0"
+    assert len(await releases.history()) == 1
+    # /version force le retour en arrière
+    await releases.set("1.1.9")
+    await releases.load()
+    assert releases.current == "1.1.9"
+
+
+@pytest.mark.asyncio
+async def test_scheduled_release_becomes_current_once_sent(
+    releases: ReleaseStore,
+) -> None:
+    await releases.record("patch", "1.0.1", {}, "scheduled", 2e9, scheduled=True)
+
+    # Programmée : ni version actuelle, ni historique
+    assert releases.current == "1.0.0"
+    assert await releases.history() == []
+    assert await releases.find("1.0.1") is None
+
+    await releases.confirm("scheduled")
+    assert releases.current == "1.0.1"
+    await releases.load()
+    assert releases.current == "1.0.1"
+    assert [release.version for release in await releases.history()] == ["1.0.1"]
+
+
+@pytest.mark.asyncio
+async def test_scheduled_release_does_not_roll_back_current(
+    releases: ReleaseStore,
+) -> None:
+    await releases.record("patch", "1.0.1", {}, "scheduled", 2e9, scheduled=True)
+    await releases.record("patch", "1.0.2", {}, "now")
+    await releases.record("patch", "1.0.3", {}, "cancelled", 2e9, scheduled=True)
+
+    await releases.confirm("scheduled")
+    await releases.cancel("cancelled")
+
+    assert releases.current == "1.0.2"
+    assert [release.version for release in await releases.history()] == [
+        "1.0.1",
+        "1.0.2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_older_database_gains_scheduled_column(tmp_path: object) -> None:
+    path = str(tmp_path / "releases.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        "CREATE TABLE releases (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " announcement_id TEXT UNIQUE, kind TEXT NOT NULL, version TEXT NOT NULL,"
+        " released_at REAL NOT NULL, texts TEXT NOT NULL DEFAULT '{}',"
+        " message_ids TEXT NOT NULL DEFAULT '{}');"
+        "INSERT INTO releases (kind, version, released_at) VALUES ('patch', '1.0.1', 1);"
+    )
+    connection.commit()
+    connection.close()
+    releases = ReleaseStore(path, str(tmp_path / "version.json"))
+
+    assert [release.version for release in await releases.history()] == ["1.0.1"]
+    releases.close()
@@ -0,0 +1,51 @@
+from modules.render import LineMarkers, RenderCache, fingerprint
+
+MARKERS = LineMarkers({"&": "- ✅", "~": "- ❌", "£": "- ⏳"})
+
+
+def test_expands_markers_at_line_start_only() -> None:
+    text = "& Ajout\n~ Retrait\n  £ En cours\nQ&A sur https://exemple.fr/?a=1&b=2 ~ 5 £"
+
+    assert MARKERS.render(text) == (
+        "- ✅ Ajout\n- ❌ Retrait\n  - ⏳ En cours\n"
+        "Q&A sur https://exemple.fr/?a=1&b=2 ~ 5 £"
+    )
+
+
+def test_new_markers_can_be_registered() -> None:
+    markers = LineMarkers({"&": "- ✅", "&&": "- 🎉", "!": "- ⚠️"})
+
+    assert markers.render("&& Sortie\n& Ajout\n! Attention") == (
+        "- 🎉 Sortie\n- ✅ Ajout\n- ⚠️ Attention"
+    )
+
+
+def test_no_markers_leaves_text_unchanged() -> None:
+    assert LineMarkers({}).render("& texte") == "& texte"
+
+
+def test_render_cache_memoizes_by_content() -> None:
+    cache = RenderCache(maxsize=2)
+    calls = []
+
+    def render(value: str) -> str:
+        calls.append(value)
+        return value.upper()
+
+    texts = {"fr": {"changes": "a"}}
+    assert cache.get(texts, lambda: render("a")) == "A"
+    # Même contenu dans un autre objet (ordre des clés compris) : pas de nouveau rendu
+    assert cache.get({"fr": {"changes": "a"}}, lambda: render("a")) == "A"
+    assert calls == ["a"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get({"fr": {"changes": "b"}}, lambda: render("b"))
+    cache.get({"fr": {"changes": "c"}}, lambda: render("c"))
+    cache.get(texts, lambda: render("a"))
+    # Le plus ancien rendu a été évincé
+    assert calls == ["a", "b", "c", "a"]
+
+
+def test_fingerprint_ignores_key_order() -> None:
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
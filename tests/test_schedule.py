@@ -0,0 +1,46 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from modules.schedule import (
+    PARIS_TZ,
+    ScheduleModal,
+    format_paris,
+    parse_paris_datetime,
+)
+
+NOW = PARIS_TZ.localize(datetime.datetime(2026, 3, 1, 12, 0))
+
+
+def test_parse_paris_datetime_handles_daylight_saving() -> None:
+    winter = parse_paris_datetime("10/03/2026 18:00", now=NOW)
+    summer = parse_paris_datetime("10/04/2026 18:00", now=NOW)
+
+    assert winter.utcoffset() == datetime.timedelta(hours=1)
+    assert summer.utcoffset() == datetime.timedelta(hours=2)
+    assert format_paris(summer.timestamp()) == "10/04/2026 à 18:00"
+
+
+@pytest.mark.parametrize("text", ["demain", "2026-03-10 18:00", "32/03/2026 18:00"])
+def test_parse_paris_datetime_rejects_invalid_format(text: str) -> None:
+    with pytest.raises(ValueError, match="Format invalide"):
+        parse_paris_datetime(text, now=NOW)
+
+
+def test_parse_paris_datetime_rejects_past_date() -> None:
+    with pytest.raises(ValueError, match="passée"):
+        parse_paris_datetime("01/03/2026 11:59", now=NOW)
+
+
+@pytest.mark.asyncio
+async def test_modal_reports_invalid_date() -> None:
+    on_schedule = AsyncMock()
+    modal = ScheduleModal(on_schedule)
+    modal.when = MagicMock(value="bientôt")
+    interaction = AsyncMock()
+
+    await modal.on_submit(interaction)
+
+    on_schedule.assert_not_called()
+    interaction.response.send_message.assert_awaited_once()
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from modules.singleflight import SingleFlight, request_key
+
+
+def test_request_key_is_stable() -> None:
+    assert request_key("model", "prompt", {"b": 1, "a": 2}) == request_key(
+        "model", "prompt", {"a": 2, "b": 1}
+    )
+    assert request_key("model", "prompt A") != request_key("model", "prompt B")
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    async def work(name: str) -> str:
+        calls.append(name)
+        await asyncio.sleep(0)
+        return name
+
+    results = await asyncio.gather(
+        flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b"))
+    )
+
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_entry_released() -> None:
+    flight = SingleFlight()
+
+    async def failing() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others() -> None:
+    flight = SingleFlight()
+
+    async def work() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_last_caller_gives_up() -> None:
+    flight = SingleFlight()
+    steps = []
+
+    async def work() -> str:
+        for step in range(10):
+            steps.append(step)
+            await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0.015)
+    first.cancel()
+    await asyncio.sleep(0.015)
+    # Un appelant attend encore : le calcul continue
+    assert len(steps) >= 3
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            await second
+    seen = len(steps)
+    await asyncio.sleep(0.05)
+
+    assert len(steps) == seen
+    assert len(flight) == 0
+    assert await flight.do("key", lambda: asyncio.sleep(0, "relancé")) == "relancé"
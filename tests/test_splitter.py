@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from modules.splitter import split_message
+
+EMOJI = "<a:verify:1350435235015426130>"
+
+
+def test_short_message_is_unchanged() -> None:
+    assert split_message("Bonjour", limit=10) == ["Bonjour"]
+
+
+def test_prefers_newlines_then_spaces() -> None:
+    text = "aaaa bbbb\ncccc dddd eeee"
+
+    assert split_message(text, limit=12) == ["aaaa bbbb", "cccc dddd", "eeee"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [EMOJI, "<@&1350399062418915418>", "<#1350399062418915418>", "https://exemple.fr/a?b=c"],
+)
+def test_never_cuts_tokens(token: str) -> None:
+    text = "x" * 15 + token + "y" * 30
+
+    chunks = split_message(text, limit=40)
+
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert any(token in chunk for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_emoji_runs_stay_whole() -> None:
+    text = " ".join([EMOJI] * 100)
+
+    chunks = split_message(text, limit=200)
+
+    for chunk in chunks:
+        assert len(chunk) <= 200
+        assert re.fullmatch(rf"{re.escape(EMOJI)}( {re.escape(EMOJI)})*", chunk)
+
+
+def test_heading_moves_with_its_content() -> None:
+    text = "ligne\n" * 20 + "## Nouveautés\n" + "détail " * 10
+
+    chunks = split_message(text, limit=150)
+
+    assert chunks[0].endswith("ligne")
+    assert chunks[1].startswith("## Nouveautés\n")
+
+
+def test_code_fences_are_reopened() -> None:
+    code = "\n".join(f"    valeur = {i}" for i in range(60))
+    text = f"Exemple :\n```py\n{code}\n```\nFin."
+
+    chunks = split_message(text, limit=300)
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        assert len(chunk) <= 300
+        assert chunk.count("```") % 2 == 0
+    for chunk in chunks[1:-1]:
+        assert chunk.startswith("```py\n    valeur")
+    # L'indentation du code est conservée d'un morceau à l'autre
+    lines = [line for chunk in chunks for line in chunk.splitlines()]
+    assert [line for line in lines if "valeur" in line] == code.splitlines()
+    assert chunks[-1].endswith("```\nFin.")
+
+
+def test_long_input_respects_limit() -> None:
+    text = ("Une ligne de texte assez longue pour le test.\n" * 3000)[:100_000]
+
+    chunks = split_message(text)
+
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from modules.sqlite_store import SQLiteStore
+
+
+class CounterStore(SQLiteStore):
+    schema = "CREATE TABLE IF NOT EXISTS counter (value INTEGER NOT NULL);"
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.setups = 0
+
+    def _setup(self, connection: sqlite3.Connection) -> None:
+        self.setups += 1
+        if not connection.execute("SELECT 1 FROM counter").fetchone():
+            connection.execute("INSERT INTO counter (value) VALUES (0)")
+
+
+@pytest.mark.asyncio
+async def test_queries_run_in_transactions_on_a_shared_connection(
+    tmp_path: object,
+) -> None:
+    store = CounterStore(str(tmp_path / "db" / "counter.sqlite3"))
+
+    def increment(connection: sqlite3.Connection) -> int:
+        connection.execute("UPDATE counter SET value = value + 1")
+        return connection.execute("SELECT value FROM counter").fetchone()["value"]
+
+    assert await store._run(increment) == 1
+    assert await store._run(increment) == 2
+    assert store.setups == 1
+
+    # Requête en échec : sa transaction est annulée
+    def failing(connection: sqlite3.Connection) -> None:
+        connection.execute("UPDATE counter SET value = 100")
+        raise sqlite3.IntegrityError("refusé")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        await store._run(failing)
+    store.close()
+
+    reopened = CounterStore(store.path)
+    value = await reopened._run(
+        lambda connection: connection.execute("SELECT value FROM counter").fetchall()
+    )
+    assert [row["value"] for row in value] == [2]
+    reopened.close()
@@ -0,0 +1,51 @@
+from modules.structured_output import parse_structured
+
+SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"title": {"type": "STRING"}, "changes": {"type": "STRING"}},
+    "required": ["title", "changes"],
+}
+
+
+def test_valid_response_is_unchanged() -> None:
+    output = parse_structured('{"title": "T", "changes": "a\\nb"}', SCHEMA)
+
+    assert output.data == {"title": "T", "changes": "a\nb"}
+    assert output.missing == []
+    assert output.repairs == []
+
+
+def test_code_fence_and_surrounding_text_are_removed() -> None:
+    fenced = parse_structured('```json\n{"title": "T", "changes": "C"}\n```', SCHEMA)
+    wrapped = parse_structured(
+        'Voici le JSON : {"title": "T", "changes": "C",} Bonne journée', SCHEMA
+    )
+
+    assert fenced.data == wrapped.data == {"title": "T", "changes": "C"}
+    assert fenced.repairs
+    assert wrapped.repairs
+
+
+def test_escaped_newlines_and_lists_are_repaired() -> None:
+    output = parse_structured(
+        '{"title": "T", "changes": ["& Ajout", "~ Retrait\\\\nsuite"]}', SCHEMA
+    )
+
+    assert output.data["changes"] == "& Ajout\n~ Retrait\nsuite"
+    assert output.missing == []
+
+
+def test_raw_newlines_inside_strings_are_accepted() -> None:
+    output = parse_structured('{"title": "T", "changes": "a\nb"}', SCHEMA)
+
+    assert output.data["changes"] == "a\nb"
+
+
+def test_missing_fields_are_listed() -> None:
+    partial = parse_structured('{"title": "T", "changes": ""}', SCHEMA)
+    garbage = parse_structured("Désolé, je ne peux pas.", SCHEMA)
+
+    assert partial.data["title"] == "T"
+    assert partial.missing == ["changes"]
+    assert garbage.data == {}
+    assert garbage.missing == ["title", "changes"]
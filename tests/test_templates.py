@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from modules.templates import Template, TemplateStore
+
+
+def _write(path: object, data: dict, mtime_ns: int) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    # Date fixée : deux écritures rapprochées ont sinon la même date
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_template_renders_fields_and_formats() -> None:
+    template = Template("v{version} — {count:>3} {{brut}}")
+
+    assert template(version="1.2", count=7) == "v1.2 —   7 {brut}"
+    assert template.fields == {"version", "count"}
+
+
+def test_template_keeps_unknown_fields() -> None:
+    assert Template("Bonjour {nom}")() == "Bonjour {nom}"
+
+
+def test_template_rejects_positional_fields() -> None:
+    with pytest.raises(ValueError):
+        Template("Bonjour {}")
+
+
+def test_language_falls_back_to_english(tmp_path: object) -> None:
+    _write(
+        tmp_path / "patch.json",
+        {"fr": {"header": "Patch {version}"}, "en": {"header": "v{version}", "x": "X"}},
+        1_000_000_000,
+    )
+    store = TemplateStore(str(tmp_path))
+
+    assert store.render("patch", "header", "fr", version="2") == "Patch 2"
+    assert store.render("patch", "header", "es", version="2") == "v2"
+    # Une formulation absente en français est reprise de l'anglais
+    assert store.render("patch", "x", "fr") == "X"
+
+
+def test_reloads_only_when_mtime_changes(tmp_path: object) -> None:
+    path = tmp_path / "patch.json"
+    _write(path, {"en": {"header": "A"}}, 1_000_000_000)
+    store = TemplateStore(str(tmp_path))
+    first = store.get("patch", "en")
+    revision = store.revision("patch")
+
+    # Même date : le fichier n'est ni relu ni recompilé
+    assert store.get("patch", "en") is first
+
+    _write(path, {"en": {"header": "B"}}, 2_000_000_000)
+    assert store.render("patch", "header", "en") == "B"
+    assert store.revision("patch") == revision + 1
+
+
+def test_invalid_file_keeps_last_good_version(tmp_path: object) -> None:
+    path = tmp_path / "patch.json"
+    _write(path, {"en": {"header": "A"}}, 1_000_000_000)
+    store = TemplateStore(str(tmp_path))
+    store.get("patch", "en")
+
+    path.write_text("{ pas du json", encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert store.render("patch", "header", "en") == "A"
+
+    path.unlink()
+    assert store.render("patch", "header", "en") == "A"
+
+
+def test_missing_file_without_previous_version_raises(tmp_path: object) -> None:
+    with pytest.raises(FileNotFoundError):
+        TemplateStore(str(tmp_path)).get("patch", "en")
+
+
+def test_shipped_templates_are_valid() -> None:
+    store = TemplateStore()
+
+    for domain in ("update", "patch", "statut"):
+        assert store.get(domain, "fr")
+    # _get_status_from_embed relit le statut à partir de ces mots-clés
+    titles = store.get("statut", "fr")
+    assert "en ligne" in titles["title_online"](emoji="").lower()
+    assert "hors ligne" in titles["title_offline"](emoji="").lower()
+    assert "maintenance" in titles["title_maintenance"](emoji="").lower()
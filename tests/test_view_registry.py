@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord import ui
+import pytest
+
+from modules.drafts import Draft
+from modules.view_registry import ViewRegistry
+
+
+def _view(texts: dict | None = None) -> ui.View:
+    view = ui.View(timeout=None)
+    view.add_item(ui.Button(label="Envoyer"))
+    view.texts = texts or {"fr": {"changes": "Texte"}}
+    return view
+
+
+@pytest.fixture
+def stores() -> object:
+    with (
+        patch("modules.view_registry.attachment_store") as attachment_store,
+        patch("modules.view_registry.draft_store", AsyncMock()) as draft_store,
+    ):
+        attachment_store.used_bytes = 0
+        yield attachment_store, draft_store
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_when_full(stores: tuple) -> None:
+    attachment_store, draft_store = stores
+    registry = ViewRegistry(max_views=2, idle_ttl=3600)
+    old_view, old_message = _view(), AsyncMock()
+
+    await registry.track("old", old_view, old_message)
+    await registry.track("recent", _view(), AsyncMock())
+    registry.touch("old")
+    await registry.track("new", _view(), AsyncMock())
+
+    assert "recent" not in registry
+    assert "old" in registry
+    assert len(registry) == 2
+    assert registry.evicted == 1
+    attachment_store.release.assert_called_once_with("recent")
+    draft_store.delete.assert_awaited_once_with("recent")
+
+
+@pytest.mark.asyncio
+async def test_eviction_disables_buttons(stores: tuple) -> None:
+    registry = ViewRegistry(max_views=10, idle_ttl=3600)
+    view, message = _view(), AsyncMock()
+    await registry.track("draft", view, message)
+
+    await registry.evict("draft", reason="test")
+
+    assert all(child.disabled for child in view.children)
+    message.edit.assert_awaited_once_with(view=view)
+    assert view.is_finished()
+
+
+@pytest.mark.asyncio
+async def test_sweep_expires_idle_drafts(stores: tuple) -> None:
+    registry = ViewRegistry(max_views=10, idle_ttl=60)
+    await registry.track("idle", _view(), AsyncMock())
+    await registry.track("active", _view(), AsyncMock())
+
+    with patch("modules.view_registry.time.monotonic", return_value=10**9):
+        registry.touch("active")
+        await registry.sweep()
+
+    assert "idle" not in registry
+    assert "active" in registry
+
+
+@pytest.mark.asyncio
+async def test_restored_drafts_expire_without_being_clicked(stores: tuple) -> None:
+    attachment_store, draft_store = stores
+    now = 10**9
+    draft_store.all.return_value = [
+        Draft("stale", "patch", {}, updated_at=now - 120),
+        Draft("restored", "patch", {}, updated_at=now - 30),
+    ]
+    registry = ViewRegistry(max_views=10, idle_ttl=60)
+
+    with patch("modules.view_registry.time.time", return_value=now):
+        await registry.restore()
+
+    # Déjà inactif avant le redémarrage : supprimé tout de suite
+    assert "stale" not in registry
+    draft_store.delete.assert_awaited_once_with("stale")
+    assert "restored" in registry
+
+    # Jamais cliqué depuis : il expire au balayage suivant
+    with patch("modules.view_registry.time.monotonic", return_value=10**12):
+        await registry.sweep()
+
+    assert "restored" not in registry
+    draft_store.delete.assert_awaited_with("restored")
+    attachment_store.release.assert_called_with("restored")
+
+
+@pytest.mark.asyncio
+async def test_forget_and_snapshot(stores: tuple) -> None:
+    attachment_store, _ = stores
+    attachment_store.used_bytes = 2048
+    registry = ViewRegistry(max_views=5, idle_ttl=60)
+    view = _view({"fr": {"changes": "x" * 100}})
+    await registry.track("draft", view, MagicMock())
+
+    snapshot = registry.snapshot()
+    assert snapshot["views"] == 1
+    assert snapshot["max_views"] == 5
+    assert snapshot["memory_bytes"] > 100
+    assert snapshot["attachment_bytes"] == 2048
+
+    registry.forget("draft")
+
+    assert len(registry) == 0
+    assert view.is_finished()